@@ -9,9 +9,13 @@ https://docs.djangoproject.com/en/4.0/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
+import base64
+import hashlib
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -52,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'utils.query_inspector.QueryInspectorMiddleware',
     'utils.custom_middleware.CustomMiddleware'
 ]
 
@@ -146,10 +151,96 @@ REST_FRAMEWORK = {
 
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
-    )
+    ),
+
+    'DEFAULT_RENDERER_CLASSES': (
+        'utils.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+}
+
+# in process cache of vault access decisions, set MAX_SIZE or TTL (seconds)
+# to 0 to disable it. A change of the vault accesses invalidates the cache
+# of the process which made it only, the other worker processes keep their
+# cached decisions, so a revoked access may be allowed by them for up to
+# TTL seconds
+ACCESS_DECISION_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 5,
+}
+
+# base64 encoded 256 bits key which wraps the data keys of the
+# organizations. It must be set unless DEBUG is on, a key derived from
+# SECRET_KEY is used in development
+CREDENTIAL_MASTER_KEY = os.environ.get('CREDENTIAL_MASTER_KEY')
+
+if not CREDENTIAL_MASTER_KEY:
+    if not DEBUG:
+        raise ImproperlyConfigured('CREDENTIAL_MASTER_KEY must be set when '
+                                   'DEBUG is off')
+
+    CREDENTIAL_MASTER_KEY = base64.urlsafe_b64encode(
+        hashlib.sha256(SECRET_KEY.encode()).digest()
+    ).decode()
+
+# directory of the csv files which can be imported by name
+IMPORT_DIR = os.environ.get('CREDENTIAL_MANAGER_IMPORT_DIR',
+                            os.path.join(BASE_DIR, 'files'))
+
+# csv imports run in the background by WORKERS threads of each process.
+# Uploaded files are kept in DIR until imported. A running job renews its
+# lease every HEARTBEAT seconds, and a job whose lease is not renewed for
+# STALE_AFTER seconds can be resumed by another worker
+IMPORT_JOBS = {
+    'WORKERS': 1,
+    'DIR': os.environ.get('CREDENTIAL_MANAGER_IMPORT_JOB_DIR',
+                          os.path.join(BASE_DIR, 'import_jobs')),
+    'HEARTBEAT': 30,
+    'STALE_AFTER': 300,
+}
+
+# processes hashing the passwords of the imported employees, one per core
+# when it is not set
+PASSWORD_HASHING_WORKERS = int(
+    os.environ.get('CREDENTIAL_MANAGER_PASSWORD_HASHING_WORKERS', 0)
+) or None
+
+# tracing of the service calls. SAMPLE_RATE is the fraction of the calls
+# recorded as spans, SPAN_LOG_LEVEL the level the spans are logged at.
+# Set SPAN_LOG_LEVEL to INFO with a low SAMPLE_RATE to time the calls
+# in production
+TRACING = {
+    'SAMPLE_RATE': float(os.environ.get('CREDENTIAL_MANAGER_TRACE_SAMPLE_RATE',
+                                        1.0)),
+    'SPAN_LOG_LEVEL': os.environ.get('CREDENTIAL_MANAGER_SPAN_LOG_LEVEL',
+                                     'DEBUG'),
+}
+
+# request metrics exposed at /metrics. Under several worker processes set
+# MULTIPROCESS_DIR to a directory shared by the workers, which is emptied
+# before the workers start, so a scrape adds up the metrics of all of them
+METRICS = {
+    'MULTIPROCESS_DIR': os.environ.get('CREDENTIAL_MANAGER_METRICS_DIR'),
+    'FLUSH_INTERVAL': 5,
+}
+
+# inspection of the queries of each request, for development and staging.
+# Set MODE to 'warn' to log or 'raise' to fail the requests which run more
+# than MAX_QUERIES queries, repeat a statement more than MAX_REPEATS times
+# or run a query slower than SLOW_QUERY_MS
+QUERY_INSPECTOR = {
+    'MODE': os.environ.get('CREDENTIAL_MANAGER_QUERY_INSPECTOR'),
+    'MAX_QUERIES': 20,
+    'MAX_REPEATS': 3,
+    'SLOW_QUERY_MS': 100,
 }
 
 # logging configurations
+# level of the application logger, debug messages are skipped without
+# being formatted when the level is above DEBUG
+LOG_LEVEL = os.environ.get('CREDENTIAL_MANAGER_LOG_LEVEL',
+                           'DEBUG' if DEBUG else 'INFO')
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -169,11 +260,18 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'overall',
         },
+
+        # to hand the records over to the file and console handlers,
+        # which write them in a listener thread
+        'queue': {
+            'class': 'utils.log_handlers.QueueListenerHandler',
+            'handlers': ['cfg://handlers.file', 'cfg://handlers.console'],
+        },
     },
     'loggers': {
         'credential-manager-logger': {
-            'handlers': ['file', 'console'],
-            'level': 'DEBUG',
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
         },
     },
     'formatters': {
@@ -17,6 +17,8 @@ from django.contrib import admin
 from django.urls import include
 from django.urls import path
 
+from CredentialManager import views
+
 
 urlpatterns = [
     path('organization/', include('organization.urls')),
@@ -25,5 +27,6 @@ urlpatterns = [
     path('vault/', include('credential.urls')),
     path('user/<uuid:employee_uid>/vault/', include('credential.urls')),
     path('admin/', admin.site.urls),
+    path('metrics', views.get_metrics, name='metrics'),
     path('auth/', include('oauth2_provider.urls', namespace='oauth2_provider')),
 ]
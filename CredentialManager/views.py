@@ -0,0 +1,16 @@
+"""This module is used to expose the metrics of the application
+"""
+from django.http import HttpRequest
+from django.http import HttpResponse
+
+from rest_framework.decorators import api_view
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from utils import metrics
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_metrics(request: HttpRequest):
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
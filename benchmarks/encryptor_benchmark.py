@@ -0,0 +1,68 @@
+"""This module is used to compare the per call throughput and latency of the
+per item key AES-CBC encryption with the data key AES-GCM encryption. Run
+it with
+
+    python -m benchmarks.encryptor_benchmark [calls]
+"""
+import os
+import statistics
+import sys
+import time
+
+import django
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'CredentialManager.settings')
+django.setup()
+
+from utils import encryptor  # noqa: E402
+
+
+DEFAULT_CALLS = 20000
+MESSAGE = 'Str0ng#Passw0rd!'
+
+
+def measure(function, calls):
+    latencies = []
+
+    for _ in range(calls):
+        started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - started)
+
+    latencies.sort()
+
+    return {
+        'throughput': calls / sum(latencies),
+        'p50': statistics.median(latencies) * 1e6,
+        'p99': latencies[int(len(latencies) * 0.99)] * 1e6,
+    }
+
+
+def run(calls):
+    key = encryptor.generate_key()
+    legacy = encryptor.encrypt(MESSAGE)
+    token = encryptor.encrypt_with_key(MESSAGE, key)
+
+    benchmarks = (
+        ('cbc encrypt (item key)', lambda: encryptor.encrypt(MESSAGE)),
+        ('cbc decrypt (item key)',
+         lambda: encryptor.decrypt(legacy['encoded_text'],
+                                   legacy['texted_key'])),
+        ('gcm encrypt (data key)',
+         lambda: encryptor.encrypt_with_key(MESSAGE, key)),
+        ('gcm decrypt (data key)',
+         lambda: encryptor.decrypt_with_key(token, key)),
+    )
+
+    print(f'{"operation":<26}{"calls/s":>12}{"p50 (us)":>10}{"p99 (us)":>10}')
+
+    for name, function in benchmarks:
+        result = measure(function, calls)
+
+        print(f'{name:<26}{result["throughput"]:>12,.0f}'
+              f'{result["p50"]:>10.1f}{result["p99"]:>10.1f}')
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CALLS)
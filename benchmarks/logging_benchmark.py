@@ -0,0 +1,102 @@
+"""This module is used to measure the logging overhead of a request, with
+the synchronous file and console handlers and with the queue handler at
+debug and info level. Run it with
+
+    python -m benchmarks.logging_benchmark [requests]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from utils.log_handlers import QueueListenerHandler
+
+
+DEFAULT_REQUESTS = 2000
+
+# Enter and Exit messages logged by the views and services of a request
+CALLS_PER_REQUEST = 20
+
+FORMAT = '{levelname} {asctime} {message}'
+
+
+def build_handlers(directory):
+    formatter = logging.Formatter(FORMAT, style='{')
+
+    file_handler = logging.FileHandler(os.path.join(directory, 'bench.log'))
+    console_handler = logging.StreamHandler(open(os.devnull, 'w'))
+
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+
+    return [file_handler, console_handler]
+
+
+def eager_request(logger):
+    for _ in range(CALLS_PER_REQUEST):
+        logger.debug(f'Enter {__name__} module, {eager_request.__name__} '
+                     f'method')
+        logger.debug(f'Exit {__name__} module, {eager_request.__name__} '
+                     f'method')
+
+
+def lazy_request(logger):
+    for _ in range(CALLS_PER_REQUEST):
+        logger.debug('Enter %s module, %s method',
+                     __name__, lazy_request.__name__)
+        logger.debug('Exit %s module, %s method',
+                     __name__, lazy_request.__name__)
+
+
+def measure(logger, request, requests):
+    started = time.perf_counter()
+
+    for _ in range(requests):
+        request(logger)
+
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def run(requests):
+    with tempfile.TemporaryDirectory() as directory:
+        scenarios = (
+            ('sync handlers, f-strings, DEBUG', False, eager_request,
+             logging.DEBUG),
+            ('queue handler, lazy, DEBUG', True, lazy_request,
+             logging.DEBUG),
+            ('queue handler, lazy, INFO', True, lazy_request, logging.INFO),
+        )
+
+        print(f'{"scenario":<36}{"us/request":>12}{"dropped":>9}')
+
+        for index, (name, queued, request, level) in enumerate(scenarios):
+            logger = logging.getLogger(f'benchmark-{index}')
+            logger.propagate = False
+            logger.setLevel(level)
+
+            handlers = build_handlers(directory)
+
+            if queued:
+                queue_handler = QueueListenerHandler(handlers)
+                logger.addHandler(queue_handler)
+            else:
+                for handler in handlers:
+                    logger.addHandler(handler)
+
+            overhead = measure(logger, request, requests)
+
+            if queued:
+                queue_handler.close()
+                dropped = queue_handler.dropped
+            else:
+                dropped = 0
+
+            print(f'{name:<36}{overhead:>12.1f}{dropped:>9}')
+
+            for handler in handlers:
+                handler.close()
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS)
@@ -0,0 +1,57 @@
+"""This module is used to measure the password hashing throughput of the
+employee import for a growing number of worker processes. Run it with
+
+    python -m benchmarks.password_benchmark [rows] [max workers]
+"""
+import os
+import sys
+import time
+
+import django
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'CredentialManager.settings')
+django.setup()
+
+from django.contrib.auth.hashers import get_hasher  # noqa: E402
+
+from utils import password_hasher  # noqa: E402
+
+
+DEFAULT_ROWS = 64
+
+
+def measure(passwords, workers):
+    with password_hasher.HashingPool(workers) as pool:
+        # the processes are started by the first batch, which is not timed
+        pool.hash_passwords(passwords[:password_hasher.PARALLEL_MIN_BATCH])
+
+        started = time.perf_counter()
+        pool.hash_passwords(passwords)
+
+        return len(passwords) / (time.perf_counter() - started)
+
+
+def run(rows, max_workers):
+    passwords = [f'Str0ng#Passw0rd{index}' for index in range(rows)]
+    workers = 1
+
+    print(f'hasher: {get_hasher("default").algorithm}, rows: {rows}, '
+          f'cores: {os.cpu_count()}')
+    print(f'{"workers":<10}{"rows/s":>10}{"speedup":>10}')
+
+    baseline = None
+
+    while workers <= max_workers:
+        throughput = measure(passwords, workers)
+        baseline = baseline or throughput
+
+        print(f'{workers:<10}{throughput:>10.1f}'
+              f'{throughput / baseline:>9.2f}x')
+
+        workers *= 2
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1)
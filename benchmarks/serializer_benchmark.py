@@ -0,0 +1,101 @@
+"""This module is used to compare the DRF serializers with the fast
+serializers on unsaved vaults, components, items and employees, so no
+database is needed. Run it with
+
+    python -m benchmarks.serializer_benchmark [rows ...]
+"""
+import os
+import sys
+import time
+import uuid
+
+import django
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'CredentialManager.settings')
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+
+from credential.models import Component  # noqa: E402
+from credential.models import Item  # noqa: E402
+from credential.models import Vault  # noqa: E402
+from credential.serializers import ComponentOnlySerializer  # noqa: E402
+from credential.serializers import ItemSerializer  # noqa: E402
+from credential.serializers import VaultOnlySerializer  # noqa: E402
+from employee.models import Employee  # noqa: E402
+from employee.serializers import EmployeeSerializer  # noqa: E402
+from utils.fast_serializer import get_fast_serializer  # noqa: E402
+
+
+DEFAULT_ROWS = (1000, 10000, 100000)
+
+
+def build_instances(model, rows):
+    now = timezone.now()
+    common = {'created_at': now, 'updated_at': now, 'active': True,
+              'organization_id': 1, 'created_by_id': 1}
+
+    if model is Vault:
+        return [Vault(vault_id=index, vault_uid=uuid.uuid4(),
+                      name=f'Vault {index}', description='Vault',
+                      updated_by_id=1, **common)
+                for index in range(rows)]
+
+    if model is Component:
+        return [Component(component_id=index, component_uid=uuid.uuid4(),
+                          name=f'Component {index}',
+                          description='Component', vault_id=1,
+                          updated_by_id=1, **common)
+                for index in range(rows)]
+
+    if model is Item:
+        return [Item(item_id=index, item_uid=uuid.uuid4(),
+                     key=f'key{index}', value='value', salt='salt',
+                     component_id=1, updated_by_id=1, **common)
+                for index in range(rows)]
+
+    return [Employee(employee_id=index, employee_uid=uuid.uuid4(),
+                     name=f'Employee {index}',
+                     email=f'employee{index}@ideas2it.com',
+                     password='password', updated_by=1, **common)
+            for index in range(rows)]
+
+
+def measure(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def run(rows_list):
+    benchmarks = (
+        (VaultOnlySerializer, Vault),
+        (ComponentOnlySerializer, Component),
+        (ItemSerializer, Item),
+        (EmployeeSerializer, Employee),
+    )
+
+    print(f'{"serializer":<26}{"rows":>8}{"drf (s)":>10}'
+          f'{"fast (s)":>10}{"speedup":>9}')
+
+    for serializer_class, model in benchmarks:
+        fast_serializer = get_fast_serializer(serializer_class)
+
+        for rows in rows_list:
+            instances = build_instances(model, rows)
+
+            drf_time = measure(
+                lambda: serializer_class(instances, many=True).data
+            )
+            fast_time = measure(
+                lambda: fast_serializer.serialize_many(instances)
+            )
+
+            print(f'{serializer_class.__name__:<26}{rows:>8}'
+                  f'{drf_time:>10.3f}{fast_time:>10.3f}'
+                  f'{drf_time / fast_time:>8.1f}x')
+
+
+if __name__ == '__main__':
+    run([int(rows) for rows in sys.argv[1:]] or DEFAULT_ROWS)
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
 from credential.models import Component
+from credential.models import DataKey
+from credential.models import EffectiveVaultAccess
 from credential.models import Item
 from credential.models import Vault
 from credential.models import VaultAccess
@@ -8,5 +10,7 @@ from credential.models import VaultAccess
 
 admin.site.register(Vault)
 admin.site.register(Component)
+admin.site.register(DataKey)
+admin.site.register(EffectiveVaultAccess)
 admin.site.register(Item)
 admin.site.register(VaultAccess)
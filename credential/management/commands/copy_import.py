@@ -0,0 +1,70 @@
+"""This command is used to load the employees, project memberships,
+components and items of an initial migration from csv files of
+pre-validated and pre-encrypted rows. The item values must be encrypted
+with the data key of their organization. PostgreSQL loads the files with
+COPY, other databases with executemany
+"""
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+
+from credential.models import Component
+from credential.models import Item
+
+from employee.models import Employee
+
+from utils import copy_loader
+
+
+# files in the order they are loaded, so the referenced rows come first
+TABLES = (
+    ('employees', Employee),
+    ('employee_projects', Employee.projects.through),
+    ('components', Component),
+    ('items', Item),
+)
+
+
+class Command(BaseCommand):
+    help = 'Load employees, project memberships, components and items ' \
+           'from csv files with COPY'
+
+    def add_arguments(self, parser):
+        for option, model in TABLES:
+            parser.add_argument(
+                f'--{option.replace("_", "-")}', dest=option,
+                help=f'csv file of {model._meta.db_table} rows, with the '
+                     f'column names in the header'
+            )
+        parser.add_argument('--batch-size', type=int,
+                            default=copy_loader.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        tables = [(option, model) for option, model in TABLES
+                  if options[option]]
+
+        if not tables:
+            raise CommandError('Give at least one csv file')
+
+        loaded_models = []
+
+        try:
+            with transaction.atomic():
+                for option, model in tables:
+                    with open(options[option], encoding='utf-8-sig',
+                              newline='') as csv_file:
+                        loaded = copy_loader.load(model, csv_file,
+                                                  options['batch_size'])
+
+                    loaded_models.append(model)
+
+                    self.stdout.write(f'Loaded {loaded} rows into '
+                                      f'{model._meta.db_table}')
+
+                copy_loader.reset_sequences(loaded_models)
+        except (OSError, copy_loader.CopyLoadError) as e:
+            raise CommandError(str(e))
+
+        if options['employees'] or options['employee_projects']:
+            self.stdout.write('Run rebuild_effective_access for the '
+                              'organizations of the loaded employees')
@@ -0,0 +1,30 @@
+"""This command is used to recompute the effective vault accesses of an
+organization to repair any drift from the vault accesses
+"""
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from credential.service import effective_access_service
+
+from organization.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Recompute the effective vault accesses of an organization'
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization_id', type=int)
+
+    def handle(self, *args, **options):
+        organization_id = options['organization_id']
+
+        if not Organization.objects.filter(
+                organization_id=organization_id).exists():
+            raise CommandError('No such organization exist')
+
+        rebuilt = effective_access_service.rebuild_organization(
+            organization_id
+        )
+
+        self.stdout.write(f'Rebuilt {rebuilt} effective vault accesses '
+                          f'for organization {organization_id}')
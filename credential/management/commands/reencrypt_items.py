@@ -0,0 +1,73 @@
+"""This command is used to re-encrypt the item values which still have their
+own key in the salt with the data key of their organization
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from credential.models import Item
+from credential.service import data_key_service
+
+from utils import encryptor
+
+
+class Command(BaseCommand):
+    help = 'Re-encrypt item values with the organization data keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', type=int,
+                            help='re-encrypt the items of this organization '
+                                 'only')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        items = Item.objects.exclude(salt='').order_by('item_id')
+
+        if options['organization'] is not None:
+            items = items.filter(organization=options['organization'])
+
+        batch_size = options['batch_size']
+        reencrypted = 0
+        failed = 0
+        last_item_id = 0
+
+        while True:
+            batch = list(items.filter(item_id__gt=last_item_id)[:batch_size])
+
+            if not batch:
+                break
+
+            last_item_id = batch[-1].item_id
+            organization_items = {}
+
+            for item in batch:
+                value = encryptor.decrypt(item.value, item.salt)
+
+                if value is None:
+                    failed += 1
+                    self.stderr.write(f'Item {item.item_id} can not be '
+                                      f'decrypted, it is left as it is')
+                    continue
+
+                organization_items.setdefault(item.organization_id, []) \
+                    .append((item, value))
+
+            changed_items = []
+
+            for organization_id, items_values in organization_items.items():
+                encrypted_values = data_key_service.encrypt_values(
+                    organization_id, [value for _, value in items_values]
+                )
+
+                for (item, _), encrypted_value in zip(items_values,
+                                                      encrypted_values):
+                    item.value = encrypted_value
+                    item.salt = ''
+                    changed_items.append(item)
+
+            with transaction.atomic():
+                Item.objects.bulk_update(changed_items, ['value', 'salt'])
+
+            reencrypted += len(changed_items)
+
+        self.stdout.write(f'Re-encrypted {reencrypted} items, '
+                          f'{failed} failed')
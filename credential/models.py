@@ -3,6 +3,7 @@
 import uuid
 
 from django.db import models
+from django.db.models import Q
 
 # from employee.models import EmployeeAccount
 from employee.models import Employee
@@ -62,6 +63,11 @@ class Component(BaseModel):
 
     class Meta:
         db_table = 'cm_component'
+        indexes = [
+            # active components of a vault
+            models.Index(fields=['vault'], condition=Q(active=True),
+                         name='cm_component_vault_idx'),
+        ]
 
     component_id = models.AutoField(primary_key=True)
     component_uid = models.UUIDField(default=uuid.uuid4, editable=False,
@@ -99,14 +105,21 @@ class Item(BaseModel):
 
     class Meta:
         db_table = 'cm_item'
+        indexes = [
+            # active items of the components being read
+            models.Index(fields=['component'], condition=Q(active=True),
+                         name='cm_item_component_idx'),
+        ]
 
     item_id = models.AutoField(primary_key=True)
     item_uid = models.UUIDField(default=uuid.uuid4, editable=False,
                                 unique=True)
     key = models.CharField(max_length=45,
                            validators=[Validator.KEY_LENGTH_REGEX])
-    value = models.CharField(max_length=88,)
-    salt = models.CharField(max_length=44)
+    value = models.CharField(max_length=255)
+    # per item key of the values encrypted before the data keys, which are
+    # left blank for values encrypted with the organization data key
+    salt = models.CharField(max_length=44, blank=True, default='')
 
     component = models.ForeignKey(Component, on_delete=models.CASCADE,
                                   to_field='component_id',
@@ -137,6 +150,17 @@ class VaultAccess(BaseModel):
 
     class Meta:
         db_table = 'cm_vault_access'
+        indexes = [
+            # active accesses of an organization, of a vault and of one
+            # access level, which every access check filters on
+            models.Index(fields=['organization', 'vault', 'access_level'],
+                         condition=Q(active=True),
+                         name='cm_vault_access_org_idx'),
+            # active individual accesses of an employee
+            models.Index(fields=['employee', 'vault'],
+                         condition=Q(active=True),
+                         name='cm_vault_access_employee_idx'),
+        ]
 
     vault_access_id = models.AutoField(primary_key=True)
     vault_access_uid = models.UUIDField(default=uuid.uuid4, editable=False,
@@ -185,3 +209,47 @@ class VaultAccess(BaseModel):
                                    db_column='updated_by',
                                    related_name='updated_vault_accesses',
                                    null=True)
+
+
+# model to store the effective vault access of an employee, derived from
+# the organization, project and individual vault accesses
+class EffectiveVaultAccess(BaseModel):
+
+    class Meta:
+        db_table = 'cm_effective_vault_access'
+        unique_together = ('employee', 'vault')
+
+    effective_vault_access_id = models.AutoField(primary_key=True)
+
+    scope = models.CharField(choices=VaultAccess.scopes, max_length=20)
+
+    employee = models.ForeignKey(Employee, to_field='employee_id',
+                                 db_column='employee_id',
+                                 on_delete=models.CASCADE,
+                                 related_name='effective_vault_accesses')
+
+    vault = models.ForeignKey(Vault, to_field='vault_id',
+                              on_delete=models.CASCADE,
+                              related_name='effective_vault_accesses')
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE,
+                                     to_field='organization_id',
+                                     db_column='organization_id')
+
+
+# model to store the data encryption key of an organization, wrapped by
+# the master key
+class DataKey(BaseModel):
+
+    class Meta:
+        db_table = 'cm_data_key'
+
+    data_key_id = models.AutoField(primary_key=True)
+
+    wrapped_key = models.CharField(max_length=64)
+
+    organization = models.OneToOneField(Organization,
+                                        on_delete=models.CASCADE,
+                                        to_field='organization_id',
+                                        db_column='organization_id',
+                                        related_name='data_key')
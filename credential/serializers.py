@@ -1,19 +1,25 @@
 """This module contains serializers for all the models
 """
+from django.utils import timezone
+
 from rest_framework import serializers
 
 from credential.models import Component
 from credential.models import Item
 from credential.models import Vault
 from credential.models import VaultAccess
+from credential.service import data_key_service
 
 from utils.api_exceptions import CustomApiException
 
-from utils.encryptor import encrypt
 from utils.password_matcher import is_password_valid
 from utils.validators import Validator
 
 
+# maximum number of items written by a single bulk query
+ITEM_BATCH_SIZE = 500
+
+
 class ItemSerializer(serializers.ModelSerializer):
     item_id = serializers.IntegerField(required=False)
 
@@ -42,76 +48,211 @@ class ComponentSerializer(serializers.ModelSerializer):
                   'active', 'organization', 'vault', 'items',
                   'created_at', 'created_by', 'updated_at', 'updated_by')
 
+    @staticmethod
+    def validate_item_passwords(items):
+        """validate all password items before anything is written
+        """
+        for item in items:
+            if item['key'] == 'password':
+                Validator.PASSWORD_REGEX(item['value'])
+
+    @staticmethod
+    def build_items(component, items, created_by_id):
+        """encrypt the item values with the organization data key and
+        build the unsaved items
+        """
+        component_items = []
+
+        encrypted_values = data_key_service.encrypt_values(
+            component.organization_id, [item['value'] for item in items]
+        )
+
+        for item, encrypted_value in zip(items, encrypted_values):
+            item['value'] = encrypted_value
+            item['salt'] = ''
+
+            component_items.append(
+                Item(component=component, **item,
+                     created_by_id=created_by_id,
+                     organization_id=component.organization_id)
+            )
+
+        return component_items
+
     # override create method for nested objects creation
     def create(self, validated_data):
         items = validated_data.pop('items')
 
+        self.validate_item_passwords(items)
+
         component = Component.objects.create(**validated_data)
 
-        for item in items:
+        Item.objects.bulk_create(
+            self.build_items(component, items, component.created_by_id),
+            batch_size=ITEM_BATCH_SIZE
+        )
 
-            if item['key'] == 'password':
-                Validator.PASSWORD_REGEX(item['value'])
+        return component
 
-            encrypted = encrypt(item['value'])
-            item['value'] = encrypted['encoded_text']
-            item['salt'] = encrypted['texted_key']
+    @staticmethod
+    def apply_item_changes(component_item, item, plaintext):
+        """apply the requested changes to an existing item. plaintext is the
+        decrypted stored value, None if it has not been decrypted. Returns
+        whether the item has to be written and the plaintext to encrypt
+        with the data key of its organization, None if the stored value is
+        kept as its plaintext and its organization have not changed
+        """
+        changed = False
+        organization_id = component_item.organization_id
+
+        key = item.get('key', component_item.key)
+        if key != component_item.key:
+            component_item.key = key
+            changed = True
+
+        active = item.get('active', component_item.active)
+        if active != component_item.active:
+            component_item.active = active
+            changed = True
+
+        organization = item.get('organization')
+        if organization is not None \
+                and organization.pk != component_item.organization_id:
+            component_item.organization = organization
+            changed = True
+
+        value = item.get('value')
+        if value == component_item.value:
+            # the stored token has been sent back unchanged
+            value = None
+
+        moved = organization_id != component_item.organization_id
+
+        if value is not None or moved:
+            if plaintext is None:
+                plaintext = data_key_service.decrypt_value(
+                    organization_id, component_item.value,
+                    component_item.salt
+                )
 
-            Item.objects.create(component=component, **item,
-                                created_by=component.created_by,
-                                organization=component.organization)
+            if value is None:
+                value = plaintext
 
-        return component
+        if moved or (value is not None and value != plaintext):
+            return True, value
+
+        return changed, None
+
+    @staticmethod
+    def is_decrypted(component_item, item):
+        """whether the stored value of an item is needed to apply its
+        changes, when its value is sent or its organization changes
+        """
+        organization = item.get('organization')
+
+        return (item.get('value') is not None
+                and item['value'] != component_item.value) \
+            or (organization is not None
+                and organization.pk != component_item.organization_id)
 
     # override update method to update nested objects
     def update(self, instance, validated_data):
+        items = validated_data.pop('items')
+        updated_by = validated_data['updated_by']
+
+        existing_items = {
+            component_item.item_id: component_item
+            for component_item in Item.objects.filter(
+                component=instance, organization=instance.organization_id
+            )
+        }
+
+        new_items = []
+        updated_items = []
+
+        for item in items:
+            item_id = item.get('item_id')
+
+            if not item_id:
+                new_items.append(item)
+                continue
+
+            if item_id not in existing_items:
+                raise CustomApiException(404, 'No such item exist')
+
+            if item.get('value') is not None \
+                    and item.get('key', existing_items[item_id].key) \
+                    == 'password':
+                Validator.PASSWORD_REGEX(item['value'])
+
+            updated_items.append((existing_items[item_id], item))
+
+        self.validate_item_passwords(new_items)
+
         instance.name = validated_data.get('name', instance.name)
         instance.active = validated_data.get('active', instance.active)
         instance.description = validated_data.get('description',
                                                   instance.description)
-        instance.updated_by = validated_data.get('updated_by')
+        instance.updated_by = updated_by
 
         instance.save()
 
-        items = validated_data.pop('items')
+        # decrypt the stored values which may change in one batch
+        decrypted_items = [
+            component_item for component_item, item in updated_items
+            if self.is_decrypted(component_item, item)
+        ]
+
+        plaintexts = dict(zip(
+            [component_item.item_id for component_item in decrypted_items],
+            data_key_service.decrypt_values(
+                instance.organization_id,
+                [(component_item.value, component_item.salt)
+                 for component_item in decrypted_items]
+            )
+        ))
 
-        for item in items:
-            item_id = item.get('item_id')
+        updated_at = timezone.now()
+        changed_items = []
+        encrypted_items = {}
 
-            if item_id:
-                component_item = Item.objects.get(
-                    item_id=item_id, component=instance,
-                    organization=instance.organization
-                )
+        for component_item, item in updated_items:
+            changed, value = self.apply_item_changes(
+                component_item, item, plaintexts.get(component_item.item_id)
+            )
 
-                component_item.key = item.get('key', component_item.key)
+            if value is not None:
+                encrypted_items.setdefault(
+                    component_item.organization_id, []
+                ).append((component_item, value))
 
-                value = item.get('value', component_item.value)
+            if changed:
+                component_item.updated_by = updated_by
+                component_item.updated_at = updated_at
+                changed_items.append(component_item)
 
-                if value != component_item.value:
-                    encrypted = encrypt(value)
-                    component_item.value = encrypted['encoded_text']
-                    component_item.salt = encrypted['texted_key']
+        # encrypt the changed values in one batch per organization
+        for organization_id, organization_items in encrypted_items.items():
+            encrypted_values = data_key_service.encrypt_values(
+                organization_id, [value for _, value in organization_items]
+            )
 
-                component_item.active = item.get('active',
-                                                 component_item.active)
-                component_item.updated_by = component_item.created_by
-                component_item.organization = item.get(
-                    'organization', component_item.organization
-                )
-                component_item.updated_by = validated_data['updated_by']
-                component_item.save()
-            else:
-                if item['key'] == 'password':
-                    Validator.PASSWORD_REGEX(item['value'])
+            for (component_item, _), encrypted_value in zip(
+                    organization_items, encrypted_values):
+                component_item.value = encrypted_value
+                component_item.salt = ''
 
-                encrypted = encrypt(item['value'])
-                item['value'] = encrypted['encoded_text']
-                item['salt'] = encrypted['texted_key']
+        Item.objects.bulk_update(
+            changed_items,
+            ['key', 'value', 'salt', 'active', 'organization',
+             'updated_by', 'updated_at'],
+            batch_size=ITEM_BATCH_SIZE
+        )
 
-                Item.objects.create(component=instance, **item,
-                                    created_by=validated_data['updated_by'],
-                                    organization=instance.organization)
+        Item.objects.bulk_create(
+            self.build_items(instance, new_items, updated_by.employee_id),
+            batch_size=ITEM_BATCH_SIZE
+        )
 
         return instance
 
@@ -119,6 +260,9 @@ class ComponentSerializer(serializers.ModelSerializer):
 class ComponentResponseSerializer(serializers.ModelSerializer):
     items = ItemSerializer(many=True)
 
+    # relations to prefetch before serializing components
+    prefetch_fields = ('items',)
+
     class Meta:
         model = Component
         fields = ('component_id', 'component_uid', 'name', 'description',
@@ -137,6 +281,9 @@ class ComponentOnlySerializer(serializers.ModelSerializer):
 class VaultSerializer(serializers.ModelSerializer):
     components = ComponentOnlySerializer(many=True, read_only=True)
 
+    # relations to prefetch before serializing vaults
+    prefetch_fields = ('components',)
+
     class Meta:
         model = Vault
         fields = ('vault_id', 'vault_uid', 'name', 'description',
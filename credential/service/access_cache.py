@@ -0,0 +1,215 @@
+"""This module is used to cache the vault access decisions of the employees
+in process memory. Cached decisions are invalidated by per vault and per
+employee version counters, which are bumped whenever the effective vault
+accesses of a vault or an employee are recomputed. The counters which no
+cached decision refers to are dropped once they outnumber the cache, so
+they stay bounded by the size of the cache.
+
+The invalidation only reaches the cache of the current process. The other
+worker processes keep serving their cached decisions until they expire, so
+a revoked access may still be allowed for up to the time to live, which is
+kept to a few seconds
+"""
+import threading
+import time
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+
+
+class AccessDecisionCache:
+    """LRU cache of vault access decisions with a time to live
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._vault_versions = {}
+        self._employee_versions = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, organization_id, employee_id, vault_id):
+        """used to get the cached decision, None if there is no valid entry
+        """
+        key = (organization_id, employee_id, vault_id)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                decision, versions, expires_at = entry
+
+                if expires_at > time.monotonic() \
+                        and versions == self._versions(employee_id, vault_id):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return decision
+
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def versions(self, employee_id, vault_id):
+        """used to get the current versions, which must be taken before the
+        decision is resolved so a concurrent invalidation is not missed
+        """
+        with self._lock:
+            return self._versions(employee_id, vault_id)
+
+    def _versions(self, employee_id, vault_id):
+        return (self._generation,
+                self._vault_versions.get(vault_id, 0),
+                self._employee_versions.get(employee_id, 0))
+
+    def set(self, organization_id, employee_id, vault_id, decision,
+            versions):
+        """used to cache the decision resolved at the given versions
+        """
+        if not self.enabled:
+            return
+
+        key = (organization_id, employee_id, vault_id)
+
+        with self._lock:
+            self._entries[key] = (decision, versions,
+                                  time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def bump_vault(self, vault_id):
+        """used to invalidate the cached decisions of a vault
+        """
+        with self._lock:
+            self._vault_versions[vault_id] \
+                = self._vault_versions.get(vault_id, 0) + 1
+
+            if len(self._vault_versions) > 2 * self.max_size:
+                self._prune_versions()
+
+    def bump_employee(self, employee_id):
+        """used to invalidate the cached decisions of an employee
+        """
+        with self._lock:
+            self._employee_versions[employee_id] \
+                = self._employee_versions.get(employee_id, 0) + 1
+
+            if len(self._employee_versions) > 2 * self.max_size:
+                self._prune_versions()
+
+    def _prune_versions(self):
+        """used to drop the version counters which no valid cached decision
+        refers to. The generation is bumped, so a decision resolved at a
+        dropped counter is never taken as current, and the valid cached
+        decisions are moved to the new generation
+        """
+        now = time.monotonic()
+        self._generation += 1
+        vault_ids = set()
+        employee_ids = set()
+
+        for key, entry in list(self._entries.items()):
+            _, employee_id, vault_id = key
+            decision, versions, expires_at = entry
+
+            if expires_at <= now or versions[1:] != (
+                    self._vault_versions.get(vault_id, 0),
+                    self._employee_versions.get(employee_id, 0)):
+                del self._entries[key]
+                continue
+
+            self._entries[key] = (decision,
+                                  (self._generation,) + versions[1:],
+                                  expires_at)
+            vault_ids.add(vault_id)
+            employee_ids.add(employee_id)
+
+        self._vault_versions = {
+            vault_id: version
+            for vault_id, version in self._vault_versions.items()
+            if vault_id in vault_ids
+        }
+        self._employee_versions = {
+            employee_id: version
+            for employee_id, version in self._employee_versions.items()
+            if employee_id in employee_ids
+        }
+
+    def clear(self):
+        """used to drop all cached decisions and reset the counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self._vault_versions.clear()
+            self._employee_versions.clear()
+            self._generation += 1
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """used to get the cache counters to size the cache
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+            }
+
+
+cache_settings = getattr(settings, 'ACCESS_DECISION_CACHE', {})
+
+access_decision_cache = AccessDecisionCache(
+    max_size=cache_settings.get('MAX_SIZE', 10000),
+    ttl=cache_settings.get('TTL', 5),
+)
+
+
+def invalidate_vault(vault_id):
+    """used to invalidate the cached decisions of a vault now and again
+    once the current transaction is committed
+    """
+    access_decision_cache.bump_vault(vault_id)
+    transaction.on_commit(
+        lambda: access_decision_cache.bump_vault(vault_id)
+    )
+
+
+def invalidate_employee(employee_id):
+    """used to invalidate the cached decisions of an employee now and again
+    once the current transaction is committed
+    """
+    access_decision_cache.bump_employee(employee_id)
+    transaction.on_commit(
+        lambda: access_decision_cache.bump_employee(employee_id)
+    )
+
+
+def clear():
+    """used to drop all cached decisions
+    """
+    access_decision_cache.clear()
+
+
+def stats():
+    """used to get the hit, miss and eviction counters of the cache
+    """
+    return access_decision_cache.stats()
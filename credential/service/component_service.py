@@ -4,6 +4,7 @@ components of a vault
 import logging
 
 from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django.core.exceptions import ValidationError \
     as DjangoCoreValidationException
 
@@ -16,6 +17,7 @@ from credential.models import Vault
 from credential.serializers import ComponentOnlySerializer
 from credential.serializers import ComponentResponseSerializer
 from credential.serializers import ComponentSerializer
+from credential.service import entity_loader
 from credential.service import user_access_service
 
 from employee.models import Employee
@@ -23,39 +25,32 @@ from employee.models import Employee
 from organization.models import Organization
 
 from utils.api_exceptions import CustomApiException
+from utils.fast_serializer import get_fast_serializer
+from utils.tracing import traced
 
 
 logger = logging.getLogger('credential-manager-logger')
 
 
+@traced
 @transaction.atomic
 def create_component(organization_id, employee_uid, vault_uid, data):
     """used to create component for a vault
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{create_component.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id, active=True
+        entities = entity_loader.load(
+            organization_id, employee_uid, vault_uid
         )
 
-        vault = Vault.objects.get(
-            vault_uid=vault_uid, active=True,
-            organization=organization,
-            organization__active=True,
-        )
+        organization = entities.organization
+        vault = entities.vault
+        employee = entities.employee
 
-        employee = Employee.objects.get(
-            employee_uid=employee_uid, active=True,
-            organization__organization_id=organization_id,
-            organization__active=True
+        vault_access = user_access_service.resolve_vault_access(
+            organization_id, employee, vault
         )
 
-        if vault.created_by.employee_id == employee.employee_id \
-                or user_access_service.can_update_vault(organization_id,
-                                                        employee,
-                                                        vault.vault_id):
+        if vault_access.can_write:
             data['vault'] = vault.vault_id
             data['organization'] = organization.organization_id
             data['created_by'] = employee.employee_id
@@ -66,147 +61,99 @@ def create_component(organization_id, employee_uid, vault_uid, data):
             component_serializer.save()
 
             logger.debug('Component created successfully')
-            logger.debug(f'Exit {__name__} module, '
-                         f'{create_component.__name__} method')
 
             return component_serializer.data
         else:
             logger.error('Component creation failure. '
                          'User don\'t have component creation access')
-            logger.error(f'Exit {__name__} module, '
-                         f'{create_component.__name__} method')
             raise CustomApiException(400, 'You don\'t have component '
                                           'creation access')
     except RestFrameworkValidationException as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Entered details are not valid')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_component.__name__} method')
         raise CustomApiException(400, message)
     except DjangoCoreValidationException as dcve:
         message = dcve.message
         logger.error('Entered details are not valid')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_component.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error(f'Component creation failure. '
                      f'Organization with Organization ID: '
                      f'{organization_id} not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_component.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
     except Vault.DoesNotExist:
         logger.error(f'Component creation failure. '
                      f'Vault with Vault UID:  {vault_uid} not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_component.__name__} method')
         raise CustomApiException(400, 'No such vault exist')
     except Employee.DoesNotExist:
         logger.error('Component creation failure. No such employee exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_component.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
 
 
+@traced
 def get_component(organization_id, employee_uid, vault_uid, component_uid,
                   data):
     """used to get component and its items from a vault
     """
-    logger.debug(f'Enter {__name__} module, {get_component.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id,
-            active=True
-        )
-
-        vault = Vault.objects.get(
-            vault_uid=vault_uid, active=True,
-            organization=organization
+        entities = entity_loader.load(
+            organization_id, employee_uid, vault_uid, component_uid
         )
 
-        employee = Employee.objects.get(
-            employee_uid=employee_uid, active=True,
-            organization=organization,
-        )
+        vault = entities.vault
+        employee = entities.employee
+        component = entities.component
 
-        component = Component.objects.get(
-            component_uid=component_uid, active=True,
-            vault=vault, vault__active=True,
-            organization=organization
+        vault_access = user_access_service.resolve_vault_access(
+            organization_id, employee, vault
         )
 
-        if vault.created_by.employee_id == employee.employee_id \
-            or user_access_service.has_vault_access(organization_id, employee,
-                                                    vault.vault_id):
-            component_serializer = ComponentResponseSerializer(component)
-            logger.debug(f'Exit {__name__} module, '
-                         f'{get_component.__name__} method')
-            return component_serializer.data
+        if vault_access.can_read:
+            prefetch_related_objects(
+                [component], *ComponentResponseSerializer.prefetch_fields
+            )
+            component_serializer = get_fast_serializer(
+                ComponentResponseSerializer
+            )
+            return component_serializer.serialize(component)
         else:
-            logger.error(f'Exit {__name__} module, '
-                         f'{get_component.__name__} method')
             raise CustomApiException(400, 'You don\'t have access '
                                           'to this vault')
     except Organization.DoesNotExist:
         logger.error(f'Organization with Organization ID: '
                      f'{organization_id} not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_component.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
     except Employee.DoesNotExist:
         logger.error(f'vault for Employee UID : {employee_uid} is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_component.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
     except Vault.DoesNotExist:
         logger.error(f'Vault for Vault UID : {vault_uid} is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_component.__name__} method')
         raise CustomApiException(404, 'No such vault exist')
     except Component.DoesNotExist:
         logger.error(f'Component for Component UID : {component_uid} '
                      f'is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_component.__name__} method')
         raise CustomApiException(404, 'No such component exist')
 
 
+@traced
 def update_component(organization_id, employee_uid, vault_uid, component_uid,
                      data):
     """used to update component details and items
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{update_component.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id,
-            active=True
-        )
-
-        vault = Vault.objects.get(
-            vault_uid=vault_uid, active=True,
-            organization=organization
+        entities = entity_loader.load(
+            organization_id, employee_uid, vault_uid, component_uid
         )
 
-        employee = Employee.objects.get(
-            employee_uid=employee_uid, active=True,
-            organization=organization,
-        )
+        vault = entities.vault
+        employee = entities.employee
+        component = entities.component
 
-        component = Component.objects.get(
-            component_uid=component_uid,
-            vault=vault, vault__active=True,
-            organization=organization,
-            active=True
+        vault_access = user_access_service.resolve_vault_access(
+            organization_id, employee, vault
         )
 
-        if vault.created_by.employee_id == employee.employee_id \
-                or user_access_service.can_update_vault(organization_id,
-                                                        employee,
-                                                        vault.vault_id):
+        if vault_access.can_write:
             data['updated_by'] = employee.employee_id
             component_serializer = ComponentSerializer(component, data=data,
                                                        partial=True)
@@ -214,130 +161,89 @@ def update_component(organization_id, employee_uid, vault_uid, component_uid,
             component_serializer.save()
 
             logger.debug('Component details updated successfully')
-            logger.debug(f'Exit {__name__} module, '
-                         f'{update_component.__name__} method')
 
-        return component_serializer.data
+            return component_serializer.data
+        else:
+            logger.error('Component update failure. '
+                         'User don\'t have component update access')
+            raise CustomApiException(400, 'You don\'t have component '
+                                          'update access')
     except RestFrameworkValidationException as rfve:
         message = list(rfve.get_full_details().values())[0][0]['message']
         logger.error('Component details update failure')
         logger.error('Entered details are not valid')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component.__name__} method')
         raise CustomApiException(400, message)
     except DjangoCoreValidationException as dcve:
         message = dcve.message
         logger.error('Component details update failure')
         logger.error('Entered details are not valid')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
         logger.error('Component details update failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component.__name__} method')
         raise CustomApiException(400, message)
     except Vault.DoesNotExist:
         logger.error('No such vault exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component.__name__} method')
         raise CustomApiException(404, 'No such vault exist')
     except Component.DoesNotExist:
         logger.error(f'Component for Component UID : {component_uid} '
                      f'is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component.__name__} method')
         raise CustomApiException(404, 'No such component exist')
     except Employee.DoesNotExist:
         logger.error(f'vault for Employee UID : {employee_uid} is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
 
 
+@traced
 def update_component_status(organization_id, employee_uid, vault_uid,
                             component_uid, data):
     """used to update component status
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{update_component_status.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id,
-            active=True
+        entities = entity_loader.load(
+            organization_id, employee_uid, vault_uid, component_uid,
+            inactive_component=True
         )
 
-        vault = Vault.objects.get(
-            vault_uid=vault_uid, active=True,
-            organization=organization
-        )
-
-        employee = Employee.objects.get(
-            employee_uid=employee_uid, active=True,
-            organization=organization,
-        )
-
-        component = Component.objects.get(
-            component_uid=component_uid,
-            vault=vault, vault__active=True,
-            organization=organization,
-        )
+        vault = entities.vault
+        employee = entities.employee
+        component = entities.component
 
-        if vault.created_by.employee_id == employee.employee_id\
-                or component.created_by.employee_id == employee.employee_id:
+        if vault.created_by_id == employee.employee_id \
+                or component.created_by_id == employee.employee_id:
             component.active = not component.active
             component.save()
             component_serializer = ComponentOnlySerializer(component)
 
             logger.debug('Component status updated successfully')
-            logger.debug(f'Exit {__name__} module, '
-                         f'{update_component_status.__name__} method')
 
             return component_serializer.data
         else:
             logger.error('Component status update failure.')
-            logger.error(f'Exit {__name__} module, '
-                         f'{update_component_status.__name__} method')
             raise CustomApiException(400, 'Vault owner or Component owner '
                                           'only can update active status')
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Entered details are not valid')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component_status.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component_status.__name__} method')
         raise CustomApiException(400, message)
     except Vault.DoesNotExist:
         logger.error('No such vault exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component_status.__name__} method')
         raise CustomApiException(404, 'No such vault exist')
     except Component.DoesNotExist:
         logger.error(f'Component for Component UID : {component_uid} '
                      f'is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component_status.__name__} method')
         raise CustomApiException(404, 'No such component exist')
     except Employee.DoesNotExist:
         logger.error(f'vault for Employee UID : {employee_uid} is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component_status.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_component_status.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
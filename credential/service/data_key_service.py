@@ -0,0 +1,165 @@
+"""This module is used to manage the data encryption keys of the
+organizations. Each organization has one data key which encrypts the item
+values. Data keys are stored wrapped by the master key and are kept
+unwrapped in process memory once loaded
+"""
+import base64
+import logging
+import threading
+
+from cryptography.hazmat.primitives.keywrap import aes_key_unwrap
+from cryptography.hazmat.primitives.keywrap import aes_key_wrap
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError
+from django.db import transaction
+
+from credential.models import DataKey
+
+from utils import encryptor
+
+
+logger = logging.getLogger('credential-manager-logger')
+
+data_keys = {}
+data_keys_lock = threading.RLock()
+
+# organizations whose data key has been generated by the transaction of the
+# thread and is not committed yet
+generated = threading.local()
+
+
+def get_master_key():
+    """used to get the master key which wraps the data keys. The data keys
+    are never wrapped with a fallback key when it is not configured
+    """
+    master_key = getattr(settings, 'CREDENTIAL_MASTER_KEY', None)
+
+    if not master_key:
+        raise ImproperlyConfigured('CREDENTIAL_MASTER_KEY is not set')
+
+    return base64.urlsafe_b64decode(master_key)
+
+
+def wrap_key(data_key):
+    return base64.urlsafe_b64encode(
+        aes_key_wrap(get_master_key(), data_key)
+    ).decode()
+
+
+def unwrap_key(wrapped_key):
+    return aes_key_unwrap(get_master_key(),
+                          base64.urlsafe_b64decode(wrapped_key))
+
+
+def load_data_key(organization_id):
+    """used to load the data key of an organization from the database. The
+    key is generated when the organization does not have one yet. Returns
+    the key and whether it has been created
+    """
+    data_key = DataKey.objects.filter(organization=organization_id).first()
+
+    if data_key is not None:
+        return unwrap_key(data_key.wrapped_key), False
+
+    key = encryptor.generate_key()
+
+    try:
+        with transaction.atomic():
+            DataKey.objects.create(organization_id=organization_id,
+                                   wrapped_key=wrap_key(key))
+        return key, True
+    except IntegrityError:
+        # another process has created the data key in the meantime
+        data_key = DataKey.objects.get(organization=organization_id)
+        return unwrap_key(data_key.wrapped_key), False
+
+
+def get_generated():
+    if not hasattr(generated, 'organization_ids'):
+        generated.organization_ids = set()
+
+    return generated.organization_ids
+
+
+def cache_data_key(organization_id, key):
+    get_generated().discard(organization_id)
+
+    with data_keys_lock:
+        data_keys[organization_id] = key
+
+
+def get_data_key(organization_id):
+    """used to get the unwrapped data key of an organization. A key which
+    has been generated by the current transaction is cached only once it
+    commits, so a rolled back key is never used again. A key committed
+    before is cached at once, so it is loaded once per transaction
+    """
+    organization_id = int(organization_id)
+    key = data_keys.get(organization_id)
+
+    if key is None:
+        with data_keys_lock:
+            key = data_keys.get(organization_id)
+
+            if key is None:
+                key, created = load_data_key(organization_id)
+
+                if created or organization_id in get_generated():
+                    get_generated().add(organization_id)
+                    transaction.on_commit(
+                        lambda: cache_data_key(organization_id, key)
+                    )
+                else:
+                    data_keys[organization_id] = key
+
+    return key
+
+
+def clear_cache():
+    """used to drop the unwrapped data keys from process memory
+    """
+    get_generated().clear()
+
+    with data_keys_lock:
+        data_keys.clear()
+
+
+def encrypt_value(organization_id, message):
+    """used to encrypt an item value with the data key of the organization
+    """
+    return encryptor.encrypt_with_key(message, get_data_key(organization_id))
+
+
+def decrypt_value(organization_id, value, salt=''):
+    """used to decrypt an item value. Values which still have their own key
+    in the salt are decrypted with it, others with the organization data key
+    """
+    if salt:
+        return encryptor.decrypt(value, salt)
+
+    return encryptor.decrypt_with_key(value, get_data_key(organization_id))
+
+
+def encrypt_values(organization_id, messages, workers=None):
+    """used to encrypt many item values of an organization in one batch
+    """
+    return encryptor.encrypt_many(messages, get_data_key(organization_id),
+                                  workers)
+
+
+def decrypt_values(organization_id, values, workers=None):
+    """used to decrypt many (value, salt) pairs of an organization in one
+    batch. Values which still have their own key are decrypted one by one
+    """
+    values = list(values)
+    messages = encryptor.decrypt_many(
+        [value for value, salt in values if not salt],
+        get_data_key(organization_id), workers
+    )
+
+    messages = iter(messages)
+
+    return [encryptor.decrypt(value, salt) if salt else next(messages)
+            for value, salt in values]
@@ -0,0 +1,258 @@
+"""This module is used to maintain the effective vault accesses of the
+employees, which are derived from the organization, project and
+individual vault accesses
+"""
+import functools
+import operator
+
+from django.db import transaction
+from django.db.models import Exists
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.db.models import Subquery
+
+from credential.models import EffectiveVaultAccess
+from credential.models import Vault
+from credential.models import VaultAccess
+from credential.service import access_cache
+
+from employee.models import Employee
+
+from utils.tracing import traced
+
+
+READ = 'READ'
+READ_WRITE = 'READ/WRITE'
+
+# annotation names of the scope granted through each access level
+GRANTING_SCOPES = {
+    'ORGANIZATION': 'organization_scope',
+    'PROJECT': 'project_scope',
+    'INDIVIDUAL': 'individual_scope',
+}
+
+
+def get_active_vault_accesses(organization_id):
+    """used to get the active vault accesses of an active organization on
+    its active vaults
+    """
+    return VaultAccess.objects.filter(
+        organization=organization_id, organization__active=True,
+        vault__active=True,
+        active=True
+    )
+
+
+def get_level_grants(employee_id):
+    """used to get for each access level the condition on which a vault
+    access of that level grants the employee access to its vault. Every
+    access check, listing and effective vault access is derived from it.
+    The employee is an id, or an OuterRef to the employees of a query the
+    vault accesses are a subquery of
+    """
+    if isinstance(employee_id, OuterRef):
+        member_id = OuterRef(employee_id)
+    else:
+        member_id = employee_id
+
+    project_membership = Employee.projects.through.objects.filter(
+        project=OuterRef('project'), employee=member_id,
+    )
+
+    return {
+        'ORGANIZATION': Q(access_level='ORGANIZATION'),
+        'PROJECT': Q(Exists(project_membership), access_level='PROJECT',
+                     project__active=True),
+        'INDIVIDUAL': Q(access_level='INDIVIDUAL', employee=employee_id,
+                        employee__active=True),
+    }
+
+
+def get_granting_vault_accesses(organization_id, employee_id):
+    """used to get the active vault accesses which grant the employee
+    access through organization, project or individual level
+    """
+    return get_active_vault_accesses(organization_id).filter(
+        functools.reduce(operator.or_, get_level_grants(employee_id).values())
+    )
+
+
+def annotate_granting_scopes(vaults, organization_id, employee_id):
+    """used to annotate each vault with the widest scope the employee is
+    granted through organization, project and individual level. A scope is
+    None if the vault is not granted through that level
+    """
+    vault_accesses = get_active_vault_accesses(organization_id).filter(
+        vault=OuterRef('vault_id')
+    )
+
+    # READ/WRITE sorts after READ, so the widest scope comes first
+    return vaults.annotate(**{
+        GRANTING_SCOPES[access_level]: Subquery(
+            vault_accesses.filter(level_grant).order_by('-scope')
+            .values('scope')[:1]
+        )
+        for access_level, level_grant
+        in get_level_grants(employee_id).items()
+    })
+
+
+def merge_scope(scopes, key, scope):
+    """used to keep the widest scope granted for the given key
+    """
+    if scopes.get(key) != READ_WRITE:
+        scopes[key] = scope
+
+
+@traced
+def compute_vault_scopes(vault):
+    """used to compute the scope of every employee who has been granted
+    access to the given vault, the widest scope granted through any level
+    """
+    if not vault.active:
+        return {}
+
+    vault_accesses = get_active_vault_accesses(vault.organization_id).filter(
+        functools.reduce(operator.or_,
+                         get_level_grants(OuterRef('employee_id')).values()),
+        vault=vault.vault_id
+    )
+
+    # READ/WRITE sorts after READ, so the widest scope comes first
+    employee_scopes = Employee.objects.filter(
+        organization=vault.organization_id, active=True
+    ).annotate(
+        scope=Subquery(vault_accesses.order_by('-scope').values('scope')[:1])
+    ).filter(scope__isnull=False).values_list('employee_id', 'scope')
+
+    return dict(employee_scopes)
+
+
+@traced
+def compute_employee_scopes(employee):
+    """used to compute the scope of the given employee for every vault
+    the employee has been granted access to
+    """
+    vault_scopes = {}
+
+    if employee.active:
+        vault_accesses = get_granting_vault_accesses(
+            employee.organization_id, employee.employee_id
+        ).values_list('vault', 'scope')
+
+        for vault_id, scope in vault_accesses:
+            merge_scope(vault_scopes, vault_id, scope)
+
+    return vault_scopes
+
+
+@traced
+@transaction.atomic
+def refresh_vault(vault_id):
+    """used to recompute the effective vault accesses of a vault. The vault
+    row is locked so the refreshes of a vault run one after the other, and
+    a row inserted by a concurrent refresh of an employee is kept
+    """
+    vault = Vault.objects.select_for_update().get(vault_id=vault_id)
+
+    EffectiveVaultAccess.objects.filter(vault=vault_id).delete()
+
+    EffectiveVaultAccess.objects.bulk_create([
+        EffectiveVaultAccess(employee_id=employee_id, vault_id=vault_id,
+                             organization_id=vault.organization_id,
+                             scope=scope)
+        for employee_id, scope in compute_vault_scopes(vault).items()
+    ], ignore_conflicts=True)
+
+    access_cache.invalidate_vault(vault_id)
+
+
+@traced
+@transaction.atomic
+def refresh_employee(employee):
+    """used to recompute the effective vault accesses of an employee. The
+    employee row is locked so the refreshes of an employee run one after
+    the other, and a row inserted by a concurrent refresh of a vault is
+    kept
+    """
+    list(Employee.objects.select_for_update().filter(
+        employee_id=employee.employee_id
+    ).values_list('employee_id', flat=True))
+
+    EffectiveVaultAccess.objects.filter(
+        employee=employee.employee_id
+    ).delete()
+
+    EffectiveVaultAccess.objects.bulk_create([
+        EffectiveVaultAccess(employee_id=employee.employee_id,
+                             vault_id=vault_id,
+                             organization_id=employee.organization_id,
+                             scope=scope)
+        for vault_id, scope in compute_employee_scopes(employee).items()
+    ], ignore_conflicts=True)
+
+    access_cache.invalidate_employee(employee.employee_id)
+
+
+@traced
+def add_new_employees(organization_id, employee_ids):
+    """used to create the effective vault accesses of new employees, who
+    are granted only the organization level vault accesses
+    """
+    vault_scopes = {}
+
+    vault_accesses = VaultAccess.objects.filter(
+        organization=organization_id, organization__active=True,
+        vault__active=True, access_level='ORGANIZATION',
+        active=True
+    ).values_list('vault', 'scope')
+
+    for vault_id, scope in vault_accesses:
+        merge_scope(vault_scopes, vault_id, scope)
+
+    EffectiveVaultAccess.objects.bulk_create([
+        EffectiveVaultAccess(employee_id=employee_id, vault_id=vault_id,
+                             organization_id=organization_id, scope=scope)
+        for employee_id in employee_ids
+        for vault_id, scope in vault_scopes.items()
+    ], batch_size=1000)
+
+
+@traced
+@transaction.atomic
+def refresh_project(project_id):
+    """used to recompute the effective vault accesses of the vaults
+    shared with a project
+    """
+    vault_ids = VaultAccess.objects.filter(
+        project=project_id, access_level='PROJECT', active=True
+    ).values_list('vault', flat=True).distinct()
+
+    for vault_id in vault_ids:
+        refresh_vault(vault_id)
+
+
+@traced
+@transaction.atomic
+def rebuild_organization(organization_id):
+    """used to recompute all effective vault accesses of an organization
+    """
+    EffectiveVaultAccess.objects.filter(
+        organization=organization_id
+    ).delete()
+
+    vaults = Vault.objects.filter(organization=organization_id, active=True)
+
+    effective_vault_accesses = [
+        EffectiveVaultAccess(employee_id=employee_id, vault_id=vault.vault_id,
+                             organization_id=organization_id, scope=scope)
+        for vault in vaults
+        for employee_id, scope in compute_vault_scopes(vault).items()
+    ]
+
+    EffectiveVaultAccess.objects.bulk_create(effective_vault_accesses,
+                                             batch_size=1000)
+
+    access_cache.clear()
+
+    return len(effective_vault_accesses)
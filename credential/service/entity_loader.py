@@ -0,0 +1,199 @@
+"""This module is used to load the organization, employee, vault, component
+and item of a request path with a single joined query. Loaded entities are
+memoized for the rest of the request, so views and services share one fetch
+"""
+import contextlib
+import contextvars
+
+from django.db.models import F
+
+from credential.models import Component
+from credential.models import Item
+from credential.models import Vault
+
+from employee.models import Employee
+
+from organization.models import Organization
+
+from utils.tracing import traced
+
+
+request_entities = contextvars.ContextVar('request_entities', default=None)
+
+EMPLOYEE_FIELD_NAMES = [field.attname
+                        for field in Employee._meta.concrete_fields]
+
+
+class LoadedEntities:
+    """entities referenced by a request path
+    """
+    __slots__ = ('organization', 'employee', 'vault', 'component', 'item')
+
+    def __init__(self, organization, employee, vault, component=None,
+                 item=None):
+        self.organization = organization
+        self.employee = employee
+        self.vault = vault
+        self.component = component
+        self.item = item
+
+
+@contextlib.contextmanager
+def request_scope():
+    """used to memoize the loaded entities until the end of the request
+    """
+    token = request_entities.set({})
+
+    try:
+        yield
+    finally:
+        request_entities.reset(token)
+
+
+@traced
+def load(organization_id, employee_uid, vault_uid, component_uid=None,
+         item_uid=None, inactive_vault=False, inactive_component=False):
+    """used to load the entities of a request path. Raises the DoesNotExist
+    exception of the first entity which can not be found
+    """
+    key = (str(organization_id), str(employee_uid), str(vault_uid),
+           str(component_uid), str(item_uid),
+           inactive_vault, inactive_component)
+
+    memo = request_entities.get()
+
+    if memo is not None and key in memo:
+        return memo[key]
+
+    entities = load_joined(organization_id, employee_uid, vault_uid,
+                           component_uid, item_uid,
+                           inactive_vault, inactive_component)
+
+    if entities is None:
+        entities = load_sequentially(organization_id, employee_uid,
+                                     vault_uid, component_uid, item_uid,
+                                     inactive_vault, inactive_component)
+
+    if memo is not None:
+        memo[key] = entities
+
+    return entities
+
+
+def load_joined(organization_id, employee_uid, vault_uid, component_uid,
+                item_uid, inactive_vault, inactive_component):
+    """used to load all entities with one query, None if any of them
+    can not be found
+    """
+    if item_uid is not None:
+        queryset = Item.objects.filter(
+            item_uid=item_uid, active=True,
+            component__active=True,
+            organization=organization_id
+        )
+        component_path = 'component__'
+    elif component_uid is not None:
+        queryset = Component.objects
+        component_path = ''
+    else:
+        queryset = Vault.objects
+        component_path = None
+
+    if component_path is not None:
+        vault_path = component_path + 'vault__'
+
+        queryset = queryset.filter(**{
+            component_path + 'component_uid': component_uid,
+            component_path + 'organization': organization_id,
+        })
+
+        if not inactive_component:
+            queryset = queryset.filter(**{component_path + 'active': True})
+    else:
+        vault_path = ''
+
+    employee_path = vault_path + 'organization__employees__'
+
+    queryset = queryset.select_related(
+        vault_path + 'organization'
+    ).filter(**{
+        vault_path + 'vault_uid': vault_uid,
+        vault_path + 'organization': organization_id,
+        vault_path + 'organization__active': True,
+        employee_path + 'employee_uid': employee_uid,
+        employee_path + 'active': True,
+    }).annotate(**{
+        'loaded_employee_' + field_name: F(employee_path + field_name)
+        for field_name in EMPLOYEE_FIELD_NAMES
+    })
+
+    if not inactive_vault:
+        queryset = queryset.filter(**{vault_path + 'active': True})
+
+    entity = queryset.first()
+
+    if entity is None:
+        return None
+
+    employee = Employee.from_db(
+        queryset.db, EMPLOYEE_FIELD_NAMES,
+        [getattr(entity, 'loaded_employee_' + field_name)
+         for field_name in EMPLOYEE_FIELD_NAMES]
+    )
+
+    item = None
+    component = None
+
+    if item_uid is not None:
+        item = entity
+        component = item.component
+    elif component_uid is not None:
+        component = entity
+
+    vault = component.vault if component is not None else entity
+
+    return LoadedEntities(vault.organization, employee, vault, component,
+                          item)
+
+
+def load_sequentially(organization_id, employee_uid, vault_uid,
+                      component_uid, item_uid, inactive_vault,
+                      inactive_component):
+    """used to load the entities one by one to find out which of them
+    does not exist
+    """
+    organization = Organization.objects.get(
+        organization_id=organization_id, active=True
+    )
+
+    vault_filters = {} if inactive_vault else {'active': True}
+
+    vault = Vault.objects.get(
+        vault_uid=vault_uid, organization=organization, **vault_filters
+    )
+
+    employee = Employee.objects.get(
+        employee_uid=employee_uid, active=True,
+        organization=organization,
+    )
+
+    component = None
+    item = None
+
+    if component_uid is not None:
+        component_filters = {} if inactive_component else {'active': True}
+
+        component = Component.objects.get(
+            component_uid=component_uid,
+            vault=vault, organization=organization,
+            **component_filters
+        )
+
+    if item_uid is not None:
+        item = Item.objects.get(
+            item_uid=item_uid, active=True,
+            component=component, component__active=True,
+            organization=organization
+        )
+
+    return LoadedEntities(organization, employee, vault, component, item)
@@ -1,7 +1,10 @@
 """"""
 import logging
+import uuid
 
 from credential.models import Vault, Component, Item
+from credential.service import data_key_service
+from credential.service import entity_loader
 from credential.service import user_access_service
 
 from employee.models import Employee
@@ -9,6 +12,7 @@ from employee.models import Employee
 from organization.models import Organization
 
 from utils.api_exceptions import CustomApiException
+from utils.tracing import traced
 
 
 logger = logging.getLogger('credential-manager-logger')
@@ -45,82 +49,116 @@ logger = logging.getLogger('credential-manager-logger')
 #         raise CustomApiException(e.status_code, e.detail)
 
 
+@traced
 def get_item(data, organization_id, employee_uid, vault_uid, component_uid,
              item_uid):
     """used to get item
     """
-    logger.debug(f'Enter {__name__} module, {get_item.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id,
-            active=True
-        )
-
-        vault = Vault.objects.get(
-            vault_uid=vault_uid, active=True,
-            organization=organization
-        )
-
-        employee = Employee.objects.get(
-            employee_uid=employee_uid, active=True,
-            organization=organization,
+        entities = entity_loader.load(
+            organization_id, employee_uid, vault_uid, component_uid,
+            item_uid
         )
 
-        component = Component.objects.get(
-            component_uid=component_uid, active=True,
-            vault=vault, vault__active=True,
-            organization=organization
-        )
+        vault = entities.vault
+        employee = entities.employee
+        item = entities.item
 
-        item = Item.objects.get(
-            item_uid=item_uid, active=True,
-            component=component, component__active=True,
-            organization=organization
+        vault_access = user_access_service.resolve_vault_access(
+            organization_id, employee, vault
         )
 
-        if vault.created_by.employee_id == employee.employee_id \
-                or user_access_service.has_vault_access(organization_id,
-                                                        employee,
-                                                        vault.vault_id):
-            logger.debug(f'Exit {__name__} module, '
-                         f'{get_item.__name__} method')
+        if vault_access.can_read:
             return item
         else:
-            logger.error(f'Exit {__name__} module, '
-                         f'{get_item.__name__} method')
             raise CustomApiException(400, 'You don\'t have access '
                                           'to this vault')
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, {get_item.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error(f'Organization with Organization ID: '
                      f'{organization_id} not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_item.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
     except Employee.DoesNotExist:
         logger.error(f'vault for Employee UID : {employee_uid} is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_item.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
     except Vault.DoesNotExist:
         logger.error(f'Vault for Vault UID : {vault_uid} is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_item.__name__} method')
         raise CustomApiException(404, 'No such vault exist')
     except Component.DoesNotExist:
         logger.error(f'Component for Component UID : {component_uid} '
                      f'is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_item.__name__} method')
         raise CustomApiException(404, 'No such component exist')
     except Item.DoesNotExist:
         logger.error(f'Item for Item UID : {item_uid} '
                      f'is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_item.__name__} method')
         raise CustomApiException(404, 'No such item exist')
+
+
+@traced
+def decrypt_items(organization_id, employee_uid, vault_uid, component_uids):
+    """used to decrypt every active item of the given components of a vault
+    in one batch. Returns a key to value map for each component uid
+    """
+    try:
+        component_uids = {uuid.UUID(str(component_uid))
+                          for component_uid in component_uids}
+    except ValueError:
+        logger.error('Invalid component uid')
+        raise CustomApiException(400, 'Enter valid component uid')
+
+    try:
+        entities = entity_loader.load(organization_id, employee_uid,
+                                      vault_uid)
+
+        vault = entities.vault
+
+        vault_access = user_access_service.resolve_vault_access(
+            organization_id, entities.employee, vault
+        )
+
+        if not vault_access.can_read:
+            raise CustomApiException(400, 'You don\'t have access '
+                                          'to this vault')
+
+        components = dict(Component.objects.filter(
+            component_uid__in=component_uids, vault=vault.vault_id,
+            organization=vault.organization_id, active=True
+        ).values_list('component_id', 'component_uid'))
+
+        if len(components) != len(component_uids):
+            raise Component.DoesNotExist
+
+        items = list(Item.objects.filter(
+            component__in=components.keys(),
+            organization=vault.organization_id, active=True
+        ).order_by('item_id').values_list('component', 'key', 'value',
+                                          'salt'))
+
+        values = data_key_service.decrypt_values(
+            vault.organization_id,
+            [(value, salt) for _, _, value, salt in items]
+        )
+
+        secrets = {str(component_uid): {}
+                   for component_uid in components.values()}
+
+        for (component_id, key, _, _), value in zip(items, values):
+            secrets[str(components[component_id])][key] = value
+
+        return secrets
+    except Organization.DoesNotExist:
+        logger.error(f'Organization with Organization ID: '
+                     f'{organization_id} not exist')
+        raise CustomApiException(400, 'No such organization exist')
+    except Employee.DoesNotExist:
+        logger.error(f'vault for Employee UID : {employee_uid} is not exist')
+        raise CustomApiException(404, 'No such employee exist')
+    except Vault.DoesNotExist:
+        logger.error(f'Vault for Vault UID : {vault_uid} is not exist')
+        raise CustomApiException(404, 'No such vault exist')
+    except Component.DoesNotExist:
+        logger.error('Components of the vault are not exist')
+        raise CustomApiException(404, 'No such component exist')
@@ -4,12 +4,22 @@ accesses for the employees in an organization
 import logging
 
 from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import BooleanField
+from django.db.models import ExpressionWrapper
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.db.models import Subquery
 
 from rest_framework.exceptions import ValidationError
 
+from credential.models import EffectiveVaultAccess
 from credential.models import Vault
 from credential.models import VaultAccess
 from credential.serializers import VaultAccessSerializer
+from credential.service import access_cache
+from credential.service import effective_access_service
+from credential.service import entity_loader
 
 from employee.models import Employee
 
@@ -17,36 +27,35 @@ from organization.models import Organization
 
 from project.models import Project
 
+from utils import metrics
 from utils.api_exceptions import CustomApiException
+from utils.tracing import traced
 
 
 logger = logging.getLogger('credential-manager-logger')
 
+access_decisions = metrics.counter(
+    'credential_vault_access_decisions_total',
+    'Resolved vault access decisions by source and scope',
+    ['source', 'scope']
+)
 
+
+@traced
 def get_vault_accesses(organization_id, vault_id):
     """used to get vault access
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{get_vault_accesses.__name__} method')
-
-    vault_accesses = VaultAccess.objects.filter(
-        organization=organization_id, organization__active=True,
-        vault=vault_id, vault__active=True,
-        active=True
-    )
-
-    logger.debug(f'Exit {__name__} module, '
-                 f'{get_vault_accesses.__name__} method')
+    vault_accesses = effective_access_service.get_active_vault_accesses(
+        organization_id
+    ).filter(vault=vault_id)
 
     return vault_accesses
 
 
+@traced
 def get_organization_vault_access(organization_id, vault_id):
     """used to get organization vault access
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{get_organization_vault_access.__name__} method')
-
     try:
         organization_vault_access = VaultAccess.objects.get(
             organization=organization_id, organization__active=True,
@@ -55,23 +64,16 @@ def get_organization_vault_access(organization_id, vault_id):
             active=True
         )
 
-        logger.debug(f'Exit {__name__} module, '
-                     f'{get_organization_vault_access.__name__} method')
-
         return organization_vault_access
     except VaultAccess.DoesNotExist:
         logger.error('No organization access is provided for this vault')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_organization_vault_access.__name__} method')
         return None
 
 
+@traced
 def get_project_vault_access(organization_id, vault_id, projects):
     """used to get project vault access
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{get_project_vault_access.__name__} method')
-
     try:
         project_ids = [project.project_id for project in projects
                        if project.active]
@@ -84,23 +86,16 @@ def get_project_vault_access(organization_id, vault_id, projects):
             active=True
         )
 
-        logger.debug(f'Exit {__name__} module, '
-                     f'{get_project_vault_access.__name__} method')
-
         return project_vault_access
     except VaultAccess.DoesNotExist:
         logger.error('No project access is given for this vault')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_project_vault_access.__name__} method')
         return None
 
 
+@traced
 def get_individual_vault_access(organization_id, employee_id, vault_id):
     """used to get individual vault access
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{get_individual_vault_access.__name__} method')
-
     try:
         individual_employee_vault_access = VaultAccess.objects.get(
             organization=organization_id, organization__active=True,
@@ -110,105 +105,145 @@ def get_individual_vault_access(organization_id, employee_id, vault_id):
             active=True
         )
 
-        logger.debug(f'Exit {__name__} module, '
-                     f'{get_individual_vault_access.__name__} method')
-
         return individual_employee_vault_access
     except VaultAccess.DoesNotExist:
         logger.error('No individual user access is given for this user')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_individual_vault_access.__name__} method')
         return None
 
 
-def has_vault_access(organization_id, employee, vault_id):
-    """used to check employee has the vault access
+class VaultAccessDecision:
+    """effective scope of an employee on a vault
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{has_vault_access.__name__} method')
+    NONE = 'NONE'
+    READ = 'READ'
+    READ_WRITE = 'READ/WRITE'
 
-    organization_vault_access = get_organization_vault_access(
-        organization_id, vault_id)
+    __slots__ = ('scope', 'is_owner')
 
-    project_vault_access = get_project_vault_access(
-        organization_id, vault_id, employee.projects.all())
+    def __init__(self, scope, is_owner=False):
+        self.scope = scope
+        self.is_owner = is_owner
 
-    individual_vault_access = get_individual_vault_access(
-        organization_id, employee.employee_id, vault_id)
+    @property
+    def can_read(self):
+        return self.scope != VaultAccessDecision.NONE
 
-    if organization_vault_access is not None \
-            or project_vault_access is not None \
-            or individual_vault_access is not None:
+    @property
+    def can_write(self):
+        return self.scope == VaultAccessDecision.READ_WRITE
 
-        logger.debug('The given user has access to this vault')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{has_vault_access.__name__} method')
-        return True
-    else:
-        logger.debug('The given user has no access to this vault')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{has_vault_access.__name__} method')
-        return False
+    def __repr__(self):
+        return f'VaultAccessDecision(scope={self.scope!r}, ' \
+               f'is_owner={self.is_owner!r})'
 
 
-def can_update_vault(organization_id, employee, vault_id):
-    """used to check employee has the vault update access
+def get_effective_vault_accesses(employee):
+    """used to get the effective vault accesses of an employee
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{has_vault_access.__name__} method')
+    return EffectiveVaultAccess.objects.filter(
+        employee=employee.employee_id
+    )
 
-    organization_vault_access = get_organization_vault_access(
-        organization_id, vault_id)
 
-    project_vault_access = get_project_vault_access(
-        organization_id, vault_id, employee.projects.all())
+@traced
+def resolve_vault_access(organization_id, employee, vault):
+    """used to resolve the effective access of an employee on a vault
+    with a single lookup on the effective vault accesses
+    """
+    if vault.created_by_id == employee.employee_id:
+        access_decisions.inc('owner', VaultAccessDecision.READ_WRITE)
+        return VaultAccessDecision(VaultAccessDecision.READ_WRITE,
+                                   is_owner=True)
 
-    individual_vault_access = get_individual_vault_access(
-        organization_id, employee.employee_id, vault_id)
+    cache = access_cache.access_decision_cache
 
-    if (organization_vault_access is not None
-            and organization_vault_access.scope == 'READ/WRITE') \
-        or (project_vault_access is not None
-            and project_vault_access.scope == 'READ/WRITE') \
-        or (individual_vault_access is not None
-            and individual_vault_access.scope == 'READ/WRITE'):
+    decision = cache.get(organization_id, employee.employee_id,
+                         vault.vault_id)
 
-        logger.debug('The given user has access to edit this vault')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{has_vault_access.__name__} method')
-        return True
+    if decision is not None:
+        access_decisions.inc('cache', decision.scope)
     else:
-        logger.debug('The given user has no access to edit this vault')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{has_vault_access.__name__} method')
-        return False
+        versions = cache.versions(employee.employee_id, vault.vault_id)
+
+        scopes = get_effective_vault_accesses(employee).filter(
+            vault=vault.vault_id, organization=organization_id
+        ).values_list('scope', flat=True)[:1]
+
+        decision = VaultAccessDecision(
+            scopes[0] if scopes else VaultAccessDecision.NONE
+        )
+
+        cache.set(organization_id, employee.employee_id, vault.vault_id,
+                  decision, versions)
+
+        access_decisions.inc('database', decision.scope)
+
+    return decision
+
+
+def annotate_vault_access(vaults, organization_id, employee):
+    """used to annotate a vault queryset with the ownership and the
+    effective scope of the employee
+    """
+    effective_vault_accesses = get_effective_vault_accesses(employee).filter(
+        organization=organization_id, vault=OuterRef('vault_id')
+    )
+
+    return vaults.annotate(
+        is_owner=ExpressionWrapper(Q(created_by=employee.employee_id),
+                                   output_field=BooleanField()),
+        effective_scope=Subquery(
+            effective_vault_accesses.values('scope')[:1]
+        ),
+    )
+
+
+def get_annotated_scope(is_owner, effective_scope):
+    """used to get the scope from the annotated ownership and effective scope
+    """
+    if is_owner:
+        return VaultAccessDecision.READ_WRITE
+
+    return effective_scope or VaultAccessDecision.NONE
 
 
+@traced
+def get_vault_scopes(organization_id, employee, vault_ids):
+    """used to get the effective scope of an employee for each of the
+    given vaults in a single query
+    """
+    vault_ids = set(vault_ids)
+    vault_scopes = dict.fromkeys(vault_ids, VaultAccessDecision.NONE)
+
+    if vault_ids:
+        vaults = annotate_vault_access(
+            Vault.objects.filter(organization=organization_id,
+                                 vault_id__in=vault_ids),
+            organization_id, employee
+        ).values_list('vault_id', 'is_owner', 'effective_scope')
+
+        for vault_id, is_owner, effective_scope in vaults:
+            vault_scopes[vault_id] = get_annotated_scope(is_owner,
+                                                         effective_scope)
+
+    return vault_scopes
+
+
+@traced
+@transaction.atomic
 def create_vault_access(organization_id, employee_uid, vault_uid, data):
     """used to create vault access for employees
     """
-    logger.info(f'Enter {__name__} module, '
-                f'{create_vault_access.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id, active=True
-        )
-
-        creating_employee = Employee.objects.get(
-            employee_uid=employee_uid, active=True,
-            organization=organization, organization__active=True,
-        )
+        entities = entity_loader.load(organization_id, employee_uid,
+                                      vault_uid)
 
-        vault = Vault.objects.get(
-            vault_uid=vault_uid, active=True,
-            organization=organization, organization__active=True,
-        )
+        organization = entities.organization
+        creating_employee = entities.employee
+        vault = entities.vault
 
-        if creating_employee.employee_id != vault.created_by.employee_id:
+        if creating_employee.employee_id != vault.created_by_id:
             logger.error('Only vault owner can give access')
-            logger.error(f'Exit {__name__} module, '
-                         f'{create_vault_access.__name__} method')
             raise CustomApiException(400, 'Only vault owner can give access')
 
         access_level = data['access_level']
@@ -219,7 +254,6 @@ def create_vault_access(organization_id, employee_uid, vault_uid, data):
         vault_accesses = get_vault_accesses(organization_id, vault.vault_id)
 
         if access_level == 'ORGANIZATION':
-
             organization_vault_access = get_organization_vault_access(
                 organization_id, vault.vault_id)
 
@@ -234,7 +268,6 @@ def create_vault_access(organization_id, employee_uid, vault_uid, data):
                 vault_access = create_organization_vault_access(
                     organization_id, creating_employee, vault.vault_id, scope)
         elif access_level == 'PROJECT':
-
             project = Project.objects.get(
                 project_id=data['project'], active=True,
                 organization=organization, organization__active=True,
@@ -277,7 +310,8 @@ def create_vault_access(organization_id, employee_uid, vault_uid, data):
                     if vault_access.access_level == 'PROJECT' \
                             or vault_access.access_level == 'ORGANIZATION'\
                             or (vault_access.access_level == 'INDIVIDUAL'
-                                and vault_access.employee.email == email
+                                and vault_access.employee_id
+                                == employee.employee_id
                                 and vault_access.scope != scope):
                         revoke_vault_access(vault_access)
 
@@ -287,59 +321,42 @@ def create_vault_access(organization_id, employee_uid, vault_uid, data):
 
         if vault_access is None:
             logger.error('Vault access creation failure')
-            logger.error(f'Exit {__name__} module, '
-                         f'{create_vault_access.__name__} method')
             raise CustomApiException(500, 'Vault access creation failure')
 
-        vault_access_serializer = VaultAccessSerializer(vault_access)
+        effective_access_service.refresh_vault(vault.vault_id)
 
-        logger.info(f'Exit {__name__} module, '
-                    f'{create_vault_access.__name__} method')
+        vault_access_serializer = VaultAccessSerializer(vault_access)
 
         return vault_access_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('The entered details are not valid')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_vault_access.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_vault_access.__name__} method')
         raise CustomApiException(400, message)
     except Vault.DoesNotExist:
         logger.error(f'Vault for Vault UID : {vault_uid} does not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_vault_access.__name__} method')
         raise CustomApiException(404, 'No such vault exist')
     except Employee.DoesNotExist:
         logger.error(f'Employee for Employee UID : {employee_uid} '
                      f'does not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_vault_access.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
     except Project.DoesNotExist:
         logger.error(f'Project does not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_vault_access.__name__} method')
         raise CustomApiException(404, 'No such project exist')
     except Organization.DoesNotExist:
         logger.error(f'Organization with Organization ID: '
                      f'{organization_id} not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_vault_access.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
 
 
+@traced
 def create_individual_vault_access(organization_id, creating_employee, email,
                                    vault_id, scope):
     """used to create vault access for individual employee
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{create_individual_vault_access.__name__} method')
-
     try:
         employee = Employee.objects.get(
             email=email, active=True,
@@ -356,29 +373,20 @@ def create_individual_vault_access(organization_id, creating_employee, email,
             scope=scope
         )
 
-        logger.debug(f'Enter {__name__} module, '
-                     f'{create_individual_vault_access.__name__} method')
-
         return vault_access
     except Employee.DoesNotExist:
         logger.error('No such employee exist with the given email address')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_individual_vault_access.__name__} method')
         return None
     except IntegrityError:
         logger.error('Vault access creation failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_individual_vault_access.__name__} method')
         return None
 
 
+@traced
 def create_project_vault_access(organization_id, creating_employee, project_id,
                                 vault_id, scope):
     """used to create vault access for project employee
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{create_project_vault_access.__name__} method')
-
     try:
         project = Project.objects.get(
             project_id=project_id, active=True,
@@ -396,29 +404,21 @@ def create_project_vault_access(organization_id, creating_employee, project_id,
         )
 
         logger.debug('Vault access creation successful')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{create_project_vault_access.__name__} method')
 
         return vault_access
     except Project.DoesNotExist:
         logger.error(f'Project for Project ID : {project_id} does not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_project_vault_access.__name__} method')
         raise CustomApiException(404, 'No such project exist')
     except IntegrityError:
         logger.error('Vault access creation failure')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{create_project_vault_access.__name__} method')
         return None
 
 
+@traced
 def create_organization_vault_access(organization_id, creating_employee,
                                      vault_id, scope):
     """used to create vault access for organization employees
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{create_organization_vault_access.__name__} method')
-
     try:
         vault_access = VaultAccess.objects.create(
             organization_id=organization_id,
@@ -428,38 +428,24 @@ def create_organization_vault_access(organization_id, creating_employee,
             scope=scope
         )
 
-        logger.debug(f'Exit {__name__} module, '
-                     f'{create_organization_vault_access.__name__} method')
-
         return vault_access
     except IntegrityError:
         logger.error('Vault access creation failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_organization_vault_access.__name__} method')
         return None
 
 
+@traced
+@transaction.atomic
 def remove_vault_access(organization_id, employee_uid, vault_uid):
     """used to remove vault access of a vault
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{remove_vault_access.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id, active=True
+        entities = entity_loader.load(
+            organization_id, employee_uid, vault_uid
         )
 
-        vault_owner = Employee.objects.get(
-            employee_uid=employee_uid,
-            active=True,
-            organization=organization_id,
-        )
-
-        vault = Vault.objects.get(
-            vault_uid=vault_uid, active=True,
-            organization=organization
-        )
+        vault_owner = entities.employee
+        vault = entities.vault
 
         vault_accesses = VaultAccess.objects.filter(
             organization=organization_id,
@@ -469,53 +455,40 @@ def remove_vault_access(organization_id, employee_uid, vault_uid):
         )
 
         for vault_access in vault_accesses:
-            if vault_owner.employee_id != vault_access.created_by.employee_id:
+            if vault_owner.employee_id != vault_access.created_by_id:
                 logger.error('Only vault owner can remove access')
                 raise CustomApiException(400,
                                          'Only vault owner can remove access')
 
             revoke_vault_access(vault_access)
 
+        effective_access_service.refresh_vault(vault.vault_id)
+
         vault_access_serializer = VaultAccessSerializer(vault_accesses,
                                                         many=True)
 
         logger.debug('Vault accesses removed successfully')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{remove_vault_access.__name__} method')
 
         return vault_access_serializer.data
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{remove_vault_access.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
     except Vault.DoesNotExist:
         logger.error('No such vault exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{remove_vault_access.__name__} method')
         raise CustomApiException(404, 'No such vault exist')
     except Employee.DoesNotExist:
         logger.error('No such employee exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{remove_vault_access.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
 
 
+@traced
 def revoke_vault_access(vault_access):
     """used to remove vault access given to a vault
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{revoke_vault_access.__name__} method')
-
         vault_access.active = False
-        vault_access.updated_by = vault_access.created_by
+        vault_access.updated_by_id = vault_access.created_by_id
         vault_access.save()
-
-        logger.debug(f'Exit {__name__} module, '
-                     f'{revoke_vault_access.__name__} method')
     except IntegrityError:
         logger.error('Vault access removal failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{revoke_vault_access.__name__} method')
         raise CustomApiException(500, 'Vault access removal failure')
@@ -3,6 +3,8 @@
 import logging
 
 from django.db import transaction
+from django.db.models import Q
+from django.db.models import prefetch_related_objects
 from rest_framework.exceptions import ValidationError
 
 from credential.models import Vault
@@ -10,6 +12,8 @@ from credential.models import Vault
 from credential.serializers import VaultSerializer
 from credential.serializers import VaultOnlySerializer
 from credential.serializers import VaultAccessSerializer
+from credential.service import effective_access_service
+from credential.service import entity_loader
 from credential.service import user_access_service
 
 from employee.models import Employee
@@ -18,18 +22,20 @@ from organization.models import Organization
 
 from project.models import Project
 
+from utils import pagination
 from utils.api_exceptions import CustomApiException
+from utils.fast_serializer import get_fast_serializer
+from utils.tracing import traced
 
 
 logger = logging.getLogger('credential-manager-logger')
 
 
+@traced
 @transaction.atomic
 def create_vault(organization_id, employee_uid, data):
     """used to create vault in an organization
     """
-    logger.debug(f'Enter {__name__} module, {create_vault.__name__} method')
-
     try:
         organization = Organization.objects.get(
             organization_id=organization_id, active=True
@@ -75,44 +81,62 @@ def create_vault(organization_id, employee_uid, data):
             vault_access_serializer.save()
             logger.debug('Vault access creation successful')
 
-        logger.debug(f'Exit {__name__} module, {create_vault.__name__} method')
+            effective_access_service.refresh_vault(
+                vault_serializer.data['vault_id']
+            )
 
         return vault_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Vault creation failure. Enter valid details')
-        logger.error(f'Exit {__name__} module, {create_vault.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_vault.__name__} method')
         raise CustomApiException(400, message)
     except Employee.DoesNotExist:
         logger.error('Vault creation failure. No such employee exist')
-        logger.error(f'Exit {__name__} module, {create_vault.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
     except Project.DoesNotExist:
         logger.error('Vault creation failure. No such project exist')
-        logger.error(f'Exit {__name__} module, {create_vault.__name__} method')
         raise CustomApiException(404, 'No such project exist')
     except Organization.DoesNotExist:
         logger.error('Vault creation failure. No such organization exist')
-        logger.error(f'Exit {__name__} module, {create_vault.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
 
 
-def get_vaults(organization_id, data):
-    """used to get all vaults from an organization
+def get_organization_employee(organization_id, employee_uid):
+    """used to get an active employee together with the organization in one
+    query. The organization is only looked up on its own to tell which of
+    them does not exist
     """
-    logger.debug(f'Enter {__name__} module, {get_vaults.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id, active=True,
-            email=data['email']
+        return Employee.objects.select_related('organization').get(
+            employee_uid=employee_uid, active=True,
+            organization=organization_id, organization__active=True,
         )
+    except Employee.DoesNotExist:
+        Organization.objects.get(organization_id=organization_id,
+                                 active=True)
+        raise
+
+
+@traced
+def get_vaults(organization_id, data, employee_uid=None, page=None):
+    """used to get all vaults from an organization. If an employee is given,
+    only the vaults accessible to the employee are returned with the scope.
+    The vaults are paginated by vault id when a page is given
+    """
+    try:
+        if employee_uid is None:
+            organization = Organization.objects.get(
+                organization_id=organization_id, active=True,
+                email=data['email']
+            )
+        else:
+            employee = get_organization_employee(organization_id,
+                                                 employee_uid)
+            organization = employee.organization
 
         vaults = Vault.objects.filter(
             organization=organization.organization_id,
@@ -120,105 +144,104 @@ def get_vaults(organization_id, data):
             active=True
         )
 
-        vault_serializer = VaultOnlySerializer(vaults, many=True)
+        vault_serializer = get_fast_serializer(VaultOnlySerializer)
 
-        logger.debug(f'Exit {__name__} module, {get_vaults.__name__} method')
+        if employee_uid is None:
+            return pagination.paginate(vaults, 'vault_id', page,
+                                       vault_serializer.serialize_queryset)
 
-        return vault_serializer.data
+        vaults = user_access_service.annotate_vault_access(
+            vaults, organization.organization_id, employee
+        ).filter(Q(is_owner=True) | Q(effective_scope__isnull=False))
+
+        def serialize(accessible_vaults):
+            rows = list(accessible_vaults.values(
+                *vault_serializer.value_names, 'is_owner', 'effective_scope'
+            ))
+
+            response_vaults = vault_serializer.serialize_rows(rows)
+
+            for response_vault, row in zip(response_vaults, rows):
+                response_vault['scope'] \
+                    = user_access_service.get_annotated_scope(
+                        row['is_owner'], row['effective_scope']
+                    )
+
+            return response_vaults
+
+        return pagination.paginate(vaults, 'vault_id', page, serialize)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_vaults.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, {get_vaults.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
+    except Employee.DoesNotExist:
+        logger.error(f'Employee for Employee UID : '
+                     f'{employee_uid} is not exist')
+        raise CustomApiException(404, 'No such employee exist')
 
 
+@traced
 def get_vault(organization_id, employee_uid, vault_uid):
     """used to get vault from an organization
     """
-    logger.debug(f'Enter {__name__} module, {get_vault.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id, active=True
+        entities = entity_loader.load(
+            organization_id, employee_uid, vault_uid
         )
 
-        vault = Vault.objects.get(
-            vault_uid=vault_uid, active=True,
-            organization=organization,
-        )
+        vault = entities.vault
+        employee = entities.employee
 
-        employee = Employee.objects.get(
-            employee_uid=employee_uid, active=True,
-            organization=organization,
+        vault_access = user_access_service.resolve_vault_access(
+            organization_id, employee, vault
         )
 
-        if vault.created_by.employee_id == employee.employee_id \
-                or user_access_service.has_vault_access(organization_id,
-                                                        employee,
-                                                        vault.vault_id):
-            vault_serializer = VaultSerializer(vault)
-            logger.debug(f'Exit {__name__} module, '
-                         f'{get_vault.__name__} method')
-            return vault_serializer.data
+        if vault_access.can_read:
+            prefetch_related_objects([vault], *VaultSerializer.prefetch_fields)
+            vault_serializer = get_fast_serializer(VaultSerializer)
+            return vault_serializer.serialize(vault)
         else:
-            logger.error(f'Exit {__name__} module, '
-                         f'{get_vault.__name__} method')
             raise CustomApiException(400, 'You don\'t have access '
                                           'to this vault')
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_vault.__name__} method')
         raise CustomApiException(400, message)
     except Vault.DoesNotExist:
         logger.error(f'vault for Vault UID : {vault_uid} is not exist')
-        logger.error(f'Exit {__name__} module, {get_vault.__name__} method')
         raise CustomApiException(404, 'No such vault exist')
     except Employee.DoesNotExist:
         logger.error(f'Employee for Employee UID : '
                      f'{employee_uid} is not exist')
-        logger.error(f'Exit {__name__} module, {get_vault.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, {get_vault.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
     except CustomApiException as e:
         logger.error('Enter valid credentials')
-        logger.error(f'Exit {__name__} module, {get_vault.__name__} method')
         raise CustomApiException(e.status_code, e.detail)
 
 
+@traced
 def update_vault(organization_id, employee_uid, vault_uid, data):
     """used to update vault details
     """
-    logger.debug(f'Enter {__name__} module, {update_vault.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id, active=True
+        entities = entity_loader.load(
+            organization_id, employee_uid, vault_uid
         )
 
-        vault = Vault.objects.get(
-            vault_uid=vault_uid,
-            organization=organization,
-            active=True
-        )
+        vault = entities.vault
+        employee = entities.employee
 
-        employee = Employee.objects.get(
-            employee_uid=employee_uid, active=True,
-            organization=organization,
+        vault_access = user_access_service.resolve_vault_access(
+            organization_id, employee, vault
         )
 
-        if vault.created_by.employee_id == employee.employee_id \
-            or user_access_service.can_update_vault(organization_id, employee,
-                                                    vault.vault_id):
+        if vault_access.can_write:
             data['updated_by'] = employee.employee_id
             vault_serializer = VaultSerializer(vault, data=data, partial=True)
             vault_serializer.is_valid(raise_exception=True)
@@ -228,98 +251,67 @@ def update_vault(organization_id, employee_uid, vault_uid, data):
             vault.pop('components')
 
             logger.debug('Vault details updated successfully')
-            logger.debug(f'Exit {__name__} module, '
-                         f'{update_vault.__name__} method')
 
             return vault
         else:
             logger.error('Vault update failure. '
                          'User don\'t have vault update access')
-            logger.error(f'Exit {__name__} module, '
-                         f'{update_vault.__name__} method')
             raise CustomApiException(400,
                                      'You don\'t have vault update access')
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Valid details not provided')
-        logger.error(f'Exit {__name__} module, {update_vault.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_vault.__name__} method')
         raise CustomApiException(400, message)
     except Vault.DoesNotExist:
         logger.error(f'Vault for Vault UID : {vault_uid} is not exist')
-        logger.error(f'Exit {__name__} module, {update_vault.__name__} method')
         raise CustomApiException(404, 'No such vault exist')
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, {update_vault.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
     except Employee.DoesNotExist:
         logger.error(f'vault for Employee UID : {employee_uid} is not exist')
-        logger.error(f'Exit {__name__} module, {update_vault.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
 
 
+@traced
+@transaction.atomic
 def update_vault_status(organization_id, employee_uid, vault_uid, data):
     """used to update active status
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{update_vault_status.__name__} method')
-
     try:
-        organization = Organization.objects.get(
-            organization_id=organization_id, active=True
-        )
-
-        vault = Vault.objects.get(
-            vault_uid=vault_uid,
-            organization=organization,
+        entities = entity_loader.load(
+            organization_id, employee_uid, vault_uid, inactive_vault=True
         )
 
-        employee = Employee.objects.get(
-            employee_uid=employee_uid, active=True,
-            organization=organization,
-        )
+        vault = entities.vault
+        employee = entities.employee
 
-        if vault.created_by.employee_id == employee.employee_id:
+        if vault.created_by_id == employee.employee_id:
             vault.active = not vault.active
             vault.save()
+            effective_access_service.refresh_vault(vault.vault_id)
             vault_serializer = VaultOnlySerializer(vault)
-            logger.debug(f'Exit {__name__} module, '
-                         f'{update_vault_status.__name__} method')
             return vault_serializer.data
         else:
-            logger.error(f'Exit {__name__} module, '
-                         f'{update_vault_status.__name__} method')
             raise CustomApiException(400, 'Only vault owner can update status')
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_vault_status.__name__} method')
         raise CustomApiException(400, message)
     except Vault.DoesNotExist:
         logger.error(f'vault for Vault UID : {vault_uid} is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_vault_status.__name__} method')
         raise CustomApiException(404, 'No such vault exist')
     except Employee.DoesNotExist:
         logger.error(f'Employee for Employee UID : '
                      f'{employee_uid} is not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_vault_status.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_vault_status.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
     except CustomApiException as e:
         logger.error('Enter valid credentials')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_vault_status.__name__} method')
         raise CustomApiException(e.status_code, e.detail)
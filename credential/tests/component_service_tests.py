@@ -0,0 +1,156 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from credential.models import Component
+from credential.models import Item
+from credential.models import Vault
+from credential.service import component_service
+from credential.service import data_key_service
+from employee.models import Employee
+from organization.models import Organization
+from utils.api_exceptions import CustomApiException
+
+
+class ComponentServiceTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.employee = Employee.objects.create(
+            name='sibi',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.vault = Vault.objects.create(
+            name='Organization Vault',
+            description='Organization Vault',
+            organization=cls.organization,
+            created_by=cls.employee
+        )
+
+    def setUp(self):
+        data_key_service.clear_cache()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            data_key_service.get_data_key(self.organization.organization_id)
+
+    def decrypt(self, item):
+        return data_key_service.decrypt_value(item.organization_id,
+                                              item.value, item.salt)
+
+    def create_component(self, name, items):
+        payload = {
+            'name': name,
+            'description': name,
+            'items': items,
+        }
+
+        with CaptureQueriesContext(connection) as context:
+            component = component_service.create_component(
+                self.organization.organization_id,
+                self.employee.employee_uid, self.vault.vault_uid, payload
+            )
+
+        return component, len(context.captured_queries)
+
+    def test_create_component(self):
+        items = [{'key': f'key{index:04}', 'value': f'value{index}'}
+                 for index in range(50)]
+
+        component, queries = self.create_component('Environment', items)
+        _, small_queries = self.create_component('Database', items[:2])
+
+        self.assertEqual(queries, small_queries)
+        self.assertEqual(len(component.get('items')), 50)
+
+        item = Item.objects.get(key='key0007', component__name='Environment')
+
+        self.assertEqual(self.decrypt(item), 'value7')
+        self.assertEqual(item.created_by_id, self.employee.employee_id)
+        self.assertEqual(item.organization_id,
+                         self.organization.organization_id)
+
+    def test_create_component_with_invalid_password(self):
+        items = [
+            {'key': 'username', 'value': 'admin'},
+            {'key': 'password', 'value': 'admin'},
+        ]
+
+        with self.assertRaises(CustomApiException):
+            self.create_component('Database', items)
+
+        self.assertFalse(Component.objects.exists())
+        self.assertFalse(Item.objects.exists())
+
+    def test_update_component(self):
+        items = [{'key': f'key{index:04}', 'value': f'value{index}'}
+                 for index in range(20)]
+
+        component, _ = self.create_component('Environment', items)
+
+        stored_items = {item.key: item for item in Item.objects.all()}
+
+        payload = {
+            'name': 'Environment',
+            'items': [
+                {'item_id': item['item_id'], 'key': item['key'],
+                 'value': 'changed' if item['key'] in ('key0003', 'key0004')
+                 else f'value{int(item["key"][3:])}'}
+                for item in component.get('items')
+            ] + [{'key': 'key0100', 'value': 'value100'}],
+        }
+
+        with CaptureQueriesContext(connection) as context, \
+                mock.patch.object(data_key_service, 'encrypt_values',
+                                  wraps=data_key_service.encrypt_values) \
+                as encrypt_values:
+            component_service.update_component(
+                self.organization.organization_id,
+                self.employee.employee_uid, self.vault.vault_uid,
+                component.get('component_uid'), payload
+            )
+
+        # the changed values and the new values are encrypted in batches
+        self.assertEqual([len(call.args[1])
+                          for call in encrypt_values.call_args_list], [2, 1])
+
+        updates = [query for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE "cm_item"')]
+        inserts = [query for query in context.captured_queries
+                   if query['sql'].startswith('INSERT INTO "cm_item"')]
+
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(len(inserts), 1)
+
+        for item in Item.objects.all():
+            if item.key in ('key0003', 'key0004'):
+                self.assertEqual(self.decrypt(item), 'changed')
+            elif item.key == 'key0100':
+                self.assertEqual(self.decrypt(item), 'value100')
+            else:
+                self.assertEqual(item.value, stored_items[item.key].value)
+                self.assertEqual(item.updated_at,
+                                 stored_items[item.key].updated_at)
+
+    def test_update_component_with_unknown_item(self):
+        component, _ = self.create_component(
+            'Environment', [{'key': 'username', 'value': 'admin'}]
+        )
+
+        payload = {'items': [{'item_id': 100, 'value': 'admin'}]}
+
+        with self.assertRaises(CustomApiException):
+            component_service.update_component(
+                self.organization.organization_id,
+                self.employee.employee_uid, self.vault.vault_uid,
+                component.get('component_uid'), payload
+            )
@@ -0,0 +1,145 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TransactionTestCase
+
+from credential.models import Component
+from credential.models import Item
+from credential.models import Vault
+from credential.service import data_key_service
+from employee.models import Employee
+from organization.models import Organization
+from project.models import Project
+
+
+class CopyImportTest(TransactionTestCase):
+
+    def setUp(self):
+        data_key_service.clear_cache()
+
+        self.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        self.owner = Employee.objects.create(
+            name='sibi dhanapal',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=self.organization,
+            created_by=self.organization
+        )
+
+        self.project = Project.objects.create(
+            name='Ulab Systems',
+            email='ulabsystems@ideas2it.com',
+            description='Ulab Systems',
+            organization=self.organization,
+            created_by=self.organization
+        )
+
+        self.vault = Vault.objects.create(
+            name='Organization Vault',
+            description='Organization Vault',
+            organization=self.organization,
+            created_by=self.owner
+        )
+
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+        data_key_service.clear_cache()
+
+    def write(self, name, lines):
+        path = os.path.join(self.directory.name, name)
+
+        with open(path, 'w') as csv_file:
+            csv_file.write('\n'.join(lines) + '\n')
+
+        return path
+
+    def test_copy_import(self):
+        organization_id = self.organization.organization_id
+        values = data_key_service.encrypt_values(
+            organization_id, ['first', 'second', 'third']
+        )
+
+        employees = self.write('employees.csv', [
+            'employee_id,name,email,password,organization_id,created_by',
+        ] + [
+            f'{100 + index},employee {index},employee{index}@ideas2it.com,'
+            f'hash,{organization_id},{organization_id}'
+            for index in range(3)
+        ])
+
+        employee_projects = self.write('employee_projects.csv', [
+            'employee_id,project_id',
+            f'100,{self.project.project_id}',
+            f'101,{self.project.project_id}',
+        ])
+
+        components = self.write('components.csv', [
+            'component_id,name,description,vault_id,organization_id,'
+            'created_by,active',
+            f'50,Database,,{self.vault.vault_id},{organization_id},100,true',
+        ])
+
+        items = self.write('items.csv', [
+            'key,value,component_id,organization_id,created_by,updated_by',
+        ] + [
+            f'key{index},{value},50,{organization_id},100,'
+            for index, value in enumerate(values)
+        ])
+
+        out = StringIO()
+        call_command('copy_import', employees=employees,
+                     employee_projects=employee_projects,
+                     components=components, items=items, batch_size=2,
+                     stdout=out)
+
+        self.assertIn('Loaded 3 rows into cm_employee', out.getvalue())
+        self.assertIn('Loaded 3 rows into cm_item', out.getvalue())
+
+        employee = Employee.objects.get(employee_id=100)
+
+        self.assertTrue(employee.active)
+        self.assertIsNotNone(employee.employee_uid)
+        self.assertIsNotNone(employee.created_at)
+        self.assertEqual(list(employee.projects.all()), [self.project])
+
+        component = Component.objects.get(component_id=50)
+
+        self.assertEqual(component.description, '')
+        self.assertIsNone(component.updated_by_id)
+
+        items = Item.objects.filter(component=50).order_by('key')
+
+        self.assertEqual(len({item.item_uid for item in items}), 3)
+        self.assertEqual(
+            [data_key_service.decrypt_value(organization_id, item.value,
+                                            item.salt) for item in items],
+            ['first', 'second', 'third']
+        )
+
+        # the next ORM insert continues after the loaded ids
+        new_employee = Employee.objects.create(
+            name='sasi kumar',
+            email='sasi@ideas2it.com', password='sasi',
+            organization=self.organization,
+            created_by=self.organization
+        )
+
+        self.assertGreater(new_employee.employee_id, 102)
+
+    def test_invalid_file(self):
+        employees = self.write('employees.csv', ['employee_id,nickname'])
+
+        with self.assertRaises(CommandError):
+            call_command('copy_import', employees=employees,
+                         stdout=StringIO())
+
+        with self.assertRaises(CommandError):
+            call_command('copy_import', stdout=StringIO())
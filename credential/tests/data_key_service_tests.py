@@ -0,0 +1,197 @@
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.db import transaction
+from django.test import TestCase
+from django.test import override_settings
+
+from credential.models import Component
+from credential.models import DataKey
+from credential.models import Item
+from credential.models import Vault
+from credential.service import data_key_service
+from employee.models import Employee
+from organization.models import Organization
+from utils import encryptor
+
+
+class DataKeyServiceTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.other_organization = Organization.objects.create(
+            name='ideas2it labs',
+            email='admin@ideas2itlabs.com', password='admin',
+        )
+
+        cls.employee = Employee.objects.create(
+            name='sibi',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.vault = Vault.objects.create(
+            name='Organization Vault',
+            description='Organization Vault',
+            organization=cls.organization,
+            created_by=cls.employee
+        )
+
+        cls.component = Component.objects.create(
+            name='Database',
+            description='Database',
+            vault=cls.vault,
+            organization=cls.organization,
+            created_by=cls.employee
+        )
+
+    def setUp(self):
+        data_key_service.clear_cache()
+
+    def test_encrypt_value(self):
+        organization_id = self.organization.organization_id
+
+        token = data_key_service.encrypt_value(organization_id, 'admin\0')
+
+        self.assertEqual(
+            data_key_service.decrypt_value(organization_id, token), 'admin\0'
+        )
+
+        data_key = DataKey.objects.get(organization=organization_id)
+
+        self.assertEqual(data_key_service.unwrap_key(data_key.wrapped_key),
+                         data_key_service.get_data_key(organization_id))
+
+        data_key_service.clear_cache()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(
+                data_key_service.decrypt_value(organization_id, token),
+                'admin\0'
+            )
+
+        with self.assertNumQueries(0):
+            data_key_service.get_data_key(organization_id)
+
+        self.assertIsNone(data_key_service.decrypt_value(
+            self.other_organization.organization_id, token
+        ))
+
+    def test_generated_key_cached_on_commit(self):
+        organization_id = self.organization.organization_id
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            data_key_service.get_data_key(organization_id)
+
+        self.assertNotIn(organization_id, data_key_service.data_keys)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertIn(organization_id, data_key_service.data_keys)
+
+    def test_rolled_back_key_not_cached(self):
+        organization_id = self.organization.organization_id
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    key = data_key_service.get_data_key(organization_id)
+
+                    # found in the uncommitted transaction
+                    self.assertEqual(
+                        data_key_service.get_data_key(organization_id), key
+                    )
+
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertNotIn(organization_id, data_key_service.data_keys)
+        self.assertFalse(
+            DataKey.objects.filter(organization=organization_id).exists()
+        )
+        self.assertNotEqual(data_key_service.get_data_key(organization_id),
+                            key)
+
+    def test_existing_key_cached_in_transaction(self):
+        organization_id = self.organization.organization_id
+
+        with self.captureOnCommitCallbacks(execute=True):
+            key = data_key_service.get_data_key(organization_id)
+
+        data_key_service.clear_cache()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                self.assertEqual(
+                    data_key_service.get_data_key(organization_id), key
+                )
+
+                with self.assertNumQueries(0):
+                    data_key_service.get_data_key(organization_id)
+
+        self.assertEqual(callbacks, [])
+
+    def test_master_key_required(self):
+        with override_settings(CREDENTIAL_MASTER_KEY=None):
+            with self.assertRaises(ImproperlyConfigured):
+                data_key_service.get_data_key(
+                    self.organization.organization_id
+                )
+
+        self.assertFalse(DataKey.objects.exists())
+
+    def test_decrypt_legacy_value(self):
+        encrypted = encryptor.encrypt('admin')
+
+        self.assertEqual(data_key_service.decrypt_value(
+            self.organization.organization_id,
+            encrypted['encoded_text'], encrypted['texted_key']
+        ), 'admin')
+
+    def test_decrypt_values(self):
+        organization_id = self.organization.organization_id
+        legacy = encryptor.encrypt('legacy')
+        tokens = data_key_service.encrypt_values(organization_id,
+                                                 ['first', 'second'])
+
+        self.assertEqual(data_key_service.decrypt_values(organization_id, [
+            (tokens[0], ''),
+            (legacy['encoded_text'], legacy['texted_key']),
+            (tokens[1], ''),
+        ]), ['first', 'legacy', 'second'])
+
+    def test_reencrypt_items(self):
+        for index in range(3):
+            encrypted = encryptor.encrypt(f'value{index}')
+
+            Item.objects.create(
+                key=f'key{index}', value=encrypted['encoded_text'],
+                salt=encrypted['texted_key'],
+                component=self.component,
+                organization=self.organization,
+                created_by=self.employee
+            )
+
+        out = StringIO()
+        call_command('reencrypt_items', '--batch-size', '2', stdout=out)
+
+        self.assertIn('Re-encrypted 3 items, 0 failed', out.getvalue())
+
+        for item in Item.objects.all():
+            self.assertEqual(item.salt, '')
+            self.assertEqual(
+                data_key_service.decrypt_value(item.organization_id,
+                                               item.value),
+                f'value{item.key[3:]}'
+            )
@@ -0,0 +1,96 @@
+import base64
+from unittest import mock
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
+
+from django.test import SimpleTestCase
+
+from utils import encryptor
+
+
+class EncryptorTest(SimpleTestCase):
+
+    def setUp(self):
+        self.key = encryptor.generate_key()
+
+    def test_encrypt_with_key(self):
+        token = encryptor.encrypt_with_key('password\0', self.key)
+
+        self.assertEqual(base64.urlsafe_b64decode(token)[0],
+                         encryptor.VERSION_GCM)
+        self.assertEqual(encryptor.decrypt_with_key(token, self.key),
+                         'password\0')
+        self.assertNotEqual(encryptor.encrypt_with_key('password\0',
+                                                       self.key), token)
+
+    def test_tampered_token(self):
+        encoded = bytearray(base64.urlsafe_b64decode(
+            encryptor.encrypt_with_key('password', self.key)
+        ))
+        encoded[-1] ^= 1
+
+        self.assertIsNone(encryptor.decrypt_with_key(
+            base64.urlsafe_b64encode(bytes(encoded)).decode(), self.key
+        ))
+        self.assertIsNone(encryptor.decrypt_with_key(
+            encryptor.encrypt_with_key('password', self.key),
+            encryptor.generate_key()
+        ))
+
+    def test_decrypt_cbc_token(self):
+        iv = bytes(AES.block_size)
+        cipher = AES.new(self.key, AES.MODE_CBC, iv)
+        token = base64.urlsafe_b64encode(
+            bytes([encryptor.VERSION_CBC]) + iv
+            + cipher.encrypt(pad(b'password', AES.block_size))
+        ).decode()
+
+        self.assertEqual(encryptor.decrypt_with_key(token, self.key),
+                         'password')
+
+    def test_decrypt_legacy_token(self):
+        encrypted = encryptor.encrypt('password')
+
+        self.assertEqual(encryptor.decrypt(encrypted['encoded_text'],
+                                           encrypted['texted_key']),
+                         'password')
+
+    def test_encrypt_many(self):
+        messages = [f'password{index}' for index in range(20)]
+
+        tokens = encryptor.encrypt_many(iter(messages), self.key)
+
+        self.assertEqual(len(set(tokens)), 20)
+        self.assertEqual(encryptor.decrypt_many(tokens + ['invalid'],
+                                                self.key),
+                         messages + [None])
+
+    def test_encrypt_many_with_workers(self):
+        messages = [f'password{index}' for index in range(50)]
+
+        with mock.patch.object(encryptor, 'PARALLEL_MIN_BATCH', 10):
+            tokens = encryptor.encrypt_many(messages, self.key, workers=2)
+            decrypted = encryptor.decrypt_many(tokens, self.key, workers=2)
+
+        self.assertEqual(decrypted, messages)
+
+        executor = encryptor.get_executor(2)
+
+        # one spawned pool is shared by the batches
+        self.assertIs(encryptor.executors[2], executor)
+        self.assertEqual(executor._mp_context.get_start_method(), 'spawn')
+
+    def test_broken_executor(self):
+        messages = [f'password{index}' for index in range(50)]
+        executor = mock.Mock()
+        executor.map.side_effect = encryptor.BrokenProcessPool
+
+        with mock.patch.object(encryptor, 'PARALLEL_MIN_BATCH', 10), \
+                mock.patch.dict(encryptor.executors, {3: executor}):
+            tokens = encryptor.encrypt_many(messages, self.key, workers=3)
+
+            self.assertNotIn(3, encryptor.executors)
+
+        executor.shutdown.assert_called_once_with(wait=False)
+        self.assertEqual(encryptor.decrypt_many(tokens, self.key), messages)
@@ -0,0 +1,115 @@
+import uuid
+
+from django.test import TestCase
+
+from credential.models import Component
+from credential.models import Item
+from credential.models import Vault
+from credential.service import entity_loader
+from employee.models import Employee
+from organization.models import Organization
+
+
+class EntityLoaderTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.employee = Employee.objects.create(
+            name='sibi',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.vault = Vault.objects.create(
+            name='Organization Vault',
+            description='Organization Vault',
+            organization=cls.organization,
+            created_by=cls.employee
+        )
+
+        cls.component = Component.objects.create(
+            name='Database',
+            description='Database',
+            vault=cls.vault,
+            organization=cls.organization,
+            created_by=cls.employee
+        )
+
+        cls.item = Item.objects.create(
+            key='password', value='value', salt='salt',
+            component=cls.component,
+            organization=cls.organization,
+            created_by=cls.employee
+        )
+
+    def load(self, **kwargs):
+        return entity_loader.load(
+            self.organization.organization_id, self.employee.employee_uid,
+            self.vault.vault_uid, **kwargs
+        )
+
+    def test_load_item_path(self):
+        with self.assertNumQueries(1):
+            entities = self.load(component_uid=self.component.component_uid,
+                                 item_uid=self.item.item_uid)
+
+            self.assertEqual(entities.organization, self.organization)
+            self.assertEqual(entities.employee, self.employee)
+            self.assertEqual(entities.employee.email, self.employee.email)
+            self.assertEqual(entities.vault, self.vault)
+            self.assertEqual(entities.component, self.component)
+            self.assertEqual(entities.item, self.item)
+
+    def test_load_vault_path(self):
+        with self.assertNumQueries(1):
+            entities = self.load()
+
+        self.assertEqual(entities.vault, self.vault)
+        self.assertIsNone(entities.component)
+
+    def test_request_scope(self):
+        with entity_loader.request_scope():
+            entities = self.load()
+
+            with self.assertNumQueries(0):
+                self.assertIs(self.load(), entities)
+
+        with self.assertNumQueries(1):
+            self.load()
+
+    def test_missing_entities(self):
+        with self.assertRaises(Organization.DoesNotExist):
+            entity_loader.load(100, self.employee.employee_uid,
+                               self.vault.vault_uid)
+
+        with self.assertRaises(Employee.DoesNotExist):
+            entity_loader.load(self.organization.organization_id,
+                               uuid.uuid4(), self.vault.vault_uid)
+
+        with self.assertRaises(Vault.DoesNotExist):
+            entity_loader.load(self.organization.organization_id,
+                               self.employee.employee_uid, uuid.uuid4())
+
+        with self.assertRaises(Component.DoesNotExist):
+            self.load(component_uid=uuid.uuid4())
+
+        with self.assertRaises(Item.DoesNotExist):
+            self.load(component_uid=self.component.component_uid,
+                      item_uid=uuid.uuid4())
+
+    def test_inactive_entities(self):
+        self.vault.active = False
+        self.vault.save()
+
+        with self.assertRaises(Vault.DoesNotExist):
+            self.load()
+
+        entities = self.load(inactive_vault=True)
+
+        self.assertFalse(entities.vault.active)
@@ -0,0 +1,93 @@
+from django.test import TestCase
+
+from rest_framework.renderers import JSONRenderer
+
+from credential.models import Component
+from credential.models import Item
+from credential.models import Vault
+from credential.serializers import ComponentOnlySerializer
+from credential.serializers import ComponentResponseSerializer
+from credential.serializers import ItemSerializer
+from credential.serializers import VaultOnlySerializer
+from credential.serializers import VaultSerializer
+from employee.models import Employee
+from employee.serializers import EmployeeSerializer
+from organization.models import Organization
+from utils.fast_serializer import get_fast_serializer
+
+
+class FastSerializerTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.employee = Employee.objects.create(
+            name='sibi',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.vault = Vault.objects.create(
+            name='Organization Vault',
+            description='Organization Vault',
+            organization=cls.organization,
+            created_by=cls.employee,
+            updated_by=cls.employee
+        )
+
+        for index in range(3):
+            component = Component.objects.create(
+                name=f'Component {index}',
+                description=f'Component {index}',
+                vault=cls.vault,
+                organization=cls.organization,
+                created_by=cls.employee
+            )
+
+            Item.objects.create(
+                key='password', value='value', salt='salt',
+                component=component,
+                organization=cls.organization,
+                created_by=cls.employee
+            )
+
+    def assertSameJson(self, serializer_class, queryset, rows=True):
+        renderer = JSONRenderer()
+        fast_serializer = get_fast_serializer(serializer_class)
+
+        expected = renderer.render(serializer_class(queryset, many=True).data)
+
+        self.assertEqual(
+            renderer.render(fast_serializer.serialize_many(queryset)),
+            expected
+        )
+
+        if rows:
+            self.assertEqual(
+                renderer.render(fast_serializer.serialize_queryset(queryset)),
+                expected
+            )
+
+    def test_vault_serializers(self):
+        self.assertSameJson(VaultOnlySerializer, Vault.objects.all())
+        self.assertSameJson(VaultSerializer, Vault.objects.all(), rows=False)
+
+    def test_component_serializers(self):
+        self.assertSameJson(ComponentOnlySerializer, Component.objects.all())
+        self.assertSameJson(ComponentResponseSerializer,
+                            Component.objects.all(), rows=False)
+
+    def test_item_serializer(self):
+        self.assertSameJson(ItemSerializer, Item.objects.all())
+
+    def test_employee_serializer(self):
+        self.assertSameJson(EmployeeSerializer, Employee.objects.all())
+
+    def test_nested_rows(self):
+        with self.assertRaises(ValueError):
+            get_fast_serializer(VaultSerializer).value_names
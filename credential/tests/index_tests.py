@@ -0,0 +1,135 @@
+from django.db import connection
+from django.test import TestCase
+
+from credential.models import Component
+from credential.models import Item
+from credential.models import Vault
+from credential.models import VaultAccess
+from credential.service import user_access_service
+from employee.models import Employee
+from organization.models import Organization
+
+
+ORGANIZATIONS = 4
+EMPLOYEES = 25
+VAULTS = 10
+
+
+class HotQueryIndexTest(TestCase):
+    """checks with EXPLAIN that the access check and lookup queries are
+    answered from their indexes on a seeded dataset
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(ORGANIZATIONS):
+            organization = Organization.objects.create(
+                name=f'organization{number}',
+                email=f'admin@organization{number}.com', password='admin',
+            )
+
+            Employee.objects.bulk_create([
+                Employee(name='employee', password='employee',
+                         email=f'employee{index}@organization{number}.com',
+                         active=index % 5 != 0,
+                         organization=organization,
+                         created_by=organization)
+                for index in range(EMPLOYEES)
+            ])
+
+            owner = Employee.objects.filter(organization=organization,
+                                            active=True).first()
+
+            vaults = [Vault.objects.create(
+                name='vault', description='vault', active=index % 4 != 0,
+                organization=organization, created_by=owner
+            ) for index in range(VAULTS)]
+
+            VaultAccess.objects.bulk_create([
+                VaultAccess(access_level='ORGANIZATION', vault=vault,
+                            organization=organization, created_by=owner)
+                for vault in vaults
+            ] + [
+                VaultAccess(access_level='INDIVIDUAL', vault=vault,
+                            employee=employee, active=index % 3 != 0,
+                            organization=organization, created_by=owner)
+                for vault in vaults
+                for index, employee in enumerate(
+                    Employee.objects.filter(organization=organization)
+                )
+            ])
+
+            components = [Component.objects.create(
+                name='component', description='component', vault=vault,
+                active=index % 4 != 0, organization=organization,
+                created_by=owner
+            ) for vault in vaults for index in range(3)]
+
+            Item.objects.bulk_create([
+                Item(key=f'key{index}', value='value', component=component,
+                     active=index % 4 != 0, organization=organization,
+                     created_by=owner)
+                for component in components for index in range(5)
+            ])
+
+        cls.organization = Organization.objects.get(name='organization2')
+        cls.employee = Employee.objects.filter(
+            organization=cls.organization, active=True
+        ).last()
+        cls.vault = Vault.objects.filter(organization=cls.organization,
+                                         active=True).last()
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+
+        self.assertIn(index_name, plan)
+
+        if connection.vendor == 'postgresql':
+            self.assertIn('Index', plan)
+        else:
+            self.assertRegex(plan, rf'SEARCH \S+ USING (COVERING )?INDEX '
+                                   rf'{index_name}')
+
+    def test_vault_accesses(self):
+        self.assertUsesIndex(
+            user_access_service.get_vault_accesses(
+                self.organization.organization_id, self.vault.vault_id
+            ).filter(access_level='ORGANIZATION'),
+            'cm_vault_access_org_idx'
+        )
+
+    def test_individual_vault_accesses(self):
+        self.assertUsesIndex(
+            VaultAccess.objects.filter(employee=self.employee.employee_id,
+                                       vault=self.vault.vault_id,
+                                       active=True),
+            'cm_vault_access_employee_idx'
+        )
+
+    def test_components(self):
+        self.assertUsesIndex(
+            Component.objects.filter(vault=self.vault.vault_id, active=True),
+            'cm_component_vault_idx'
+        )
+
+    def test_items(self):
+        components = Component.objects.filter(
+            vault=self.vault.vault_id
+        ).values_list('component_id', flat=True)
+
+        self.assertUsesIndex(
+            Item.objects.filter(component__in=list(components),
+                                organization=self.organization,
+                                active=True).order_by('item_id'),
+            'cm_item_component_idx'
+        )
+
+    def test_employees(self):
+        self.assertUsesIndex(
+            Employee.objects.filter(organization=self.organization,
+                                    active=True).order_by('employee_id'),
+            'cm_employee_organization_idx'
+        )
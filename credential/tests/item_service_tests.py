@@ -0,0 +1,171 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from rest_framework.test import APIClient
+
+from credential.models import Component
+from credential.models import Item
+from credential.models import Vault
+from credential.service import access_cache
+from credential.service import data_key_service
+from credential.service import item_service
+from credential.tests.query_budget import QueryBudgetMixin
+from employee.models import Employee
+from organization.models import Organization
+from utils import encryptor
+from utils.api_exceptions import CustomApiException
+
+
+class DecryptItemsTest(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.employee = Employee.objects.create(
+            name='sibi',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.other_employee = Employee.objects.create(
+            name='ajith',
+            email='ajith@ideas2it.com', password='ajith',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.vault = Vault.objects.create(
+            name='Organization Vault',
+            description='Organization Vault',
+            organization=cls.organization,
+            created_by=cls.employee
+        )
+
+        cls.components = [
+            Component.objects.create(
+                name=f'Component {index}',
+                description=f'Component {index}',
+                vault=cls.vault,
+                organization=cls.organization,
+                created_by=cls.employee
+            )
+            for index in range(2)
+        ]
+
+        cls.user = User.objects.create(username='admin')
+
+    def setUp(self):
+        access_cache.clear()
+        data_key_service.clear_cache()
+
+        organization_id = self.organization.organization_id
+
+        for component in self.components:
+            values = data_key_service.encrypt_values(
+                organization_id, [f'{component.name} {index}'
+                                  for index in range(10)]
+            )
+
+            Item.objects.bulk_create([
+                Item(key=f'key{index}', value=value, component=component,
+                     organization=self.organization,
+                     created_by=self.employee)
+                for index, value in enumerate(values)
+            ])
+
+        legacy = encryptor.encrypt('legacy')
+
+        Item.objects.create(key='legacy', value=legacy['encoded_text'],
+                            salt=legacy['texted_key'],
+                            component=self.components[0],
+                            organization=self.organization,
+                            created_by=self.employee)
+
+    def decrypt_items(self, employee, component_uids):
+        return item_service.decrypt_items(
+            self.organization.organization_id, employee.employee_uid,
+            self.vault.vault_uid, component_uids
+        )
+
+    def test_decrypt_items(self):
+        with self.assertMaxQueries(4):
+            secrets = self.decrypt_items(
+                self.employee,
+                [component.component_uid for component in self.components]
+            )
+
+        first, second = (secrets[str(component.component_uid)]
+                         for component in self.components)
+
+        self.assertEqual(len(first), 11)
+        self.assertEqual(first['key3'], 'Component 0 3')
+        self.assertEqual(first['legacy'], 'legacy')
+        self.assertEqual(second['key9'], 'Component 1 9')
+
+    def test_decrypt_items_without_access(self):
+        with self.assertRaises(CustomApiException):
+            self.decrypt_items(self.other_employee,
+                               [self.components[0].component_uid])
+
+    def test_decrypt_unknown_component(self):
+        with self.assertRaises(CustomApiException):
+            self.decrypt_items(self.employee, [uuid.uuid4()])
+
+        with self.assertRaises(CustomApiException):
+            self.decrypt_items(self.employee, ['component'])
+
+    def test_decrypt_form(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        encrypted = encryptor.encrypt('legacy')
+
+        response = client.post('/vault/component/item/decrypt', {
+            'token': encrypted['encoded_text'],
+            'secret_key': encrypted['texted_key'],
+        })
+
+        self.assertEqual(response.context['decrypted_value'], 'legacy')
+
+        # values of the organization data key have no secret key
+        response = client.post('/vault/component/item/decrypt', {
+            'token': data_key_service.encrypt_value(
+                self.organization.organization_id, 'value'
+            ),
+            'secret_key': encrypted['texted_key'],
+        })
+
+        self.assertIn('error', response.context)
+
+    def test_decrypt_component_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get(
+            f'/user/{self.employee.employee_uid}/vault/{self.vault.vault_uid}'
+            f'/component/{self.components[1].component_uid}/decrypt'
+            f'?organization_id={self.organization.organization_id}'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        self.assertEqual(response.data['key0'], 'Component 1 0')
+
+        response = client.post(
+            f'/user/{self.employee.employee_uid}/vault/{self.vault.vault_uid}'
+            f'/component/decrypt'
+            f'?organization_id={self.organization.organization_id}',
+            {'components': [str(self.components[0].component_uid)]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.data), [str(self.components[0].component_uid)]
+        )
@@ -0,0 +1,59 @@
+import logging
+
+from django.test import SimpleTestCase
+
+from utils.log_handlers import QueueListenerHandler
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class QueueListenerHandlerTest(SimpleTestCase):
+
+    def setUp(self):
+        self.target = RecordingHandler()
+        self.handler = QueueListenerHandler([self.target], queue_size=1,
+                                            put_timeout=0.01)
+
+    def tearDown(self):
+        self.handler.close()
+
+    def record(self, level, message):
+        return logging.LogRecord('test', level, __file__, 1, message, None,
+                                 None)
+
+    def test_full_queue(self):
+        # a listener which is not running, as in a forked worker
+        self.handler.listener.stop()
+        self.handler.queue.put_nowait(self.record(logging.INFO, 'queued'))
+
+        self.handler.handle(self.record(logging.INFO, 'info'))
+        self.handler.handle(self.record(logging.ERROR, 'error'))
+
+        self.assertEqual(self.handler.dropped, 2)
+
+    def test_restart(self):
+        # the records queued by the parent are not written by the child
+        self.handler.listener.stop()
+        self.handler.queue.put_nowait(self.record(logging.INFO, 'parent'))
+
+        self.handler.restart()
+        self.handler.handle(self.record(logging.ERROR, 'child'))
+        self.handler.stop()
+
+        self.assertEqual([record.msg for record in self.target.records],
+                         ['child'])
+
+    def test_stopped(self):
+        self.handler.stop()
+        self.handler.handle(self.record(logging.WARNING, 'shutdown'))
+
+        self.assertEqual([record.msg for record in self.target.records],
+                         ['shutdown'])
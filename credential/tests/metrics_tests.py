@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.test import TestCase
+
+from rest_framework.test import APIClient
+
+from utils import metrics
+
+
+class MetricsTest(SimpleTestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+        self.requests = self.registry.register(metrics.Counter(
+            'requests_total', 'Requests', ['url_name']
+        ))
+        self.latency = self.registry.register(metrics.Histogram(
+            'latency_seconds', 'Latency', ['url_name'], buckets=(0.1, 1)
+        ))
+
+    def test_register_existing(self):
+        self.assertIs(self.registry.register(
+            metrics.Counter('requests_total', 'Requests', ['url_name'])
+        ), self.requests)
+
+    def test_render(self):
+        self.requests.inc('do_vault')
+        self.requests.inc('do_vault', amount=2)
+        self.latency.observe(0.05, 'do_vault')
+        self.latency.observe(0.1, 'do_vault')
+        self.latency.observe(5, 'do_vault')
+
+        text = metrics.render(metrics.merge([self.registry.collect()]))
+
+        self.assertIn('# TYPE requests_total counter', text)
+        self.assertIn('requests_total{url_name="do_vault"} 3', text)
+        self.assertIn('# TYPE latency_seconds histogram', text)
+        self.assertIn('latency_seconds_bucket{url_name="do_vault",'
+                      'le="0.1"} 2', text)
+        self.assertIn('latency_seconds_bucket{url_name="do_vault",'
+                      'le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{url_name="do_vault",'
+                      'le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_sum{url_name="do_vault"} 5.15', text)
+        self.assertIn('latency_seconds_count{url_name="do_vault"} 3', text)
+
+    def test_escape_labels(self):
+        self.requests.inc('a"b\\c')
+
+        text = metrics.render(metrics.merge([self.registry.collect()]))
+
+        self.assertIn('requests_total{url_name="a\\"b\\\\c"} 1', text)
+
+    def test_merge(self):
+        self.requests.inc('do_vault')
+        self.latency.observe(0.5, 'do_vault')
+        first = json.loads(json.dumps(self.registry.collect()))
+
+        self.registry.clear()
+        self.requests.inc('do_vault', amount=4)
+        self.requests.inc('get_vaults')
+        self.latency.observe(0.05, 'do_vault')
+        second = self.registry.collect()
+
+        merged = metrics.merge([first, second])
+
+        self.assertEqual(dict(merged['requests_total']['values']),
+                         {('do_vault',): 5, ('get_vaults',): 1})
+        self.assertEqual(dict(merged['latency_seconds']['values']),
+                         {('do_vault',): [1, 1, 0, 0.55]})
+
+    def test_multiprocess(self):
+        with tempfile.TemporaryDirectory() as directory:
+            other = metrics.Registry()
+            other.register(metrics.Counter(
+                'requests_total', 'Requests', ['url_name']
+            )).inc('do_vault', amount=2)
+
+            with open(os.path.join(directory, 'metrics_1.json'), 'w') as file:
+                json.dump(other.collect(), file)
+
+            self.requests.inc('do_vault')
+
+            with mock.patch.object(metrics, 'MULTIPROCESS_DIR', directory), \
+                    mock.patch.object(metrics, 'registry', self.registry):
+                text = metrics.render()
+
+            self.assertTrue(os.path.exists(
+                os.path.join(directory, f'metrics_{os.getpid()}.json')
+            ))
+
+        self.assertIn('requests_total{url_name="do_vault"} 3', text)
+
+
+class MetricsViewTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_admin_only(self):
+        self.client.force_authenticate(
+            user=User.objects.create(username='user')
+        )
+
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    def test_get_metrics(self):
+        self.client.force_authenticate(
+            user=User.objects.create(username='admin', is_staff=True)
+        )
+
+        self.client.get('/unknown')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        self.assertIn(b'credential_http_requests_total{url_name="unresolved",'
+                      b'method="GET",status="404"}', response.content)
+        self.assertIn(b'# TYPE credential_http_request_duration_seconds '
+                      b'histogram', response.content)
@@ -0,0 +1,127 @@
+import json
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from rest_framework.test import APIClient
+
+from credential.models import Vault
+from credential.service import vault_service
+from employee.models import Employee
+from organization.models import Organization
+from utils import pagination
+from utils.api_exceptions import CustomApiException
+
+
+class PaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.employee = Employee.objects.create(
+            name='sibi',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.vaults = [
+            Vault.objects.create(
+                name=f'Vault {index}',
+                description=f'Vault {index}',
+                organization=cls.organization,
+                created_by=cls.employee
+            )
+            for index in range(7)
+        ]
+
+        cls.user = User.objects.create(username='admin')
+
+    def get_vaults(self, **query_params):
+        return vault_service.get_vaults(
+            self.organization.organization_id,
+            {'email': self.organization.email},
+            page=pagination.get_page(query_params)
+        )
+
+    def test_paginate(self):
+        vault_ids = [vault.vault_id for vault in self.vaults]
+
+        first_page = self.get_vaults(limit='3')
+
+        self.assertEqual(
+            [vault['vault_id'] for vault in first_page['results']],
+            vault_ids[:3]
+        )
+        self.assertEqual(first_page['next_cursor'], vault_ids[2])
+
+        last_page = self.get_vaults(after=str(vault_ids[5]), limit='3')
+
+        self.assertEqual(
+            [vault['vault_id'] for vault in last_page['results']],
+            vault_ids[6:]
+        )
+        self.assertIsNone(last_page['next_cursor'])
+
+    def test_without_limit(self):
+        self.assertEqual(len(self.get_vaults()), 7)
+        self.assertEqual(
+            len(self.get_vaults(after=str(self.vaults[0].vault_id))), 6
+        )
+
+    def test_invalid_page(self):
+        with self.assertRaises(CustomApiException):
+            self.get_vaults(limit='0')
+
+        with self.assertRaises(CustomApiException):
+            self.get_vaults(after='first')
+
+    def test_stream(self):
+        with mock.patch.object(pagination, 'STREAM_CHUNK_SIZE', 2):
+            streamed_vaults = list(self.get_vaults(stream='true'))
+
+        self.assertEqual([vault['vault_id'] for vault in streamed_vaults],
+                         [vault.vault_id for vault in self.vaults])
+
+    def test_stream_response(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get(
+            f'/user/{self.employee.employee_uid}/vault/all'
+            f'?organization_id={self.organization.organization_id}'
+            f'&stream=true&limit=5'
+        )
+
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+        vaults = json.loads(b''.join(response.streaming_content))
+
+        self.assertEqual(len(vaults), 5)
+        self.assertEqual(vaults[0]['scope'], 'READ/WRITE')
+
+    def test_stream_first_chunk_error(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        def fail_rows(queryset, key_name, limit, serialize):
+            raise CustomApiException(500, 'Vaults fetch failure')
+            yield
+
+        with mock.patch.object(pagination, 'stream_rows',
+                               side_effect=fail_rows):
+            response = client.get(
+                f'/user/{self.employee.employee_uid}/vault/all'
+                f'?organization_id={self.organization.organization_id}'
+                f'&stream=true'
+            )
+
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.status_code, 500)
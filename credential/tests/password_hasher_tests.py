@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from utils import password_hasher
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+])
+class PasswordHasherTest(SimpleTestCase):
+
+    def test_hash_passwords(self):
+        passwords = [f'password{index}' for index in range(3)]
+
+        hashes = password_hasher.hash_passwords(passwords, workers=1)
+
+        self.assertEqual(len(hashes), 3)
+
+        for password, hashed in zip(passwords, hashes):
+            self.assertTrue(hashed.startswith('md5$'))
+            self.assertTrue(check_password(password, hashed))
+
+    def test_hash_passwords_in_processes(self):
+        passwords = [f'password{index}' for index in range(20)]
+
+        with password_hasher.HashingPool(workers=3) as pool:
+            self.assertEqual(
+                pool.executor._mp_context.get_start_method(), 'spawn'
+            )
+            hashes = pool.hash_passwords(passwords)
+            same_hashes = pool.hash_passwords(['password0'] * 10)
+
+        self.assertIsNone(pool.executor)
+        self.assertEqual(len(hashes), 20)
+
+        for password, hashed in zip(passwords, hashes):
+            self.assertTrue(check_password(password, hashed))
+
+        self.assertEqual(len(set(same_hashes)), 10)
+
+    def test_single_worker(self):
+        with password_hasher.HashingPool(workers=1) as pool:
+            self.assertIsNone(pool.executor)
+            self.assertEqual(pool.hash_passwords([]), [])
+
+    def test_shared_pool(self):
+        with mock.patch.object(password_hasher, 'shared_pool', None), \
+                mock.patch.object(password_hasher.atexit,
+                                  'register') as register:
+            pool = password_hasher.get_pool()
+
+            self.assertIs(password_hasher.get_pool(), pool)
+            register.assert_called_once_with(pool.shutdown)
+
+            pool.shutdown()
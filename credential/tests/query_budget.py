@@ -0,0 +1,51 @@
+"""This module is used to assert the maximum number of queries an endpoint
+may run, so N+1 query patterns show up as test failures
+"""
+import contextlib
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from utils.query_inspector import QueryInspector
+
+
+class QueryBudgetMixin:
+    """test case mixin which provides the assertMaxQueries and
+    assertNoRepeatedQueries context managers
+    """
+
+    @contextlib.contextmanager
+    def assertMaxQueries(self, limit, using='default'):
+        """used to fail the test when the block runs more than the given
+        number of queries
+        """
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+
+        executed = len(context.captured_queries)
+
+        if executed > limit:
+            queries = '\n'.join(
+                f'{index}. {query["sql"]}'
+                for index, query in enumerate(context.captured_queries,
+                                              start=1)
+            )
+            self.fail(f'{executed} queries executed, {limit} expected '
+                      f'at most\nCaptured queries were:\n{queries}')
+
+    @contextlib.contextmanager
+    def assertNoRepeatedQueries(self, max_repeats=1, using='default'):
+        """used to fail the test when the block runs the same statement with
+        different parameters more than max_repeats times, which is the mark
+        of an N+1 query pattern. The failure shows where the statements
+        were run from
+        """
+        inspector = QueryInspector()
+
+        with connections[using].execute_wrapper(inspector):
+            yield inspector
+
+        problems = inspector.problems(max_repeats=max_repeats)
+
+        if problems:
+            self.fail('Repeated queries were:\n' + '\n'.join(problems))
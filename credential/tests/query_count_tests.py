@@ -0,0 +1,144 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from rest_framework.test import APIClient
+
+from credential.models import Component
+from credential.models import Item
+from credential.models import Vault
+from credential.models import VaultAccess
+from credential.service import access_cache
+from credential.service import effective_access_service
+from credential.tests.query_budget import QueryBudgetMixin
+from employee.models import Employee
+from organization.models import Organization
+
+
+class QueryCountTest(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.owner = Employee.objects.create(
+            name='sibi',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.employee = Employee.objects.create(
+            name='ajith',
+            email='ajith@ideas2it.com', password='ajith',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.vaults = [
+            Vault.objects.create(
+                name=f'Vault {index}',
+                description=f'Vault {index}',
+                organization=cls.organization,
+                created_by=cls.owner
+            )
+            for index in range(10)
+        ]
+
+        cls.vault = cls.vaults[0]
+
+        for vault in cls.vaults:
+            VaultAccess.objects.create(
+                access_level='ORGANIZATION', scope='READ',
+                vault=vault, organization=cls.organization,
+                created_by=cls.owner
+            )
+            effective_access_service.refresh_vault(vault.vault_id)
+
+        cls.components = [
+            Component.objects.create(
+                name=f'Component {index}',
+                description=f'Component {index}',
+                vault=cls.vault,
+                organization=cls.organization,
+                created_by=cls.owner
+            )
+            for index in range(25)
+        ]
+
+        cls.component = cls.components[0]
+
+        Item.objects.bulk_create([
+            Item(key=f'key{index}', value='value', salt='salt',
+                 component=cls.component,
+                 organization=cls.organization,
+                 created_by=cls.owner)
+            for index in range(25)
+        ])
+
+        cls.user = User.objects.create(username='admin')
+
+    def setUp(self):
+        access_cache.clear()
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def url(self, path):
+        return (f'/user/{self.employee.employee_uid}/vault/{path}'
+                f'?organization_id={self.organization.organization_id}')
+
+    def test_get_vault(self):
+        with self.assertMaxQueries(3):
+            response = self.client.get(self.url(self.vault.vault_uid))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data.get('components')), 25)
+
+    def test_get_component(self):
+        with self.assertMaxQueries(3):
+            response = self.client.get(self.url(
+                f'{self.vault.vault_uid}/component/'
+                f'{self.component.component_uid}'
+            ))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data.get('items')), 25)
+
+    def test_get_vaults(self):
+        with self.assertMaxQueries(2):
+            response = self.client.get(self.url('all'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 10)
+
+    def test_compute_vault_scopes(self):
+        inactive_employee = Employee.objects.create(
+            name='sasi',
+            email='sasi@ideas2it.com', password='sasi', active=False,
+            organization=self.organization,
+            created_by=self.organization
+        )
+
+        VaultAccess.objects.bulk_create([
+            VaultAccess(access_level='ORGANIZATION', scope='READ/WRITE',
+                        vault=self.vault, organization=self.organization,
+                        created_by=self.owner),
+            VaultAccess(access_level='INDIVIDUAL', scope='READ/WRITE',
+                        vault=self.vault, employee=inactive_employee,
+                        organization=self.organization,
+                        created_by=self.owner),
+        ])
+
+        # the scopes of all organization employees are loaded at once
+        with self.assertNumQueries(1):
+            scopes = effective_access_service.compute_vault_scopes(
+                self.vault
+            )
+
+        self.assertEqual(scopes, {
+            self.owner.employee_id: 'READ/WRITE',
+            self.employee.employee_id: 'READ/WRITE',
+        })
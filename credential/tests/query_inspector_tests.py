@@ -0,0 +1,140 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test import override_settings
+
+from rest_framework.test import APIClient
+
+from credential.models import Vault
+from credential.models import VaultAccess
+from credential.service import access_cache
+from credential.service import user_access_service
+from credential.tests.query_budget import QueryBudgetMixin
+from employee.models import Employee
+from organization.models import Organization
+from utils import query_inspector
+
+
+class NormalizeSqlTest(SimpleTestCase):
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            query_inspector.normalize_sql(
+                'SELECT "a"."id" FROM "cm_vault" "a"\n  WHERE "a"."id" '
+                'IN (%s, %s, %s) AND "a"."name" = \'it\'\'s\' LIMIT 21'
+            ),
+            'SELECT "a"."id" FROM "cm_vault" "a" WHERE "a"."id" IN (...) '
+            'AND "a"."name" = ? LIMIT ?'
+        )
+
+    def test_same_statement(self):
+        self.assertEqual(
+            query_inspector.normalize_sql('SELECT * FROM t WHERE id = 1'),
+            query_inspector.normalize_sql('SELECT * FROM t WHERE id = %s')
+        )
+
+
+class QueryInspectorTest(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.owner = Employee.objects.create(
+            name='sibi',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.employees = [
+            Employee.objects.create(
+                name=f'employee {index}',
+                email=f'employee{index}@ideas2it.com', password='employee',
+                organization=cls.organization,
+                created_by=cls.organization
+            )
+            for index in range(4)
+        ]
+
+        cls.vault = Vault.objects.create(
+            name='Organization Vault',
+            description='Organization Vault',
+            organization=cls.organization,
+            created_by=cls.owner
+        )
+
+        for employee in cls.employees:
+            VaultAccess.objects.create(
+                access_level='INDIVIDUAL', scope='READ',
+                vault=cls.vault, employee=employee,
+                organization=cls.organization, created_by=cls.owner
+            )
+
+    def setUp(self):
+        access_cache.clear()
+
+    def test_repeated_queries(self):
+        with self.assertRaises(AssertionError) as context:
+            with self.assertNoRepeatedQueries():
+                for vault_access in VaultAccess.objects.filter(
+                        vault=self.vault):
+                    vault_access.employee.email
+
+        message = str(context.exception)
+
+        self.assertIn('4 x SELECT', message)
+        self.assertIn('4 x at credential/tests/query_inspector_tests.py:',
+                      message)
+        self.assertIn('in test_repeated_queries', message)
+
+    def test_problems(self):
+        inspector = query_inspector.QueryInspector()
+        inspector.queries = [
+            query_inspector.RecordedQuery(
+                f'SELECT * FROM t WHERE id = {index}', 0.2, 'a.py:1 in f'
+            )
+            for index in range(3)
+        ]
+
+        self.assertEqual(inspector.problems(max_queries=3, max_repeats=3,
+                                            slow_query_ms=500), [])
+
+        problems = inspector.problems(max_queries=2, max_repeats=2,
+                                      slow_query_ms=100)
+
+        self.assertEqual(len(problems), 5)
+        self.assertEqual(problems[0], '3 queries executed, 2 expected at most')
+        self.assertEqual(problems[1], '3 x SELECT * FROM t WHERE id = ?\n'
+                                      '    3 x at a.py:1 in f')
+        self.assertTrue(problems[2].startswith('slow query 200.0 ms'))
+
+    def test_remove_vault_access(self):
+        with self.assertNoRepeatedQueries(max_repeats=len(self.employees)) \
+                as inspector:
+            user_access_service.remove_vault_access(
+                self.organization.organization_id, self.owner.employee_uid,
+                self.vault.vault_uid
+            )
+
+        self.assertEqual(
+            [normalized.split()[0]
+             for normalized in inspector.repeated(1)], ['UPDATE']
+        )
+
+
+@override_settings(QUERY_INSPECTOR={'MODE': query_inspector.RAISE,
+                                    'MAX_QUERIES': 0})
+class QueryInspectorMiddlewareTest(TestCase):
+
+    def test_raise(self):
+        client = APIClient()
+        client.force_authenticate(
+            user=User.objects.create(username='admin', is_staff=True)
+        )
+
+        with self.assertRaises(query_inspector.QueryBudgetExceeded):
+            client.get('/organization/all')
@@ -0,0 +1,136 @@
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.test import APIClient
+
+from credential.models import Vault
+from credential.models import VaultAccess
+from credential.service import access_cache
+from credential.service import effective_access_service
+from employee.models import Employee
+from organization.models import Organization
+from utils import request_timing
+
+
+class TimerTest(SimpleTestCase):
+
+    def setUp(self):
+        self.timings = request_timing.RequestTimings()
+        self.token = request_timing.request_timings.set(self.timings)
+
+    def tearDown(self):
+        request_timing.request_timings.reset(self.token)
+
+    def test_nested_timers(self):
+        @request_timing.timed(request_timing.CRYPTO)
+        def inner():
+            time.sleep(0.01)
+
+        @request_timing.timed(request_timing.CRYPTO)
+        def outer():
+            inner()
+            inner()
+
+        started = time.perf_counter()
+        outer()
+        elapsed = time.perf_counter() - started
+
+        self.assertGreaterEqual(self.timings.times[request_timing.CRYPTO],
+                                0.02)
+        self.assertLessEqual(self.timings.times[request_timing.CRYPTO],
+                             elapsed)
+        self.assertEqual(self.timings.depths[request_timing.CRYPTO], 0)
+
+    def test_database_time_excluded(self):
+        with request_timing.timer(request_timing.SERIALIZE):
+            time.sleep(0.01)
+            self.timings.db_time += 1
+
+        self.assertLess(self.timings.times[request_timing.SERIALIZE], 0)
+        self.assertGreater(self.timings.times[request_timing.SERIALIZE],
+                           -1)
+
+    def test_without_request(self):
+        request_timing.request_timings.set(None)
+
+        with request_timing.timer(request_timing.CRYPTO):
+            pass
+
+        self.assertEqual(self.timings.times[request_timing.CRYPTO], 0)
+
+
+class CustomMiddlewareTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.employee = Employee.objects.create(
+            name='sibi',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.vault = Vault.objects.create(
+            name='Organization Vault',
+            description='Organization Vault',
+            organization=cls.organization,
+            created_by=cls.employee
+        )
+
+        VaultAccess.objects.create(
+            access_level='ORGANIZATION', scope='READ',
+            vault=cls.vault, organization=cls.organization,
+            created_by=cls.employee
+        )
+        effective_access_service.refresh_vault(cls.vault.vault_id)
+
+        cls.user = User.objects.create(username='admin')
+
+    def setUp(self):
+        access_cache.clear()
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_request_timings(self):
+        with CaptureQueriesContext(connection) as queries, \
+                self.assertLogs('credential-manager-logger', 'INFO') as logs:
+            response = self.client.get(
+                f'/user/{self.employee.employee_uid}/vault/'
+                f'{self.vault.vault_uid}'
+                f'?organization_id={self.organization.organization_id}'
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+        server_timing = response['Server-Timing']
+
+        for name in ('app;dur=', 'db;dur=', 'crypto;dur=', 'serialize;dur='):
+            self.assertIn(name, server_timing)
+
+        self.assertIn(f'desc="{len(queries)} queries"', server_timing)
+
+        records = [record for record in logs.records
+                   if getattr(record, 'url_name', None) is not None]
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].url_name, 'do_vault')
+        self.assertEqual(records[0].status, 200)
+        self.assertEqual(records[0].db_count, len(queries))
+        self.assertGreater(records[0].serialize_ms, 0)
+
+    def test_unresolved_request(self):
+        response = self.client.get('/unknown')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('app;dur=', response['Server-Timing'])
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from utils import tracing
+
+
+@tracing.traced
+def add(a, b):
+    return a + b
+
+
+@tracing.traced
+def fail():
+    raise KeyError('name')
+
+
+class TracingTest(SimpleTestCase):
+
+    def setUp(self):
+        self.spans = []
+        tracing.add_span_listener(self.spans.append)
+
+    def tearDown(self):
+        tracing.remove_span_listener(self.spans.append)
+
+    def test_traced(self):
+        self.assertEqual(add(1, 2), 3)
+        self.assertEqual(add.__name__, 'add')
+
+        self.assertEqual(len(self.spans), 1)
+        self.assertEqual(self.spans[0].name, f'{__name__}.add')
+        self.assertIsNone(self.spans[0].exception)
+        self.assertGreaterEqual(self.spans[0].duration, 0)
+
+    def test_traced_exception(self):
+        with self.assertRaises(KeyError):
+            fail()
+
+        self.assertEqual(len(self.spans), 1)
+        self.assertEqual(self.spans[0].exception, 'KeyError')
+        self.assertEqual(self.spans[0].as_dict()['exception'], 'KeyError')
+
+    def test_trace_span(self):
+        with self.assertRaises(ValueError):
+            with tracing.trace_span('block'):
+                raise ValueError
+
+        self.assertEqual([(span.name, span.exception)
+                          for span in self.spans], [('block', 'ValueError')])
+
+    def test_sampling(self):
+        with mock.patch.object(tracing, 'SAMPLE_RATE', 0):
+            self.assertEqual(add(1, 2), 3)
+
+            with tracing.trace_span('block'):
+                pass
+
+        self.assertEqual(self.spans, [])
+
+        with mock.patch.object(tracing, 'SAMPLE_RATE', 0.5), \
+                mock.patch.object(tracing.random, 'random',
+                                  side_effect=[0.7, 0.2]):
+            add(1, 2)
+            add(1, 2)
+
+        self.assertEqual(len(self.spans), 1)
+
+    def test_span_log_level(self):
+        with mock.patch.object(tracing, 'SPAN_LOG_LEVEL',
+                               tracing.logging.INFO):
+            with self.assertLogs('credential-manager-logger', 'INFO') as logs:
+                add(1, 2)
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(logs.records[0].span, f'{__name__}.add')
+        self.assertIn('duration_ms', logs.records[0].__dict__)
@@ -0,0 +1,360 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from credential.models import EffectiveVaultAccess
+from credential.models import Vault
+from credential.models import VaultAccess
+from credential.service import access_cache
+from credential.service import effective_access_service
+from credential.service import user_access_service
+from credential.service.user_access_service import VaultAccessDecision
+from employee.models import Employee
+from employee.service import employee_service
+from organization.models import Organization
+from project.models import Project
+
+
+class UserAccessServiceTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.owner = Employee.objects.create(
+            name='sibi',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.employee = Employee.objects.create(
+            name='sasi',
+            email='sasi@ideas2it.com', password='sasi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.project = Project.objects.create(
+            name='Ulab Systems',
+            email='ulabsystems@ideas2it.com',
+            description='Ulab Systems',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.vault = Vault.objects.create(
+            name='Organization Vault',
+            description='Organization Vault',
+            organization=cls.organization,
+            created_by=cls.owner
+        )
+
+    def setUp(self):
+        access_cache.clear()
+
+    def create_vault_access(self, access_level, scope, **kwargs):
+        vault_access = VaultAccess.objects.create(
+            access_level=access_level, scope=scope,
+            vault=self.vault, organization=self.organization,
+            created_by=self.owner, **kwargs
+        )
+        effective_access_service.refresh_vault(self.vault.vault_id)
+
+        return vault_access
+
+    def resolve(self, employee):
+        return user_access_service.resolve_vault_access(
+            self.organization.organization_id, employee, self.vault
+        )
+
+    def test_owner_access(self):
+        with self.assertNumQueries(0):
+            decision = self.resolve(self.owner)
+
+        self.assertTrue(decision.is_owner)
+        self.assertEqual(decision.scope, VaultAccessDecision.READ_WRITE)
+
+    def test_no_access(self):
+        with self.assertNumQueries(1):
+            decision = self.resolve(self.employee)
+
+        self.assertEqual(decision.scope, VaultAccessDecision.NONE)
+        self.assertFalse(decision.can_read)
+        self.assertFalse(decision.can_write)
+
+    def test_organization_access(self):
+        self.create_vault_access('ORGANIZATION', 'READ')
+
+        with self.assertNumQueries(1):
+            decision = self.resolve(self.employee)
+
+        self.assertTrue(decision.can_read)
+        self.assertFalse(decision.can_write)
+
+    def test_project_access(self):
+        self.create_vault_access('PROJECT', 'READ/WRITE',
+                                 project=self.project)
+
+        self.assertFalse(self.resolve(self.employee).can_read)
+
+        self.project.employees.add(self.employee)
+        effective_access_service.refresh_employee(self.employee)
+
+        with self.assertNumQueries(1):
+            decision = self.resolve(self.employee)
+
+        self.assertTrue(decision.can_write)
+
+        self.project.active = False
+        self.project.save()
+        effective_access_service.refresh_project(self.project.project_id)
+
+        self.assertFalse(self.resolve(self.employee).can_read)
+
+    def test_individual_access(self):
+        self.create_vault_access('ORGANIZATION', 'READ')
+        self.create_vault_access('INDIVIDUAL', 'READ/WRITE',
+                                 employee=self.employee)
+
+        decision = self.resolve(self.employee)
+
+        self.assertEqual(decision.scope, VaultAccessDecision.READ_WRITE)
+        self.assertFalse(decision.is_owner)
+
+    def test_vault_and_employee_scopes_agree(self):
+        member = Employee.objects.create(
+            name='ajith',
+            email='ajith@ideas2it.com', password='ajith',
+            organization=self.organization,
+            created_by=self.organization
+        )
+        inactive_employee = Employee.objects.create(
+            name='kumaran',
+            email='kumaran@ideas2it.com', password='kumaran', active=False,
+            organization=self.organization,
+            created_by=self.organization
+        )
+        self.project.employees.add(member, inactive_employee)
+
+        self.create_vault_access('ORGANIZATION', 'READ')
+        self.create_vault_access('PROJECT', 'READ/WRITE',
+                                 project=self.project)
+        self.create_vault_access('INDIVIDUAL', 'READ/WRITE',
+                                 employee=inactive_employee)
+
+        vault_scopes = effective_access_service.compute_vault_scopes(
+            self.vault
+        )
+
+        self.assertEqual(vault_scopes, {
+            self.owner.employee_id: 'READ',
+            self.employee.employee_id: 'READ',
+            member.employee_id: 'READ/WRITE',
+        })
+
+        for employee in Employee.objects.all():
+            self.assertEqual(
+                effective_access_service.compute_employee_scopes(employee)
+                .get(self.vault.vault_id),
+                vault_scopes.get(employee.employee_id)
+            )
+
+    def test_concurrent_refresh(self):
+        self.create_vault_access('ORGANIZATION', 'READ')
+        compute_vault_scopes = effective_access_service.compute_vault_scopes
+
+        def insert_concurrently(vault):
+            # a refresh of the employee commits its row after the delete
+            effective_access_service.refresh_employee(self.employee)
+            return compute_vault_scopes(vault)
+
+        with mock.patch.object(effective_access_service,
+                               'compute_vault_scopes',
+                               side_effect=insert_concurrently):
+            effective_access_service.refresh_vault(self.vault.vault_id)
+
+        self.assertEqual(EffectiveVaultAccess.objects.filter(
+            vault=self.vault
+        ).count(), 2)
+        self.assertTrue(self.resolve(self.employee).can_read)
+
+    def test_failed_refresh_rolls_back(self):
+        vault_access = self.create_vault_access('INDIVIDUAL', 'READ',
+                                                employee=self.employee)
+
+        with mock.patch.object(effective_access_service, 'refresh_vault',
+                               side_effect=RuntimeError('refresh failure')):
+            with self.assertRaises(RuntimeError):
+                user_access_service.remove_vault_access(
+                    self.organization.organization_id,
+                    self.owner.employee_uid, self.vault.vault_uid
+                )
+
+        vault_access.refresh_from_db()
+
+        self.assertTrue(vault_access.active)
+
+        with mock.patch.object(effective_access_service, 'refresh_employee',
+                               side_effect=RuntimeError('refresh failure')):
+            with self.assertRaises(RuntimeError):
+                employee_service.update_employee_status(
+                    self.organization.organization_id,
+                    self.employee.employee_uid, {}
+                )
+
+        self.employee.refresh_from_db()
+
+        self.assertTrue(self.employee.active)
+        self.assertTrue(self.resolve(self.employee).can_read)
+
+    def test_revoked_access(self):
+        vault_access = self.create_vault_access('INDIVIDUAL', 'READ',
+                                                employee=self.employee)
+        user_access_service.revoke_vault_access(vault_access)
+        effective_access_service.refresh_vault(self.vault.vault_id)
+
+        self.assertFalse(self.resolve(self.employee).can_read)
+        self.assertFalse(EffectiveVaultAccess.objects.filter(
+            employee=self.employee, vault=self.vault
+        ).exists())
+
+    def test_get_vault_scopes(self):
+        shared_vault = Vault.objects.create(
+            name='Shared Vault',
+            description='Shared Vault',
+            organization=self.organization,
+            created_by=self.owner
+        )
+        employee_vault = Vault.objects.create(
+            name='Employee Vault',
+            description='Employee Vault',
+            organization=self.organization,
+            created_by=self.employee
+        )
+
+        VaultAccess.objects.create(
+            access_level='PROJECT', scope='READ',
+            vault=shared_vault, organization=self.organization,
+            project=self.project, created_by=self.owner
+        )
+        self.project.employees.add(self.employee)
+        effective_access_service.refresh_employee(self.employee)
+
+        vault_ids = [self.vault.vault_id, shared_vault.vault_id,
+                     employee_vault.vault_id]
+
+        with self.assertNumQueries(1):
+            vault_scopes = user_access_service.get_vault_scopes(
+                self.organization.organization_id, self.employee, vault_ids
+            )
+
+        self.assertEqual(vault_scopes, {
+            self.vault.vault_id: VaultAccessDecision.NONE,
+            shared_vault.vault_id: VaultAccessDecision.READ,
+            employee_vault.vault_id: VaultAccessDecision.READ_WRITE,
+        })
+
+    def test_rebuild_organization(self):
+        self.create_vault_access('ORGANIZATION', 'READ')
+        self.create_vault_access('INDIVIDUAL', 'READ/WRITE',
+                                 employee=self.employee)
+
+        EffectiveVaultAccess.objects.all().delete()
+
+        rebuilt = effective_access_service.rebuild_organization(
+            self.organization.organization_id
+        )
+
+        self.assertEqual(rebuilt, 2)
+        self.assertEqual(self.resolve(self.employee).scope,
+                         VaultAccessDecision.READ_WRITE)
+        self.assertEqual(self.resolve(self.owner).scope,
+                         VaultAccessDecision.READ_WRITE)
+        self.assertEqual(
+            effective_access_service.compute_employee_scopes(self.employee),
+            {self.vault.vault_id: VaultAccessDecision.READ_WRITE}
+        )
+
+    def test_inactive_employee_access(self):
+        self.create_vault_access('ORGANIZATION', 'READ')
+
+        self.employee.active = False
+        self.employee.save()
+        effective_access_service.refresh_employee(self.employee)
+
+        self.assertFalse(self.resolve(self.employee).can_read)
+
+    def test_rebuild_effective_access_command(self):
+        self.create_vault_access('ORGANIZATION', 'READ')
+        EffectiveVaultAccess.objects.all().delete()
+
+        call_command('rebuild_effective_access',
+                     self.organization.organization_id, stdout=StringIO())
+
+        self.assertTrue(self.resolve(self.employee).can_read)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_effective_access', 100, stdout=StringIO())
+
+    def test_cached_access(self):
+        self.create_vault_access('ORGANIZATION', 'READ')
+
+        self.assertTrue(self.resolve(self.employee).can_read)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.resolve(self.employee).can_read)
+
+        self.assertEqual(access_cache.stats()['hits'], 1)
+
+        self.create_vault_access('INDIVIDUAL', 'READ/WRITE',
+                                 employee=self.employee)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.resolve(self.employee).can_write)
+
+        self.employee.active = False
+        self.employee.save()
+        effective_access_service.refresh_employee(self.employee)
+
+        self.assertFalse(self.resolve(self.employee).can_read)
+
+    def test_cache_eviction(self):
+        cache = access_cache.AccessDecisionCache(max_size=1, ttl=60)
+        decision = VaultAccessDecision(VaultAccessDecision.READ)
+
+        cache.set(1, 1, 1, decision, cache.versions(1, 1))
+        cache.set(1, 1, 2, decision, cache.versions(1, 2))
+
+        self.assertIsNone(cache.get(1, 1, 1))
+        self.assertIs(cache.get(1, 1, 2), decision)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_cache_versions_bounded(self):
+        cache = access_cache.AccessDecisionCache(max_size=2, ttl=60)
+        decision = VaultAccessDecision(VaultAccessDecision.READ)
+
+        cache.bump_vault(1)
+        cache.set(1, 1, 1, decision, cache.versions(1, 1))
+        versions = cache.versions(1, 2)
+
+        for vault_id in range(2, 100):
+            cache.bump_vault(vault_id)
+            cache.bump_employee(vault_id)
+
+        self.assertLessEqual(len(cache._vault_versions), 4)
+        self.assertLessEqual(len(cache._employee_versions), 4)
+
+        # the cached decision survives, a decision resolved before the
+        # counter of its vault was dropped is not taken as current
+        self.assertIs(cache.get(1, 1, 1), decision)
+
+        cache.set(1, 1, 2, decision, versions)
+
+        self.assertIsNone(cache.get(1, 1, 2))
@@ -133,3 +133,15 @@ class VaultServiceTest(TestCase):
 
         with self.assertRaises(CustomApiException):
             vault_service.get_vaults(1, {})
+
+    def test_get_employee_vaults(self):
+        employee = Employee.objects.get(employee_id=1)
+
+        vaults = vault_service.get_vaults(1, {}, employee.employee_uid)
+
+        self.assertEqual(len(vaults), 1)
+        self.assertEqual(vaults[0].get('vault_id'), 1)
+        self.assertEqual(vaults[0].get('scope'), 'READ/WRITE')
+
+        with self.assertRaises(CustomApiException):
+            vault_service.get_vaults(1, {}, uuid.uuid4())
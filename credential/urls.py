@@ -11,6 +11,10 @@ urlpatterns = [
          name='create_component'),
     path('<uuid:vault_uid>/component/<uuid:component_uid>',
          views.do_component, name='do_component'),
+    path('<uuid:vault_uid>/component/<uuid:component_uid>/decrypt',
+         views.decrypt_component, name='decrypt_component'),
+    path('<uuid:vault_uid>/component/decrypt', views.decrypt_components,
+         name='decrypt_components'),
     path('<uuid:vault_uid>/access', views.create_vault_access,
          name='create_vault_access'),
     path('<uuid:vault_uid>/access/remove', views.remove_vault_access,
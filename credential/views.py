@@ -10,10 +10,11 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from credential.service import component_service, item_service
+from credential.service import data_key_service
 from credential.service import user_access_service
 from credential.service import vault_service
 
-from utils import encryptor
+from utils import pagination
 from utils.api_exceptions import CustomApiException
 
 
@@ -22,13 +23,13 @@ logger = logging.getLogger('credential-manager-logger')
 
 @api_view(['POST'])
 def create_vault(request: HttpRequest, employee_uid):
-    logger.debug(f'Enter {__name__} module, create_vault method')
+    logger.debug('Enter %s module, create_vault method', __name__)
 
     try:
         organization_id = request.query_params.get('organization_id')
         vault = vault_service.create_vault(organization_id, employee_uid,
                                            request.data)
-        logger.debug(f'Exit {__name__} module, create_vault method')
+        logger.debug('Exit %s module, create_vault method', __name__)
         return Response(vault)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, create_vault method')
@@ -36,14 +37,16 @@ def create_vault(request: HttpRequest, employee_uid):
 
 
 @api_view(['GET'])
-def get_vaults(request: HttpRequest):
-    logger.debug(f'Enter {__name__} module, get_vaults method')
+def get_vaults(request: HttpRequest, employee_uid=None):
+    logger.debug('Enter %s module, get_vaults method', __name__)
 
     try:
         organization_id = request.query_params.get('organization_id')
-        vaults = vault_service.get_vaults(organization_id, request.data)
-        logger.debug(f'Exit {__name__} module, get_vaults method')
-        return Response(vaults)
+        page = pagination.get_page(request.query_params)
+        vaults = vault_service.get_vaults(organization_id, request.data,
+                                          employee_uid, page)
+        logger.debug('Exit %s module, get_vaults method', __name__)
+        return pagination.get_response(vaults)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, get_vaults method')
         raise CustomApiException(e.status_code, e.detail)
@@ -51,7 +54,7 @@ def get_vaults(request: HttpRequest):
 
 @api_view(['GET', 'PUT', 'PATCH'])
 def do_vault(request: HttpRequest, employee_uid, vault_uid):
-    logger.debug(f'Enter {__name__} module, do_vault method')
+    logger.debug('Enter %s module, do_vault method', __name__)
 
     organization_id = request.query_params.get('organization_id')
 
@@ -59,7 +62,7 @@ def do_vault(request: HttpRequest, employee_uid, vault_uid):
         try:
             vault = vault_service.get_vault(organization_id, employee_uid,
                                             vault_uid)
-            logger.debug(f'Exit {__name__} module, do_vault method')
+            logger.debug('Exit %s module, do_vault method', __name__)
             return Response(vault)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_vault method')
@@ -69,7 +72,7 @@ def do_vault(request: HttpRequest, employee_uid, vault_uid):
         try:
             vault = vault_service.update_vault(organization_id, employee_uid,
                                                vault_uid, request.data)
-            logger.debug(f'Exit {__name__} module, do_vault method')
+            logger.debug('Exit %s module, do_vault method', __name__)
             return Response(vault)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_vault method')
@@ -82,7 +85,7 @@ def do_vault(request: HttpRequest, employee_uid, vault_uid):
             vault_serializer = vault_service.update_vault_status(
                 organization_id, employee_uid, vault_uid, request.data
             )
-            logger.debug(f'Exit {__name__} module, do_vault method')
+            logger.debug('Exit %s module, do_vault method', __name__)
             return Response(vault_serializer)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_vault method')
@@ -91,7 +94,7 @@ def do_vault(request: HttpRequest, employee_uid, vault_uid):
 
 @api_view(['POST'])
 def create_component(request: HttpRequest, employee_uid, vault_uid):
-    logger.debug(f'Enter {__name__} module, create_component method')
+    logger.debug('Enter %s module, create_component method', __name__)
 
     try:
         organization_id = request.query_params.get('organization_id')
@@ -99,7 +102,7 @@ def create_component(request: HttpRequest, employee_uid, vault_uid):
                                                        employee_uid,
                                                        vault_uid,
                                                        request.data)
-        logger.debug(f'Exit {__name__} module, create_component method')
+        logger.debug('Exit %s module, create_component method', __name__)
         return Response(component)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, create_component method')
@@ -108,7 +111,7 @@ def create_component(request: HttpRequest, employee_uid, vault_uid):
 
 @api_view(['GET', 'PUT', 'PATCH'])
 def do_component(request: HttpRequest, employee_uid, vault_uid, component_uid):
-    logger.debug(f'Enter {__name__} module, do_component method')
+    logger.debug('Enter %s module, do_component method', __name__)
 
     organization_id = request.query_params.get('organization_id')
 
@@ -119,7 +122,7 @@ def do_component(request: HttpRequest, employee_uid, vault_uid, component_uid):
                                                         vault_uid,
                                                         component_uid,
                                                         request.data)
-            logger.debug(f'Exit {__name__} module, do_component method')
+            logger.debug('Exit %s module, do_component method', __name__)
             return Response(component)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_component method')
@@ -132,7 +135,7 @@ def do_component(request: HttpRequest, employee_uid, vault_uid, component_uid):
                                                            vault_uid,
                                                            component_uid,
                                                            request.data)
-            logger.debug(f'Exit {__name__} module, do_component method')
+            logger.debug('Exit %s module, do_component method', __name__)
             return Response(component)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_component method')
@@ -146,7 +149,7 @@ def do_component(request: HttpRequest, employee_uid, vault_uid, component_uid):
                 organization_id, employee_uid,
                 vault_uid, component_uid, request.data
             )
-            logger.debug(f'Exit {__name__} module, do_component method')
+            logger.debug('Exit %s module, do_component method', __name__)
             return Response(component_serializer)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_component method')
@@ -155,7 +158,7 @@ def do_component(request: HttpRequest, employee_uid, vault_uid, component_uid):
 
 @api_view(['POST'])
 def create_vault_access(request: HttpRequest, employee_uid, vault_uid):
-    logger.debug(f'Enter {__name__} module, create_vault_access method')
+    logger.debug('Enter %s module, create_vault_access method', __name__)
 
     organization_id = request.query_params.get('organization_id')
 
@@ -164,7 +167,7 @@ def create_vault_access(request: HttpRequest, employee_uid, vault_uid):
             organization_id, employee_uid, vault_uid, request.data
         )
 
-        logger.debug(f'Exit {__name__} module, create_vault_access method')
+        logger.debug('Exit %s module, create_vault_access method', __name__)
         return Response(vault_access)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, create_vault_access method')
@@ -176,7 +179,7 @@ def remove_vault_access(request: HttpRequest, employee_uid, vault_uid):
     """used to remove vault access of a vault
     """
     try:
-        logger.debug(f'Enter {__name__} module, remove_vault_access method')
+        logger.debug('Enter %s module, remove_vault_access method', __name__)
 
         organization_id = request.query_params.get('organization_id')
 
@@ -184,17 +187,62 @@ def remove_vault_access(request: HttpRequest, employee_uid, vault_uid):
             organization_id, employee_uid, vault_uid
         )
 
-        logger.debug(f'Exit {__name__} module, remove_vault_access method')
+        logger.debug('Exit %s module, remove_vault_access method', __name__)
         return Response(deleted_vault_access)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, remove_vault_access method')
         raise CustomApiException(e.status_code, e.detail)
 
 
+@api_view(['GET'])
+def decrypt_component(request: HttpRequest, employee_uid, vault_uid,
+                      component_uid):
+    """used to get the decrypted items of a component as a key value map
+    """
+    logger.debug('Enter %s module, decrypt_component method', __name__)
+
+    try:
+        organization_id = request.query_params.get('organization_id')
+
+        secrets = item_service.decrypt_items(
+            organization_id, employee_uid, vault_uid, [component_uid]
+        )
+        logger.debug('Exit %s module, decrypt_component method', __name__)
+        return Response(secrets[str(component_uid)],
+                        headers={'Cache-Control': 'no-store'})
+    except CustomApiException as e:
+        logger.error(f'Exit {__name__} module, decrypt_component method')
+        raise CustomApiException(e.status_code, e.detail)
+
+
+@api_view(['POST'])
+def decrypt_components(request: HttpRequest, employee_uid, vault_uid):
+    """used to get the decrypted items of a list of components as a key
+    value map for each component uid
+    """
+    logger.debug('Enter %s module, decrypt_components method', __name__)
+
+    try:
+        organization_id = request.query_params.get('organization_id')
+        component_uids = request.data.get('components')
+
+        if not isinstance(component_uids, list) or not component_uids:
+            raise CustomApiException(400, 'components is missing')
+
+        secrets = item_service.decrypt_items(
+            organization_id, employee_uid, vault_uid, component_uids
+        )
+        logger.debug('Exit %s module, decrypt_components method', __name__)
+        return Response(secrets, headers={'Cache-Control': 'no-store'})
+    except CustomApiException as e:
+        logger.error(f'Exit {__name__} module, decrypt_components method')
+        raise CustomApiException(e.status_code, e.detail)
+
+
 @api_view(['POST'])
 def decrypt_item(request: HttpRequest, employee_uid, vault_uid, component_uid,
                  item_uid):
-    logger.debug(f'Enter {__name__} module, decrypt_item method')
+    logger.debug('Enter %s module, decrypt_item method', __name__)
 
     try:
         organization_id = request.query_params.get('organization_id')
@@ -202,7 +250,7 @@ def decrypt_item(request: HttpRequest, employee_uid, vault_uid, component_uid,
         decrypted_item = item_service.decrypt_item(
             request.data, organization_id, employee_uid, vault_uid,
             component_uid, item_uid)
-        logger.debug(f'Exit {__name__} module, decrypt_item method')
+        logger.debug('Exit %s module, decrypt_item method', __name__)
         return Response(decrypted_item)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, decrypt_item method')
@@ -211,7 +259,10 @@ def decrypt_item(request: HttpRequest, employee_uid, vault_uid, component_uid,
 
 @api_view(['POST', 'GET'])
 def decrypt(request: HttpRequest):
-    """used to render the decrypted value
+    """used to render the decrypted value of an item which still has its
+    own secret key. Values encrypted with the organization data key have no
+    secret key and are only decrypted through the decrypt endpoints of a
+    vault, which check the access of the employee
     """
     if request.method == 'GET':
         return render(request, 'decrypt.html')
@@ -223,7 +274,8 @@ def decrypt(request: HttpRequest):
             return render(request, 'decrypt.html',
                           {'error': 'Enter both token and secret key'})
 
-        decrypted_value = encryptor.decrypt(token, secret_key)
+        decrypted_value = data_key_service.decrypt_value(None, token,
+                                                         secret_key)
 
         if decrypted_value is None:
             return render(request, 'decrypt.html',
@@ -5,6 +5,7 @@
 import uuid
 
 from django.db import models
+from django.db.models import Q
 
 # from employee.managers import EmployeeManager
 from organization.models import Organization
@@ -45,6 +46,13 @@ class Employee(BaseModel):
 
     class Meta:
         db_table = 'cm_employee'
+        indexes = [
+            # active employees of an organization in employee id order,
+            # which the employee list pages through
+            models.Index(fields=['organization', 'employee_id'],
+                         condition=Q(active=True),
+                         name='cm_employee_organization_idx'),
+        ]
 
     employee_id = models.AutoField(primary_key=True)
     employee_uid = models.UUIDField(default=uuid.uuid4, editable=False,
@@ -70,6 +70,17 @@ class EmployeeSerializer(serializers.ModelSerializer):
         return instance
 
 
+class EmployeeImportSerializer(serializers.ModelSerializer):
+    """validates an imported employee row. Email uniqueness is checked for
+    a whole chunk of rows at once by the import
+    """
+
+    class Meta:
+        model = Employee
+        fields = ['name', 'email', 'password']
+        extra_kwargs = {'email': {'validators': []}}
+
+
 class EmployeeResponseSerializer(serializers.ModelSerializer):
 
     created_vaults = VaultResponseSerializer(many=True)
@@ -1,31 +1,41 @@
 """this module is used to create, update and delete employee details
 """
+import functools
 import logging
 
+from django.db import transaction
+from django.db.models import Q
+
 from rest_framework.exceptions import ValidationError
 
-from credential.models import VaultAccess
+from credential.models import Vault
 from credential.serializers import VaultResponseSerializer
+from credential.service import effective_access_service
 
 from employee.models import Employee
+from employee.serializers import EmployeeImportSerializer
 from employee.serializers import EmployeeResponseSerializer
 from employee.serializers import EmployeeSerializer
 
 from organization.models import Organization
 
+from utils import bulk_import
+from utils import pagination
+from utils import password_hasher
 from utils.api_exceptions import CustomApiException
+from utils.fast_serializer import get_fast_serializer
+from utils.tracing import traced
 
 
 logger = logging.getLogger('credential-manager-logger')
 
 
+@traced
+@transaction.atomic
 def create_employee(organization_id, data):
     """used to create employee in an organization
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{create_employee.__name__} method')
-
         organization = Organization.objects.get(
             organization_id=organization_id, active=True,
         )
@@ -35,39 +45,114 @@ def create_employee(organization_id, data):
 
         employee_serializer = EmployeeSerializer(data=data)
         employee_serializer.is_valid(raise_exception=True)
-        employee_serializer.save()
+        employee = employee_serializer.save()
+
+        effective_access_service.refresh_employee(employee)
 
         logger.debug('Employee creation successful')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{create_employee.__name__} method')
 
         return employee_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details. Employee creation failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_employee.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_employee.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('Organization not exist. Employee creation failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_employee.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
 
 
-def get_employee(organization_id, data):
-    """used to get employee details and associated vaults using employee email
+def build_employees(organization_id, hashing_pool, rows, report):
+    """used to validate a chunk of imported employee rows and build the
+    employees of the valid rows. The passwords of the chunk are hashed
+    together in the hashing pool
     """
-    try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{get_employee.__name__} method')
+    validated_rows = []
+
+    for line, row in rows:
+        employee_serializer = EmployeeImportSerializer(data=row)
+        employee_serializer.is_valid()
+        validated_rows.append((line, employee_serializer))
+
+    emails = set(Employee.objects.filter(email__in=[
+        employee_serializer.validated_data['email']
+        for _, employee_serializer in validated_rows
+        if not employee_serializer.errors
+    ]).values_list('email', flat=True))
+
+    employees = []
+
+    for line, employee_serializer in validated_rows:
+        if employee_serializer.errors:
+            report.add_error(line, employee_serializer.errors)
+            continue
+
+        data = employee_serializer.validated_data
+
+        if data['email'] in emails:
+            report.add_error(line, {'email': [
+                'employee with this email already exists.'
+            ]})
+            continue
+
+        emails.add(data['email'])
+
+        employees.append((line, Employee(
+            name=data['name'], email=data['email'], password=data['password'],
+            organization_id=organization_id, created_by_id=organization_id
+        )))
+
+    passwords = hashing_pool.hash_passwords(
+        [employee.password for _, employee in employees]
+    )
+
+    for (_, employee), password in zip(employees, passwords):
+        employee.password = password
+
+    return employees
+
+
+def save_employees(organization_id, employees):
+    """used to insert a chunk of employees with their effective vault
+    accesses
+    """
+    Employee.objects.bulk_create(employees)
+
+    employee_ids = [employee.employee_id for employee in employees]
+
+    if None in employee_ids:
+        employee_ids = Employee.objects.filter(
+            email__in=[employee.email for employee in employees]
+        ).values_list('employee_id', flat=True)
+
+    effective_access_service.add_new_employees(organization_id,
+                                               employee_ids)
 
+
+def import_employee_rows(organization_id, rows, report=None,
+                         checkpoint=None):
+    """used to import the (line number, row) pairs of an employees file in
+    chunks, hashing the passwords in the hashing pool of the process
+    """
+    return bulk_import.import_rows(
+        rows,
+        functools.partial(build_employees, organization_id,
+                          password_hasher.get_pool()),
+        functools.partial(save_employees, organization_id),
+        report=report, checkpoint=checkpoint
+    )
+
+
+@traced
+def get_employee(organization_id, data, page=None):
+    """used to get employee details and associated vaults using employee email.
+    Every accessible vault is listed once with the access levels it is
+    granted through, paginated by vault id when a page is given
+    """
+    try:
         email = data["email"]
 
         organization = Organization.objects.get(
@@ -81,92 +166,97 @@ def get_employee(organization_id, data):
             organization__active=True
         )
 
-        organization_level_vaults_accesses = VaultAccess.objects.filter(
-            access_level='ORGANIZATION',
-            active=True,
-            organization=organization_id,
-            organization__active=True
-        )
+        if page is not None and page.stream:
+            page = pagination.Page(page.after, page.limit)
 
-        project_level_vaults_accesses = VaultAccess.objects.filter(
-            access_level='PROJECT',
-            active=True,
-            organization=organization_id,
-            organization__active=True,
-            project__employees__employee_id=employee.employee_id
+        vaults = effective_access_service.annotate_granting_scopes(
+            Vault.objects.filter(organization=organization_id, active=True),
+            organization_id, employee.employee_id
+        ).filter(
+            Q(organization_scope__isnull=False)
+            | Q(project_scope__isnull=False)
+            | Q(individual_scope__isnull=False)
         )
 
-        individual_level_vault_accesses = VaultAccess.objects.filter(
-            access_level='INDIVIDUAL',
-            active=True,
-            organization=organization_id,
-            organization__active=True,
-            employee=employee.employee_id
-        )
+        vault_serializer = get_fast_serializer(VaultResponseSerializer)
+        granting_scopes = effective_access_service.GRANTING_SCOPES
 
-        organization_level_vaults = [
-            organization_vault_access.vault
-            for organization_vault_access in organization_level_vaults_accesses
-        ]
+        def serialize(accessible_vaults):
+            rows = list(accessible_vaults.values(
+                *vault_serializer.value_names, 'created_by',
+                *granting_scopes.values()
+            ))
 
-        project_level_vaults = [
-            project_vault_access.vault
-            for project_vault_access in project_level_vaults_accesses
-        ]
+            response_vaults = vault_serializer.serialize_rows(rows)
 
-        individual_level_vaults = [
-            individual_level_vault_access.vault
-            for individual_level_vault_access
-            in individual_level_vault_accesses
-        ]
+            for response_vault, row in zip(response_vaults, rows):
+                access_sources = [
+                    access_level
+                    for access_level, scope_name in granting_scopes.items()
+                    if row[scope_name] is not None
+                ]
 
-        employee_serializer = EmployeeResponseSerializer(employee)
+                if row['created_by'] == employee.employee_id \
+                        or any(row[granting_scopes[access_level]]
+                               == effective_access_service.READ_WRITE
+                               for access_level in access_sources):
+                    response_vault['scope'] \
+                        = effective_access_service.READ_WRITE
+                else:
+                    response_vault['scope'] = effective_access_service.READ
 
-        response_employee = employee_serializer.data
+                response_vault['access_sources'] = access_sources
+
+            return response_vaults
+
+        accessible_vaults = pagination.paginate(vaults, 'vault_id', page,
+                                                serialize)
 
-        response_employee['organization_vaults'] \
-            = VaultResponseSerializer(organization_level_vaults, many=True) \
-            .data
+        if isinstance(accessible_vaults, dict):
+            page_vaults = accessible_vaults['results']
+        else:
+            page_vaults = accessible_vaults
 
-        response_employee['project_vaults'] \
-            = VaultResponseSerializer(project_level_vaults, many=True) \
-            .data
+        employee_serializer = EmployeeResponseSerializer(employee)
+
+        response_employee = employee_serializer.data
 
-        response_employee['individual_vaults'] \
-            = VaultResponseSerializer(individual_level_vaults, many=True) \
-            .data
+        response_employee['vaults'] = accessible_vaults
 
-        logger.debug(f'Exit {__name__} module, {get_employee.__name__} method')
+        for access_level, vault_type in (
+                ('ORGANIZATION', 'organization_vaults'),
+                ('PROJECT', 'project_vaults'),
+                ('INDIVIDUAL', 'individual_vaults')):
+            response_employee[vault_type] = [
+                {name: value for name, value in vault.items()
+                 if name != 'access_sources'}
+                for vault in page_vaults
+                if access_level in vault['access_sources']
+            ]
 
         return response_employee
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Employees fetch failure')
-        logger.error(f'Exit {__name__} module, {get_employee.__name__} method')
         raise CustomApiException(500, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_employee.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('Organization not exist')
-        logger.error(f'Exit {__name__} module, {get_employee.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
     except Employee.DoesNotExist:
         logger.error('Employee not exist')
-        logger.error(f'Exit {__name__} module, {get_employee.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
 
 
-def get_employees(organization_id, data):
-    """used to get all projects from an organization
+@traced
+def get_employees(organization_id, data, page=None):
+    """used to get all employees from an organization, paginated by
+    employee id when a page is given
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{get_employees.__name__} method')
-
         email = data['email']
 
         organization = Organization.objects.get(
@@ -176,38 +266,29 @@ def get_employees(organization_id, data):
         employees = Employee.objects.filter(organization=organization,
                                             active=True)
 
-        employee_serializer = EmployeeSerializer(employees, many=True)
-
-        logger.debug(f'Exit {__name__} module, '
-                     f'{get_employees.__name__} method')
+        employee_serializer = get_fast_serializer(EmployeeSerializer)
 
-        return employee_serializer.data
+        return pagination.paginate(employees, 'employee_id', page,
+                                   employee_serializer.serialize_queryset)
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_employees.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_employees.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('Organization not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_employees.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
 
 
+@traced
+@transaction.atomic
 def update_employee_status(organization_id, employee_uid, data):
     """used to update employee status
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{update_employee_status.__name__} method')
-
         email = data.get("email")
 
         organization = Organization.objects.get(
@@ -222,45 +303,34 @@ def update_employee_status(organization_id, employee_uid, data):
 
         employee.active = not employee.active
         employee.save()
+        effective_access_service.refresh_employee(employee)
 
         employee_serializer = EmployeeSerializer(employee)
 
         logger.debug('Employee status updated successful')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{update_employee_status.__name__} method')
 
         return employee_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details.Employee status update failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_employee_status.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_employee_status.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_employee_status.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
     except Employee.DoesNotExist:
         logger.error('No such employee exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_employee_status.__name__} method')
         raise CustomApiException(400, 'No such employee exist')
 
 
+@traced
 def update_employee(organization_id, employee_uid, data):
     """used to update employee status
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{update_employee.__name__} method')
-
         email = data["email"]
 
         organization = Organization.objects.get(
@@ -280,29 +350,19 @@ def update_employee(organization_id, employee_uid, data):
         employee_serializer.save()
 
         logger.debug('Employee details updated successfully')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{update_employee.__name__} method')
 
         return employee_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details. Employee update failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_employee.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_employee.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_employee.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
     except Employee.DoesNotExist:
         logger.error('No such employee exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_employee.__name__} method')
         raise CustomApiException(400, 'No such employee exist')
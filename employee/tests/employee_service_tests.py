@@ -1,12 +1,25 @@
+import io
+import os
+import tempfile
 import uuid
 from unittest import mock
 
+from django.contrib.auth.hashers import check_password
 from django.test import TestCase
 
+from credential.models import EffectiveVaultAccess
+from credential.models import Vault
+from credential.models import VaultAccess
 from employee.models import Employee
 from employee.service import employee_service
+from files import file_reader
 
+from organization.models import ImportJob
 from organization.models import Organization
+from organization.service import import_job_service
+from project.models import Project
+from utils import bulk_import
+from utils import pagination
 from utils.api_exceptions import CustomApiException
 
 
@@ -58,6 +71,80 @@ class EmployeeServiceTest(TestCase):
         self.assertEqual(employee.get('name'), 'sibi')
         self.assertEqual(employee.get('email'), 'sibi@ideas2it.com')
 
+    def test_get_employee_vaults(self):
+        organization = Organization.objects.get(organization_id=1)
+        employee = Employee.objects.get(employee_id=1)
+
+        owner = Employee.objects.create(
+            name='sasi',
+            email='sasi@ideas2it.com', password='sasi',
+            organization=organization,
+            created_by=organization
+        )
+
+        project = Project.objects.create(
+            name='Credential Manager', email='cm@ideas2it.com',
+            description='Credential Manager',
+            organization=organization, created_by=organization
+        )
+        project.employees.add(employee)
+
+        vaults = [
+            Vault.objects.create(
+                name=f'Vault {index}', description=f'Vault {index}',
+                organization=organization, created_by=owner
+            )
+            for index in range(3)
+        ]
+
+        for vault in vaults:
+            VaultAccess.objects.create(
+                access_level='ORGANIZATION', scope='READ',
+                vault=vault, organization=organization, created_by=owner
+            )
+
+        VaultAccess.objects.create(
+            access_level='PROJECT', scope='READ/WRITE', vault=vaults[0],
+            project=project, organization=organization, created_by=owner
+        )
+        VaultAccess.objects.create(
+            access_level='INDIVIDUAL', scope='READ', vault=vaults[0],
+            employee=employee, organization=organization, created_by=owner
+        )
+
+        with self.assertNumQueries(4):
+            response_employee = employee_service.get_employee(
+                1, {'email': 'sibi@ideas2it.com'}
+            )
+
+        response_vaults = response_employee.get('vaults')
+
+        self.assertEqual([vault.get('vault_id') for vault in response_vaults],
+                         [vault.vault_id for vault in vaults])
+        self.assertEqual(response_vaults[0].get('access_sources'),
+                         ['ORGANIZATION', 'PROJECT', 'INDIVIDUAL'])
+        self.assertEqual(response_vaults[0].get('scope'), 'READ/WRITE')
+        self.assertEqual(response_vaults[1].get('access_sources'),
+                         ['ORGANIZATION'])
+        self.assertEqual(response_vaults[1].get('scope'), 'READ')
+
+        self.assertEqual(len(response_employee.get('organization_vaults')), 3)
+        self.assertEqual(len(response_employee.get('project_vaults')), 1)
+        self.assertEqual(len(response_employee.get('individual_vaults')), 1)
+
+        page = pagination.Page(after=vaults[0].vault_id, limit=1)
+
+        response_employee = employee_service.get_employee(
+            1, {'email': 'sibi@ideas2it.com'}, page
+        )
+
+        self.assertEqual(
+            response_employee.get('vaults'),
+            {'results': response_vaults[1:2],
+             'next_cursor': vaults[1].vault_id}
+        )
+        self.assertEqual(response_employee.get('project_vaults'), [])
+
     def test_get_employees(self):
         payload = {
             'email': 'admin@ideas2it.com'
@@ -109,3 +196,101 @@ class EmployeeServiceTest(TestCase):
             employee_service.update_employee(
                 1, uuid.uuid4(), {}
             )
+
+
+class ImportEmployeesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+        cls.owner = Employee.objects.create(
+            name='sibi dhanapal',
+            email='sibi@ideas2it.com', password='sibi',
+            organization=cls.organization,
+            created_by=cls.organization
+        )
+
+        cls.vault = Vault.objects.create(
+            name='Organization Vault',
+            description='Organization Vault',
+            organization=cls.organization,
+            created_by=cls.owner
+        )
+
+        VaultAccess.objects.create(
+            access_level='ORGANIZATION', scope='READ',
+            vault=cls.vault, organization=cls.organization,
+            created_by=cls.owner
+        )
+
+    def test_import_employees(self):
+        csv_file = io.StringIO(
+            'name,email,password\n'
+            'sasi kumar,sasi@ideas2it.com,sasi\n'
+            'ab,ab@ideas2it.com,ab\n'
+            'sibi raj,sibi@ideas2it.com,sibi\n'
+            'ajith kumar,ajith@ideas2it.com,ajith\n'
+            'ajith kumar,ajith@ideas2it.com,ajith\n'
+            '\n'
+            'kumaran raj,kumaran\n'
+        )
+
+        with mock.patch.object(bulk_import, 'CHUNK_SIZE', 2):
+            report = employee_service.import_employee_rows(
+                self.organization.organization_id,
+                file_reader.read_employees(csv_file)
+            ).as_dict()
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(report['failed'], 4)
+        self.assertEqual([error['line'] for error in report['errors']],
+                         [3, 4, 6, 8])
+        self.assertIn('email', report['errors'][1]['errors'])
+        self.assertIn('password', report['errors'][3]['errors'])
+
+        employee = Employee.objects.get(email='sasi@ideas2it.com')
+
+        self.assertTrue(check_password('sasi', employee.password))
+        self.assertEqual(employee.organization_id,
+                         self.organization.organization_id)
+        self.assertTrue(EffectiveVaultAccess.objects.filter(
+            employee=employee.employee_id, vault=self.vault.vault_id,
+            scope='READ'
+        ).exists())
+
+    def test_import_file_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'staff.csv'), 'w') as file:
+                file.write('name,email,password\n'
+                           'sasi kumar,sasi@ideas2it.com,sasi\n')
+
+            with self.settings(IMPORT_DIR=directory), \
+                    self.captureOnCommitCallbacks():
+                import_job = import_job_service.create_job(
+                    self.organization.organization_id, 'EMPLOYEES',
+                    {'email': self.organization.email, 'path': 'staff.csv'}
+                )
+
+                with self.assertRaises(CustomApiException):
+                    import_job_service.create_job(
+                        self.organization.organization_id, 'EMPLOYEES',
+                        {'email': self.organization.email,
+                         'path': '../staff.csv'}
+                    )
+
+                import_job_service.run_job(ImportJob.objects.get(
+                    import_job_uid=import_job['import_job_uid']
+                ).import_job_id)
+
+        self.assertTrue(
+            Employee.objects.filter(email='sasi@ideas2it.com').exists()
+        )
+
+        with self.assertRaises(CustomApiException):
+            import_job_service.create_job(
+                self.organization.organization_id, 'EMPLOYEES', {}
+            )
@@ -7,16 +7,14 @@ from django.http import HttpRequest
 from oauth2_provider.models import AccessToken
 
 from rest_framework.decorators import api_view
-from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from employee.serializers import EmployeeSerializer
 from employee.service import employee_service
 
-from files import file_reader
-
 from organization.models import Organization
+from organization.service import import_job_service
 
+from utils import pagination
 from utils.api_exceptions import CustomApiException
 
 
@@ -28,64 +26,38 @@ def create_employee(request: HttpRequest):
     """used to create employee in an organization
     """
     try:
-        logger.debug(f'Enter {__name__} module, create_employee method')
+        logger.debug('Enter %s module, create_employee method', __name__)
         organization_id = request.query_params.get('organization_id')
         employee = employee_service.create_employee(organization_id,
                                                     request.data)
-        logger.debug(f'Exit {__name__} module, create_employee method')
+        logger.debug('Exit %s module, create_employee method', __name__)
         return Response(employee)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, create_employee method')
         raise CustomApiException(e.status_code, e.detail)
 
 
-@api_view(['GET'])
+@api_view(['GET', 'POST'])
 def create_employees(request: HttpRequest):
-    """used to create employees using employees csv file
+    """used to queue the import of an uploaded employees csv file, or of a
+    csv file of the import directory. The import job is returned, its
+    progress is read from the import job endpoint of the organization
     """
     try:
-        logger.debug(f'Enter {__name__} module, create_employees method')
-
-        email = request.data.get("email")
-
-        employee_datas = file_reader.create_employees()
+        logger.debug('Enter %s module, create_employees method', __name__)
 
         organization_id = request.query_params.get('organization_id')
-
-        organization = Organization.objects.get(
-            organization_id=organization_id,
-            active=True,
-            email=email
+        import_job = import_job_service.create_job(
+            organization_id, 'EMPLOYEES', request.data,
+            request.FILES.get('file')
         )
 
-        for employee in employee_datas:
-            employee['organization'] = organization.organization_id
-            employee['created_by'] = organization.organization_id
+        logger.debug('Exit %s module, create_employees method', __name__)
 
-        employee_list_serializer = EmployeeSerializer(
-            data=employee_datas, many=True
-        )
-
-        employee_list_serializer.is_valid(raise_exception=True)
-        employee_list_serializer.save()
-
-        logger.debug('Employees creation successful')
-        logger.debug(f'Exit {__name__} module, create_employees method')
-
-        return Response(employee_list_serializer.data)
-    except ValidationError:
-        logger.error('Load valid details in the file. '
-                     'Employees creation failure')
-        logger.error(f'Exit {__name__} module, create_employees method')
-        raise CustomApiException(500, 'Load valid details in the file')
-    except KeyError:
-        logger.error('Enter valid details.Employees creation failure')
-        logger.error(f'Exit {__name__} module, create_employees method')
-        raise CustomApiException(400, 'Enter valid details')
-    except Organization.DoesNotExist:
-        logger.error('Organization not exist.Employees creation failure')
+        return Response(import_job, status=202)
+    except CustomApiException as e:
         logger.error(f'Exit {__name__} module, create_employees method')
-        raise CustomApiException(404, 'No such organization exist')
+        raise CustomApiException(e.status_code, e.detail)
 
 
 @api_view(['GET'])
@@ -94,10 +66,12 @@ def get_employee(request: HttpRequest):
     """used to get employee details and associated vaults using employee email
     """
     try:
-        logger.debug(f'Enter {__name__} module, get_employee method')
+        logger.debug('Enter %s module, get_employee method', __name__)
         organization_id = request.query_params.get('organization_id')
-        employee = employee_service.get_employee(organization_id, request.data)
-        logger.debug(f'Exit {__name__} module, get_employee method')
+        page = pagination.get_page(request.query_params)
+        employee = employee_service.get_employee(organization_id, request.data,
+                                                 page)
+        logger.debug('Exit %s module, get_employee method', __name__)
         return Response(employee)
     except CustomApiException as e:
         logger.error('Load valid details in the file. '
@@ -110,14 +84,15 @@ def get_employee(request: HttpRequest):
 def get_employees(request: HttpRequest):
     """used to get all vaults from an organization
     """
-    logger.info(f'Enter {__name__} module, {get_employees.__name__} method')
+    logger.info('Enter %s module, %s method', __name__, get_employees.__name__)
 
     try:
         organization_id = request.query_params.get('organization_id')
+        page = pagination.get_page(request.query_params)
         employee_serializer = employee_service.get_employees(
-            organization_id, request.data
+            organization_id, request.data, page
         )
-        return Response(employee_serializer)
+        return pagination.get_response(employee_serializer)
     except KeyError:
         logger.error('Enter valid details')
         logger.error(f'Exit {__name__} module, '
@@ -141,7 +116,7 @@ def do_employee(request: HttpRequest, employee_uid):
             employee_serializer = employee_service.update_employee(
                 organization_id, employee_uid, request.data
             )
-            logger.debug(f'Exit {__name__} module, do_employee method')
+            logger.debug('Exit %s module, do_employee method', __name__)
             return Response(employee_serializer)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_employee method')
@@ -154,7 +129,7 @@ def do_employee(request: HttpRequest, employee_uid):
             employee_serializer = employee_service.update_employee_status(
                 organization_id, employee_uid, request.data
             )
-            logger.debug(f'Exit {__name__} module, do_employee method')
+            logger.debug('Exit %s module, do_employee method', __name__)
             return Response(employee_serializer)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_employee method')
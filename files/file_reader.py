@@ -1,73 +1,71 @@
-"""this module used to create employees and projects
-using csv files
+"""this module used to read employees and projects from csv files. The rows
+are read one at a time, so large files are never loaded into memory
 """
 import csv
 import logging
+import os
 
-from pathlib import Path
+from django.conf import settings
 
-from CredentialManager import settings
+from utils.api_exceptions import CustomApiException
 
 
 logger = logging.getLogger('credential-manager-logger')
 
+EMPLOYEE_FIELDS = ('name', 'email', 'password')
+PROJECT_FIELDS = ('name', 'email', 'description')
 
-def create_employees():
-    """Read employees.txt file as csv and convert
-    into the list of employee dictionary
-    """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{create_employees.__name__} method')
-
-    employees = list()
+EMPLOYEES_FILE = 'employees.txt'
+PROJECTS_FILE = 'projects.txt'
 
-    with open(Path(str(settings.BASE_DIR) + '\\files\\' + 'employees.txt')) \
-            as csv_file:
-        csv_reader = csv.reader(csv_file, delimiter=',')
 
-        line_count = 0
-
-        for row in csv_reader:
-            if line_count == 0:
-                line_count += 1
-            else:
-                employee = dict(name=row[0], email=row[1],
-                                password=row[2])
+def get_import_path(file_name):
+    """used to resolve a file name inside the import directory. Paths
+    leading out of the import directory are refused
+    """
+    import_dir = os.path.realpath(settings.IMPORT_DIR)
+    path = os.path.realpath(os.path.join(import_dir, file_name))
 
-                employees.append(employee)
-                line_count += 1
+    if os.path.commonpath([import_dir, path]) != import_dir:
+        logger.error(f'Import file {file_name} is outside the import '
+                     f'directory')
+        raise CustomApiException(400, 'Enter valid file path')
 
-    logger.debug(f'Exit {__name__} module, '
-                 f'{create_employees.__name__} method')
+    if not os.path.isfile(path):
+        logger.error(f'Import file {file_name} is not exist')
+        raise CustomApiException(404, 'No such file exist')
 
-    return employees
+    return path
 
 
-def create_projects():
-    """Read projects.txt file as csv and convert
-    into the list of project dictionary
+def read_rows(csv_file, field_names):
+    """used to read the rows of a csv file with a header line as
+    (line number, row dictionary) pairs. Blank lines are skipped and
+    missing columns are left out of the row
     """
-    logger.debug(f'Enter {__name__} module, '
-                 f'{create_projects.__name__} method')
+    csv_reader = csv.reader(csv_file, delimiter=',')
 
-    projects = list()
+    next(csv_reader, None)
 
-    with open(Path(str(settings.BASE_DIR) + '\\files\\' + 'projects.txt')) \
-            as csv_file:
-        csv_reader = csv.reader(csv_file, delimiter=',')
+    for row in csv_reader:
+        if not any(value.strip() for value in row):
+            continue
 
-        line_count = 0
+        yield csv_reader.line_num, {
+            field_name: value.strip()
+            for field_name, value in zip(field_names, row)
+        }
 
-        for row in csv_reader:
-            if line_count == 0:
-                line_count += 1
-            else:
-                project = dict(name=row[0], email=row[1],
-                               description=row[2])
-                projects.append(project)
-                line_count += 1
 
-    logger.debug(f'Exit {__name__} module, '
-                 f'{create_projects.__name__} method')
+def read_employees(csv_file):
+    """Read the employee rows of a csv file with name, email and password
+    columns
+    """
+    return read_rows(csv_file, EMPLOYEE_FIELDS)
+
 
-    return projects
+def read_projects(csv_file):
+    """Read the project rows of a csv file with name, email and description
+    columns
+    """
+    return read_rows(csv_file, PROJECT_FIELDS)
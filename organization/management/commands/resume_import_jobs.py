@@ -0,0 +1,26 @@
+"""This command is used to resume the import jobs which failed or were
+interrupted by a stopped process. The jobs are run in this process, one
+after the other, each after its last committed line
+"""
+from django.core.management.base import BaseCommand
+
+from organization.models import ImportJob
+from organization.service import import_job_service
+
+
+class Command(BaseCommand):
+    help = 'Resume the failed and interrupted import jobs'
+
+    def handle(self, *args, **options):
+        import_job_ids = import_job_service.get_resumable_job_ids()
+
+        for import_job_id in import_job_ids:
+            import_job_service.run_job(import_job_id)
+
+            import_job = ImportJob.objects.get(import_job_id=import_job_id)
+
+            self.stdout.write(f'Import job {import_job.import_job_uid} '
+                              f'{import_job.status}, {import_job.created} '
+                              f'created, {import_job.failed} failed')
+
+        self.stdout.write(f'Resumed {len(import_job_ids)} import jobs')
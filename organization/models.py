@@ -34,3 +34,58 @@ class Organization(BaseModel):
 
     def __str__(self):
         return self.name
+
+
+# model to track a csv import run in the background. line is the last line
+# of the file whose chunk is committed, an interrupted job resumes after it
+class ImportJob(BaseModel):
+
+    class Meta:
+        db_table = 'cm_import_job'
+
+    kinds = [
+        ('EMPLOYEES', 'EMPLOYEES'),
+        ('PROJECTS', 'PROJECTS'),
+    ]
+
+    statuses = [
+        ('PENDING', 'PENDING'),
+        ('RUNNING', 'RUNNING'),
+        ('COMPLETED', 'COMPLETED'),
+        ('FAILED', 'FAILED'),
+    ]
+
+    import_job_id = models.AutoField(primary_key=True)
+    import_job_uid = models.UUIDField(default=uuid.uuid4, editable=False,
+                                      unique=True)
+    kind = models.CharField(choices=kinds, max_length=20)
+    status = models.CharField(choices=statuses, default='PENDING',
+                              max_length=20)
+    path = models.CharField(max_length=255)
+    # whether the file is a copy of an upload, removed once imported
+    uploaded = models.BooleanField(default=False)
+
+    line = models.IntegerField(default=0)
+    created = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    errors = models.JSONField(default=list)
+    message = models.TextField(blank=True, default='')
+
+    # token of the run which owns the job and the last renewal of its
+    # lease, only the owner records progress
+    owner = models.CharField(max_length=32, blank=True, default='')
+    heartbeat_at = models.DateTimeField(null=True)
+
+    # rows done when the current run started and the time it started,
+    # which give the throughput of the run
+    run_rows = models.IntegerField(default=0)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE,
+                                     to_field='organization_id',
+                                     db_column='organization_id',
+                                     related_name='import_jobs')
+
+    def __str__(self):
+        return f'{self.kind} {self.import_job_uid}'
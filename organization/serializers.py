@@ -1,8 +1,10 @@
 """This module contains serializer for tenant model
 """
 from django.contrib.auth.hashers import make_password
+from django.utils import timezone
 from rest_framework import serializers
 
+from organization.models import ImportJob
 from organization.models import Organization
 
 
@@ -36,3 +38,30 @@ class OrganizationSerializer(serializers.ModelSerializer):
         instance.save()
 
         return instance
+
+
+# serializer for the status of an import job
+class ImportJobSerializer(serializers.ModelSerializer):
+    rows_done = serializers.SerializerMethodField()
+    throughput = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = ('import_job_uid', 'kind', 'status', 'line',
+                  'rows_done', 'created', 'failed', 'throughput', 'errors',
+                  'message', 'created_at', 'started_at', 'finished_at',
+                  'updated_at')
+
+    def get_rows_done(self, import_job):
+        return import_job.created + import_job.failed
+
+    # rows per second of the current or last run
+    def get_throughput(self, import_job):
+        if import_job.started_at is None:
+            return None
+
+        elapsed = ((import_job.finished_at or timezone.now())
+                   - import_job.started_at).total_seconds()
+        rows = import_job.created + import_job.failed - import_job.run_rows
+
+        return round(rows / elapsed, 1) if elapsed > 0 else None
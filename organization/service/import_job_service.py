@@ -0,0 +1,345 @@
+"""this module is used to run the csv imports of an organization in the
+background. The jobs are run by a local pool of worker threads, one chunk of
+rows at a time, and the progress of each committed chunk is recorded on the
+job, so an interrupted job resumes after its last committed chunk
+"""
+import csv
+import datetime
+import functools
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from files import file_reader
+
+from organization.models import ImportJob
+from organization.models import Organization
+from organization.serializers import ImportJobSerializer
+
+from utils import bulk_import
+from utils.api_exceptions import CustomApiException
+from utils.tracing import traced
+
+
+logger = logging.getLogger('credential-manager-logger')
+
+# row reader, row importer and default file of each kind of job
+IMPORTS = {
+    'EMPLOYEES': ('files.file_reader.read_employees',
+                  'employee.service.employee_service.import_employee_rows',
+                  file_reader.EMPLOYEES_FILE),
+    'PROJECTS': ('files.file_reader.read_projects',
+                 'project.service.project_service.import_project_rows',
+                 file_reader.PROJECTS_FILE),
+}
+
+executor = None
+executor_lock = threading.Lock()
+
+
+class ImportJobLost(Exception):
+    """raised when the lease of a job has been taken over by another worker
+    """
+
+
+class Heartbeat:
+    """thread renewing the lease of a running job, independently of how
+    long its chunks take
+    """
+
+    def __init__(self, import_job_id, owner):
+        self.import_job_id = import_job_id
+        self.owner = owner
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True,
+                                       name=f'import-job-{import_job_id}')
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.stopped.set()
+        self.thread.join()
+        return False
+
+    def run(self):
+        try:
+            while not self.stopped.wait(settings.IMPORT_JOBS['HEARTBEAT']):
+                renewed = ImportJob.objects.filter(
+                    import_job_id=self.import_job_id, owner=self.owner
+                ).update(heartbeat_at=timezone.now())
+
+                if not renewed:
+                    return
+        finally:
+            connections.close_all()
+
+
+def get_executor():
+    """used to get the pool of import threads, started by the first job
+    of the process
+    """
+    global executor
+
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.IMPORT_JOBS['WORKERS'],
+                thread_name_prefix='import-job'
+            )
+
+        return executor
+
+
+def get_resumable():
+    """used to get the filter of the jobs which can be resumed, the failed
+    jobs, the queued jobs of a stopped process and the running jobs whose
+    lease is not renewed
+    """
+    stale_at = timezone.now() - datetime.timedelta(
+        seconds=settings.IMPORT_JOBS['STALE_AFTER']
+    )
+
+    return Q(status='FAILED') \
+        | Q(status='PENDING', updated_at__lt=stale_at) \
+        | Q(status='RUNNING', heartbeat_at__lt=stale_at)
+
+
+def store_upload(file):
+    """used to copy an uploaded file into the job directory, so the job can
+    read it again when it is resumed
+    """
+    os.makedirs(settings.IMPORT_JOBS['DIR'], exist_ok=True)
+    path = os.path.join(settings.IMPORT_JOBS['DIR'], f'{uuid.uuid4()}.csv')
+
+    with open(path, 'wb') as job_file:
+        for chunk in file.chunks():
+            job_file.write(chunk)
+
+    return path
+
+
+def submit(import_job_id):
+    """used to queue a job once the transaction which created it commits
+    """
+    transaction.on_commit(
+        lambda: get_executor().submit(run_in_thread, import_job_id)
+    )
+
+
+def run_in_thread(import_job_id):
+    try:
+        run_job(import_job_id)
+    finally:
+        connections.close_all()
+
+
+@traced
+def create_job(organization_id, kind, data, file=None):
+    """used to queue the import of an uploaded csv file, or of a csv file of
+    the import directory, and get the job
+    """
+    try:
+        organization = Organization.objects.get(
+            organization_id=organization_id, active=True,
+            email=data['email']
+        )
+
+        if file is not None:
+            path = store_upload(file)
+        else:
+            path = file_reader.get_import_path(
+                data.get('path', IMPORTS[kind][2])
+            )
+
+        import_job = ImportJob.objects.create(
+            kind=kind, path=path, uploaded=file is not None,
+            organization=organization
+        )
+
+        submit(import_job.import_job_id)
+
+        logger.debug('Import job %s queued', import_job.import_job_uid)
+
+        return ImportJobSerializer(import_job).data
+    except KeyError as ke:
+        message = ke.args[0] + ' is missing'
+        logger.error(message)
+        raise CustomApiException(400, message)
+    except Organization.DoesNotExist:
+        logger.error('Organization not exist. Import job creation failure')
+        raise CustomApiException(404, 'No such organization exist')
+
+
+def claim_job(import_job_id):
+    """used to mark a job running, unless it is run by another worker.
+    Returns the owner token of the run, None when the job is not claimed
+    """
+    now = timezone.now()
+    owner = uuid.uuid4().hex
+
+    claimed = ImportJob.objects.filter(
+        Q(status='PENDING') | get_resumable(), import_job_id=import_job_id
+    ).update(
+        status='RUNNING', owner=owner, heartbeat_at=now, message='',
+        started_at=now, finished_at=None,
+        run_rows=F('created') + F('failed'), updated_at=now
+    )
+
+    return owner if claimed else None
+
+
+def save_checkpoint(import_job_id, owner, line, report):
+    """used to record the progress of a job, in the transaction of the
+    chunk it follows. The chunk is rolled back when the job is owned by
+    another run
+    """
+    now = timezone.now()
+
+    saved = ImportJob.objects.filter(
+        import_job_id=import_job_id, owner=owner
+    ).update(
+        line=line, created=report.created, failed=report.failed,
+        errors=report.errors, heartbeat_at=now, updated_at=now
+    )
+
+    if not saved:
+        raise ImportJobLost(f'Import job {import_job_id} is taken over')
+
+
+def finish_job(import_job_id, owner, status, message=''):
+    """used to record the end of a run, returns whether the run still
+    owned the job
+    """
+    now = timezone.now()
+
+    return ImportJob.objects.filter(
+        import_job_id=import_job_id, owner=owner
+    ).update(
+        status=status, message=message, finished_at=now, updated_at=now
+    ) == 1
+
+
+def run_job(import_job_id):
+    """used to import the rows of a job after its last committed line. A
+    job which can not be read or stops on an error is marked failed and
+    can be resumed
+    """
+    owner = claim_job(import_job_id)
+
+    if owner is None:
+        logger.debug('Import job %s is not runnable', import_job_id)
+        return
+
+    import_job = ImportJob.objects.get(import_job_id=import_job_id)
+    read_rows, import_rows, _ = IMPORTS[import_job.kind]
+    report = bulk_import.ImportReport(import_job.created, import_job.failed,
+                                      import_job.errors)
+
+    try:
+        with Heartbeat(import_job_id, owner), \
+                open(import_job.path, encoding='utf-8-sig',
+                     newline='') as csv_file:
+            import_string(import_rows)(
+                import_job.organization_id,
+                ((line, row) for line, row
+                 in import_string(read_rows)(csv_file)
+                 if line > import_job.line),
+                report,
+                functools.partial(save_checkpoint, import_job_id, owner)
+            )
+    except ImportJobLost as e:
+        logger.warning(f'{e}. Import job run stopped')
+        return
+    except (OSError, csv.Error, UnicodeDecodeError) as e:
+        logger.error(f'Import job {import_job_id} failure. {e}')
+        finish_job(import_job_id, owner, 'FAILED', 'Enter valid csv file')
+        return
+    except Exception as e:
+        logger.exception(f'Import job {import_job_id} failure. {e}')
+        finish_job(import_job_id, owner, 'FAILED',
+                   'Import failure, resume the job')
+        return
+
+    if not finish_job(import_job_id, owner, 'COMPLETED'):
+        logger.warning(f'Import job {import_job_id} is taken over')
+        return
+
+    if import_job.uploaded:
+        os.remove(import_job.path)
+
+    logger.debug('Import job %s completed. %s created, %s failed',
+                 import_job_id, report.created, report.failed)
+
+
+def load_job(organization_id, import_job_uid, data):
+    """used to load an import job of an organization, which is identified
+    by its email
+    """
+    try:
+        organization = Organization.objects.get(
+            organization_id=organization_id, active=True,
+            email=data['email']
+        )
+
+        return ImportJob.objects.get(organization=organization,
+                                     import_job_uid=import_job_uid)
+    except KeyError as ke:
+        message = ke.args[0] + ' is missing'
+        logger.error(message)
+        raise CustomApiException(400, message)
+    except (Organization.DoesNotExist, ValueError):
+        logger.error('Organization not exist. Import job fetch failure')
+        raise CustomApiException(404, 'No such organization exist')
+    except ImportJob.DoesNotExist:
+        logger.error('Import job not exist')
+        raise CustomApiException(404, 'No such import job exist')
+
+
+@traced
+def get_job(organization_id, import_job_uid, data):
+    """used to get the status and progress of an import job
+    """
+    return ImportJobSerializer(
+        load_job(organization_id, import_job_uid, data)
+    ).data
+
+
+@traced
+def resume_job(organization_id, import_job_uid, data):
+    """used to queue again a failed or interrupted import job, which
+    continues after its last committed line
+    """
+    import_job = load_job(organization_id, import_job_uid, data)
+
+    resumed = ImportJob.objects.filter(
+        get_resumable(), import_job_id=import_job.import_job_id
+    ).update(status='PENDING', updated_at=timezone.now())
+
+    if not resumed:
+        logger.error(f'Import job {import_job_uid} is {import_job.status}')
+        raise CustomApiException(409, 'Import job is not resumable')
+
+    submit(import_job.import_job_id)
+    import_job.refresh_from_db()
+
+    return ImportJobSerializer(import_job).data
+
+
+def get_resumable_job_ids():
+    """used to get the ids of the jobs to resume after a restart
+    """
+    return list(ImportJob.objects.filter(get_resumable()).order_by(
+        'import_job_id'
+    ).values_list('import_job_id', flat=True))
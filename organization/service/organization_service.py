@@ -9,65 +9,56 @@ from rest_framework.exceptions import ValidationError
 from organization.models import Organization
 from organization.serializers import OrganizationSerializer
 
+from utils import pagination
 from utils.api_exceptions import CustomApiException
+from utils.fast_serializer import get_fast_serializer
+from utils.tracing import traced
 
 
 logger = logging.getLogger('credential-manager-logger')
 
 
+@traced
 def create_organization(data):
     """used to create organization
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{create_organization.__name__} method')
-
         organization_serializer = OrganizationSerializer(data=data)
         organization_serializer.is_valid(raise_exception=True)
         organization_serializer.save()
 
         logger.debug('Organization creation successful')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{create_organization.__name__} method')
 
         return organization_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Organization creation failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_organization.__name__} method')
         raise CustomApiException(400, message)
 
 
-def get_organizations():
-    """used to get all organizations
+@traced
+def get_organizations(page=None):
+    """used to get all organizations, paginated by organization id
+    when a page is given
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{get_organizations.__name__} method')
-
         organizations = Organization.objects.filter(active=True)
-        organization_serializer = OrganizationSerializer(organizations,
-                                                         many=True)
+        organization_serializer = get_fast_serializer(OrganizationSerializer)
 
-        logger.debug(f'Exit {__name__} module, '
-                     f'{get_organizations.__name__} method')
-
-        return organization_serializer.data
+        return pagination.paginate(
+            organizations, 'organization_id', page,
+            organization_serializer.serialize_queryset
+        )
     except IntegrityError:
         logger.error('Organizations fetch failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_organizations.__name__} method')
         raise CustomApiException(500, 'Organizations fetch failure')
 
 
+@traced
 def get_organization(organization_uid, data):
     """used to get an organization details
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{get_organization.__name__} method')
-
         email = data['email']
 
         organization = Organization.objects.get(
@@ -77,36 +68,26 @@ def get_organization(organization_uid, data):
         organization_serializer = OrganizationSerializer(organization)
 
         logger.debug('Organization fetch successful')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{get_organization.__name__} method')
 
         return organization_serializer.data
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_organization.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_organization.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_organization.__name__} method')
         raise CustomApiException(400, message)
 
 
+@traced
 def update_organization(organization_uid, data):
     """used to update organization details
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{update_organization.__name__} method')
-
         email = data["email"]
 
         organization = Organization.objects.get(
@@ -122,36 +103,26 @@ def update_organization(organization_uid, data):
         organization_serializer.save()
 
         logger.debug('Organization update successful')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{update_organization.__name__} method')
 
         return organization_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details. Organization update failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_organization.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_organization.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_organization.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
 
 
+@traced
 def update_organization_status(organization_uid, data):
     """used to update organization status
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{update_organization_status.__name__} method')
-
         email = data['email']
 
         organization = Organization.objects.get(
@@ -165,24 +136,16 @@ def update_organization_status(organization_uid, data):
         organization_serializer = OrganizationSerializer(organization)
 
         logger.debug('Organization status updated successful')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{update_organization_status.__name__} method')
 
         return organization_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details. Organization status update failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_organization_status.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_organization_status.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_organization_status.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
@@ -0,0 +1,237 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from employee.models import Employee
+from employee.service import employee_service
+from organization.models import ImportJob
+from organization.models import Organization
+from organization.service import import_job_service
+from utils import bulk_import
+from utils.api_exceptions import CustomApiException
+
+
+EMPLOYEES = (
+    'name,email,password\n'
+    'sasi kumar,sasi@ideas2it.com,sasi\n'
+    'ab,ab@ideas2it.com,ab\n'
+    'ajith kumar,ajith@ideas2it.com,ajith\n'
+    'kumaran raj,kumaran@ideas2it.com,kumaran\n'
+    'sibi raj,sibi@ideas2it.com,sibi\n'
+)
+
+
+class ImportJobServiceTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='ideas2it',
+            email='admin@ideas2it.com', password='admin',
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = override_settings(IMPORT_JOBS={
+            'WORKERS': 1, 'DIR': self.directory.name, 'HEARTBEAT': 3600,
+            'STALE_AFTER': 300,
+        })
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def create_job(self, content=EMPLOYEES):
+        with self.captureOnCommitCallbacks() as callbacks:
+            import_job = import_job_service.create_job(
+                self.organization.organization_id, 'EMPLOYEES',
+                {'email': self.organization.email},
+                SimpleUploadedFile('employees.csv', content.encode())
+            )
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(import_job['status'], 'PENDING')
+
+        return ImportJob.objects.get(
+            import_job_uid=import_job['import_job_uid']
+        )
+
+    def test_run_job(self):
+        import_job = self.create_job()
+
+        self.assertTrue(os.path.isfile(import_job.path))
+
+        with mock.patch.object(bulk_import, 'CHUNK_SIZE', 2):
+            import_job_service.run_job(import_job.import_job_id)
+
+        status = import_job_service.get_job(
+            self.organization.organization_id, import_job.import_job_uid,
+            {'email': self.organization.email}
+        )
+
+        self.assertEqual(status['status'], 'COMPLETED')
+        self.assertEqual(status['rows_done'], 5)
+        self.assertEqual(status['created'], 4)
+        self.assertEqual(status['failed'], 1)
+        self.assertEqual(status['line'], 6)
+        self.assertEqual([error['line'] for error in status['errors']], [3])
+        self.assertIsNotNone(status['throughput'])
+        self.assertFalse(os.path.exists(import_job.path))
+
+    def test_resume_job(self):
+        import_job = self.create_job()
+        save_employees = employee_service.save_employees
+        calls = []
+
+        def crash_on_second_chunk(organization_id, employees):
+            calls.append(employees)
+
+            if len(calls) == 2:
+                raise RuntimeError('worker stopped')
+
+            save_employees(organization_id, employees)
+
+        with mock.patch.object(bulk_import, 'CHUNK_SIZE', 2), \
+                mock.patch.object(employee_service, 'save_employees',
+                                  side_effect=crash_on_second_chunk):
+            import_job_service.run_job(import_job.import_job_id)
+
+        import_job.refresh_from_db()
+
+        # the first chunk is committed, the second is rolled back
+        self.assertEqual(import_job.status, 'FAILED')
+        self.assertEqual(import_job.line, 3)
+        self.assertEqual((import_job.created, import_job.failed), (1, 1))
+        self.assertEqual(Employee.objects.count(), 1)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            status = import_job_service.resume_job(
+                self.organization.organization_id, import_job.import_job_uid,
+                {'email': self.organization.email}
+            )
+
+        self.assertEqual(status['status'], 'PENDING')
+        self.assertEqual(len(callbacks), 1)
+
+        with mock.patch.object(bulk_import, 'CHUNK_SIZE', 2):
+            import_job_service.run_job(import_job.import_job_id)
+
+        import_job.refresh_from_db()
+
+        self.assertEqual(import_job.status, 'COMPLETED')
+        self.assertEqual((import_job.created, import_job.failed), (4, 1))
+        self.assertEqual(Employee.objects.count(), 4)
+
+        with self.assertRaises(CustomApiException) as context:
+            import_job_service.resume_job(self.organization.organization_id,
+                                          import_job.import_job_uid,
+                                          {'email': self.organization.email})
+
+        self.assertEqual(context.exception.status_code, 409)
+
+    def test_concurrent_claims(self):
+        import_job = self.create_job()
+
+        owners = [import_job_service.claim_job(import_job.import_job_id)
+                  for _ in range(2)]
+
+        self.assertIsNotNone(owners[0])
+        self.assertIsNone(owners[1])
+
+        # the lease of the first run is not renewed, a second run takes over
+        ImportJob.objects.filter(import_job_id=import_job.import_job_id) \
+            .update(heartbeat_at='2020-01-01T00:00:00Z')
+
+        self.assertEqual(import_job_service.get_resumable_job_ids(),
+                         [import_job.import_job_id])
+
+        owner = import_job_service.claim_job(import_job.import_job_id)
+
+        self.assertNotIn(owner, (None, owners[0]))
+        self.assertEqual(import_job_service.get_resumable_job_ids(), [])
+
+        # the first run can no longer commit chunks or finish the job
+        with self.assertRaises(import_job_service.ImportJobLost):
+            import_job_service.save_checkpoint(
+                import_job.import_job_id, owners[0], 3,
+                bulk_import.ImportReport(2, 0)
+            )
+
+        self.assertFalse(import_job_service.finish_job(
+            import_job.import_job_id, owners[0], 'COMPLETED'
+        ))
+
+        import_job_service.save_checkpoint(import_job.import_job_id, owner,
+                                           3, bulk_import.ImportReport(2, 0))
+        import_job.refresh_from_db()
+
+        self.assertEqual((import_job.status, import_job.line),
+                         ('RUNNING', 3))
+
+    def test_heartbeat(self):
+        import_job = self.create_job()
+        owner = import_job_service.claim_job(import_job.import_job_id)
+
+        ImportJob.objects.filter(import_job_id=import_job.import_job_id) \
+            .update(heartbeat_at='2020-01-01T00:00:00Z')
+
+        heartbeat = import_job_service.Heartbeat(import_job.import_job_id,
+                                                 owner)
+
+        with mock.patch.object(heartbeat.stopped, 'wait',
+                               side_effect=[False, True]), \
+                mock.patch.object(import_job_service.connections,
+                                  'close_all'):
+            heartbeat.run()
+
+        self.assertEqual(import_job_service.get_resumable_job_ids(), [])
+
+    def test_import_job_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create(username='user'))
+
+        with self.captureOnCommitCallbacks():
+            response = client.post(
+                f'/employee/?organization_id='
+                f'{self.organization.organization_id}',
+                {'email': self.organization.email,
+                 'file': SimpleUploadedFile('employees.csv',
+                                            EMPLOYEES.encode())},
+                format='multipart'
+            )
+
+        self.assertEqual(response.status_code, 202)
+
+        import_job_uid = response.data['import_job_uid']
+        import_job_service.run_job(
+            ImportJob.objects.get(import_job_uid=import_job_uid).import_job_id
+        )
+
+        url = (f'/organization/import/{import_job_uid}'
+               f'?organization_id={self.organization.organization_id}')
+
+        def get_status(data):
+            return client.generic('GET', url, json.dumps(data),
+                                  content_type='application/json')
+
+        response = get_status({'email': self.organization.email})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'COMPLETED')
+        self.assertEqual(response.data['created'], 4)
+
+        # the job is only shown to the organization it belongs to
+        self.assertEqual(get_status({}).status_code, 400)
+        self.assertEqual(
+            get_status({'email': 'other@ideas2it.com'}).status_code, 404
+        )
+        self.assertEqual(client.post(url, {'email': 'other@ideas2it.com'},
+                                     format='json').status_code, 404)
@@ -7,4 +7,6 @@ urlpatterns = [
     path('all', views.get_organizations, name='get_organizations'),
     path('<uuid:organization_uid>', views.do_organization,
          name='do_organization'),
+    path('import/<uuid:import_job_uid>', views.do_import_job,
+         name='do_import_job'),
 ]
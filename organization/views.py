@@ -7,8 +7,10 @@ from django.http import HttpRequest
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from organization.service import import_job_service
 from organization.service import organization_service
 
+from utils import pagination
 from utils.api_exceptions import CustomApiException
 
 
@@ -20,10 +22,10 @@ def create_organization(request: HttpRequest):
     """used to create organization
     """
     try:
-        logger.debug(f'Enter {__name__} module, create_organization method')
+        logger.debug('Enter %s module, create_organization method', __name__)
         organization_serializer = organization_service \
             .create_organization(request.data)
-        logger.debug(f'Exit {__name__} module, create_organization method')
+        logger.debug('Exit %s module, create_organization method', __name__)
         return Response(organization_serializer)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, create_organization method')
@@ -35,10 +37,11 @@ def get_organizations(request: HttpRequest):
     """used to get all organizations
     """
     try:
-        logger.debug(f'Enter {__name__} module, get_organizations method')
-        organization_serializer = organization_service.get_organizations()
-        logger.debug(f'Exit {__name__} module, get_organizations method')
-        return Response(organization_serializer)
+        logger.debug('Enter %s module, get_organizations method', __name__)
+        page = pagination.get_page(request.query_params)
+        organization_serializer = organization_service.get_organizations(page)
+        logger.debug('Exit %s module, get_organizations method', __name__)
+        return pagination.get_response(organization_serializer)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, get_organizations method')
         raise CustomApiException(e.status_code, e.detail)
@@ -46,7 +49,7 @@ def get_organizations(request: HttpRequest):
 
 @api_view(['GET', 'PUT', 'PATCH'])
 def do_organization(request: HttpRequest, organization_uid):
-    logger.debug(f'Enter {__name__} module, do_organization method')
+    logger.debug('Enter %s module, do_organization method', __name__)
 
     if request.method == 'GET':
         """used to get an organization details
@@ -54,7 +57,7 @@ def do_organization(request: HttpRequest, organization_uid):
         try:
             organization_serializer = organization_service \
                 .get_organization(organization_uid, request.data)
-            logger.debug(f'Exit {__name__} module, do_organization method')
+            logger.debug('Exit %s module, do_organization method', __name__)
             return Response(organization_serializer)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_organization method')
@@ -66,7 +69,7 @@ def do_organization(request: HttpRequest, organization_uid):
         try:
             organization_serializer = organization_service \
                 .update_organization(organization_uid, request.data)
-            logger.debug(f'Exit {__name__} module, do_organization method')
+            logger.debug('Exit %s module, do_organization method', __name__)
             return Response(organization_serializer)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_organization method')
@@ -78,8 +81,38 @@ def do_organization(request: HttpRequest, organization_uid):
         try:
             organization_serializer = organization_service \
                 .update_organization_status(organization_uid, request.data)
-            logger.debug(f'Exit {__name__} module, do_organization method')
+            logger.debug('Exit %s module, do_organization method', __name__)
             return Response(organization_serializer)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_organization method')
             raise CustomApiException(e.status_code, e.detail)
+
+
+@api_view(['GET', 'POST'])
+def do_import_job(request: HttpRequest, import_job_uid):
+    organization_id = request.query_params.get('organization_id')
+
+    if request.method == 'GET':
+        """used to get the status, rows done, rows failed and throughput of
+        an import job
+        """
+        try:
+            import_job = import_job_service.get_job(
+                organization_id, import_job_uid, request.data
+            )
+            return Response(import_job)
+        except CustomApiException as e:
+            logger.error(f'Exit {__name__} module, do_import_job method')
+            raise CustomApiException(e.status_code, e.detail)
+
+    if request.method == 'POST':
+        """used to resume a failed or interrupted import job
+        """
+        try:
+            import_job = import_job_service.resume_job(
+                organization_id, import_job_uid, request.data
+            )
+            return Response(import_job, status=202)
+        except CustomApiException as e:
+            logger.error(f'Exit {__name__} module, do_import_job method')
+            raise CustomApiException(e.status_code, e.detail)
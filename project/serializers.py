@@ -35,3 +35,14 @@ class ProjectOnlySerializer(serializers.ModelSerializer):
         instance.save()
 
         return instance
+
+
+class ProjectImportSerializer(serializers.ModelSerializer):
+    """validates an imported project row. Email uniqueness is checked for
+    a whole chunk of rows at once by the import
+    """
+
+    class Meta:
+        model = Project
+        fields = ('name', 'email', 'description')
+        extra_kwargs = {'email': {'validators': []}}
@@ -1,30 +1,38 @@
 """this module is used to create, update and delete project details
 """
+import functools
 import logging
 
+from django.db import transaction
+
 from rest_framework.exceptions import ValidationError
 
+from credential.service import effective_access_service
+
 from employee.models import Employee
 
 from project.models import Project
+from project.serializers import ProjectImportSerializer
 from project.serializers import ProjectOnlySerializer
 from project.serializers import ProjectSerializer
 
 from organization.models import Organization
 
+from utils import bulk_import
+from utils import pagination
 from utils.api_exceptions import CustomApiException
+from utils.fast_serializer import get_fast_serializer
+from utils.tracing import traced
 
 
 logger = logging.getLogger('credential-manager-logger')
 
 
+@traced
 def create_project(organization_id, data):
     """used to create project in an organization
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{create_project.__name__} method')
-
         organization = Organization.objects.get(
             organization_id=organization_id, active=True,
         )
@@ -37,36 +45,84 @@ def create_project(organization_id, data):
         project_serializer.save()
 
         logger.debug('Project creation successful')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{create_project.__name__} method')
 
         return project_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details. Project creation failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_project.__name__} method')
         raise CustomApiException(500, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_project.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('Organization not exist. Project creation failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{create_project.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
 
 
+def build_projects(organization_id, rows, report):
+    """used to validate a chunk of imported project rows and build the
+    projects of the valid rows
+    """
+    validated_rows = []
+
+    for line, row in rows:
+        project_serializer = ProjectImportSerializer(data=row)
+        project_serializer.is_valid()
+        validated_rows.append((line, project_serializer))
+
+    emails = set(Project.objects.filter(email__in=[
+        project_serializer.validated_data['email']
+        for _, project_serializer in validated_rows
+        if not project_serializer.errors
+    ]).values_list('email', flat=True))
+
+    projects = []
+
+    for line, project_serializer in validated_rows:
+        if project_serializer.errors:
+            report.add_error(line, project_serializer.errors)
+            continue
+
+        data = project_serializer.validated_data
+
+        if data['email'] in emails:
+            report.add_error(line, {'email': [
+                'project with this email already exists.'
+            ]})
+            continue
+
+        emails.add(data['email'])
+
+        projects.append((line, Project(
+            name=data['name'], email=data['email'],
+            description=data['description'],
+            organization_id=organization_id, created_by_id=organization_id
+        )))
+
+    return projects
+
+
+def save_projects(projects):
+    Project.objects.bulk_create(projects)
+
+
+def import_project_rows(organization_id, rows, report=None,
+                        checkpoint=None):
+    """used to import the (line number, row) pairs of a projects file in
+    chunks
+    """
+    return bulk_import.import_rows(
+        rows, functools.partial(build_projects, organization_id),
+        save_projects, report=report, checkpoint=checkpoint
+    )
+
+
+@traced
 def get_project(organization_id, project_uid, data):
     """used to get project from an organization
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{get_project.__name__} method')
-
         organization = Organization.objects.get(
             organization_id=organization_id, active=True,
         )
@@ -78,41 +134,29 @@ def get_project(organization_id, project_uid, data):
 
         project_serializer = ProjectSerializer(project)
 
-        logger.debug(f'Exit {__name__} module, '
-                     f'{get_project.__name__} method')
-
         return project_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_project.__name__} method')
         raise CustomApiException(500, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_project.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('Organization not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_project.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
     except Project.DoesNotExist:
         logger.error('Project not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_project.__name__} method')
         raise CustomApiException(404, 'No such project exist')
 
 
-def get_projects(organization_id, data):
-    """used to get all projects from an organization
+@traced
+def get_projects(organization_id, data, page=None):
+    """used to get all projects from an organization, paginated by
+    project id when a page is given
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{get_projects.__name__} method')
-
         email = data['email']
 
         organization = Organization.objects.get(
@@ -123,38 +167,29 @@ def get_projects(organization_id, data):
         projects = Project.objects.filter(organization=organization,
                                           active=True)
 
-        project_serializer = ProjectOnlySerializer(projects, many=True)
-
-        logger.debug(f'Exit {__name__} module, '
-                     f'{get_projects.__name__} method')
+        project_serializer = get_fast_serializer(ProjectOnlySerializer)
 
-        return project_serializer.data
+        return pagination.paginate(projects, 'project_id', page,
+                                   project_serializer.serialize_queryset)
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_projects.__name__} method')
         raise CustomApiException(500, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_projects.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('Organization not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{get_projects.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
 
 
+@traced
+@transaction.atomic
 def assign_employee(organization_id, project_uid, data):
     """used to assign employee to a project
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{assign_employee.__name__} method')
-
         organization = Organization.objects.get(
             organization_id=organization_id, active=True,
         )
@@ -179,49 +214,38 @@ def assign_employee(organization_id, project_uid, data):
         project.employees.add(employee)
         project.save()
 
+        effective_access_service.refresh_employee(employee)
+
         project_serializer = ProjectSerializer(project)
 
         logger.debug('Employee assigned successfully')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{assign_employee.__name__} method')
 
         return project_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details')
-        logger.error(f'Exit {__name__} module, '
-                     f'{assign_employee.__name__} method')
         raise CustomApiException(500, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{assign_employee.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('Organization not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{assign_employee.__name__} method')
         raise CustomApiException(404, 'No such organization exist')
     except Project.DoesNotExist:
         logger.error('Project not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{assign_employee.__name__} method')
         raise CustomApiException(404, 'No such project exist')
     except Employee.DoesNotExist:
         logger.error('Employee not exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{assign_employee.__name__} method')
         raise CustomApiException(404, 'No such employee exist')
 
 
+@traced
+@transaction.atomic
 def update_project_status(organization_id, project_uid, data):
     """used to update project status
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{update_project_status.__name__} method')
-
         email = data["email"]
 
         organization = Organization.objects.get(
@@ -236,45 +260,34 @@ def update_project_status(organization_id, project_uid, data):
 
         project.active = not project.active
         project.save()
+        effective_access_service.refresh_project(project.project_id)
 
         project_serializer = ProjectOnlySerializer(project)
 
         logger.debug('Project status updated successful')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{update_project_status.__name__} method')
 
         return project_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details. Project status update failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_project_status.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_project_status.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_project_status.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
     except Project.DoesNotExist:
         logger.error('No such project exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_project_status.__name__} method')
         raise CustomApiException(400, 'No such project exist')
 
 
+@traced
 def update_project(organization_id, project_uid, data):
     """used to update project details
     """
     try:
-        logger.debug(f'Enter {__name__} module, '
-                     f'{update_project.__name__} method')
-
         organization = Organization.objects.get(
             organization_id=organization_id,
             active=True
@@ -292,29 +305,19 @@ def update_project(organization_id, project_uid, data):
         project_serializer.save()
 
         logger.debug('Project details updated successfully')
-        logger.debug(f'Exit {__name__} module, '
-                     f'{update_project.__name__} method')
 
         return project_serializer.data
     except ValidationError as ve:
         message = list(ve.get_full_details().values())[0][0]['message']
         logger.error('Enter valid details. Project update failure')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_project.__name__} method')
         raise CustomApiException(400, message)
     except KeyError as ke:
         message = ke.args[0] + ' is missing'
         logger.error(message)
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_project.__name__} method')
         raise CustomApiException(400, message)
     except Organization.DoesNotExist:
         logger.error('No such organization exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_project.__name__} method')
         raise CustomApiException(400, 'No such organization exist')
     except Project.DoesNotExist:
         logger.error('No such project exist')
-        logger.error(f'Exit {__name__} module, '
-                     f'{update_project.__name__} method')
         raise CustomApiException(400, 'No such project exist')
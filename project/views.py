@@ -5,18 +5,15 @@ import logging
 from django.http import HttpRequest
 
 from rest_framework.decorators import api_view
-from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from files import file_reader
-
-from organization.models import Organization
-
 from project.models import Project
-from project.serializers import ProjectSerializer
 from project.serializers import ProjectOnlySerializer
 from project.service import project_service
 
+from organization.service import import_job_service
+
+from utils import pagination
 from utils.api_exceptions import CustomApiException
 
 
@@ -25,65 +22,41 @@ logger = logging.getLogger('credential-manager-logger')
 
 @api_view(['POST', ])
 def create_projects(request: HttpRequest):
-    """used to create projects using projects csv file
+    """used to queue the import of an uploaded projects csv file, or of a
+    csv file of the import directory. The import job is returned, its
+    progress is read from the import job endpoint of the organization
     """
     try:
-        logger.debug(f'Enter {__name__} module, create_employees method')
-
-        email = request.data.get("email")
-
-        project_datas = file_reader.create_projects()
+        logger.debug('Enter %s module, create_projects method', __name__)
 
         organization_id = request.query_params.get('organization_id')
-
-        organization = Organization.objects.get(
-            organization_id=organization_id,
-            active=True,
-            email=email
-        )
-
-        for project in project_datas:
-            project['organization'] = organization.organization_id
-            project['created_by'] = organization.organization_id
-
-        project_list_serializer = ProjectSerializer(
-            data=project_datas, many=True
+        import_job = import_job_service.create_job(
+            organization_id, 'PROJECTS', request.data,
+            request.FILES.get('file')
         )
 
-        project_list_serializer.is_valid(raise_exception=True)
-        project_list_serializer.save()
+        logger.debug('Exit %s module, create_projects method', __name__)
 
-        logger.debug('Projects creation successful')
-
-        return Response(project_list_serializer.data)
-    except ValidationError:
-        logger.error('Load valid details in the file. '
-                     'Projects creation failure')
-        logger.error(f'Exit {__name__} module, create_projects method')
-        raise CustomApiException(500, 'Load valid details in the file')
-    except KeyError:
-        logger.error('Enter valid details.Projects creation failure')
-        logger.error(f'Exit {__name__} module, create_projects method')
-        raise CustomApiException(400, 'Enter valid details')
-    except Organization.DoesNotExist:
-        logger.error('Organization not exist.Projects creation failure')
+        return Response(import_job, status=202)
+    except CustomApiException as e:
         logger.error(f'Exit {__name__} module, create_projects method')
-        raise CustomApiException(404, 'No such organization exist')
+        raise CustomApiException(e.status_code, e.detail)
 
 
 @api_view(['GET'])
 def get_projects(request: HttpRequest):
     """used to get all vaults from an organization
     """
-    logger.debug(f'Enter {__name__} module, get_projects method')
+    logger.debug('Enter %s module, get_projects method', __name__)
 
     try:
         organization_id = request.query_params.get('organization_id')
+        page = pagination.get_page(request.query_params)
         project_serializer = project_service.get_projects(
-            organization_id, request.data
+            organization_id, request.data, page
         )
-        logger.debug(f'Exit {__name__} module, get_projects method')
-        return Response(project_serializer)
+        logger.debug('Exit %s module, get_projects method', __name__)
+        return pagination.get_response(project_serializer)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, get_projects method')
         raise CustomApiException(e.status_code, e.detail)
@@ -94,11 +67,11 @@ def create_project(request: HttpRequest):
     """used to create project in an organization
     """
     try:
-        logger.debug(f'Enter {__name__} module, create_project method')
+        logger.debug('Enter %s module, create_project method', __name__)
         organization_id = request.query_params.get('organization_id')
         project = project_service.create_project(organization_id,
                                                  request.data)
-        logger.debug(f'Exit {__name__} module, create_project method')
+        logger.debug('Exit %s module, create_project method', __name__)
         return Response(project)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, create_project method')
@@ -110,12 +83,12 @@ def assign_employee(request: HttpRequest, project_uid):
     """used to assign employee to a project
     """
     try:
-        logger.debug(f'Enter {__name__} module, assign_employee method')
+        logger.debug('Enter %s module, assign_employee method', __name__)
         organization_id = request.query_params.get('organization_id')
         project = project_service.assign_employee(organization_id,
                                                   project_uid,
                                                   request.data)
-        logger.debug(f'Exit {__name__} module, assign_employee method')
+        logger.debug('Exit %s module, assign_employee method', __name__)
         return Response(project)
     except CustomApiException as e:
         logger.error(f'Exit {__name__} module, assign_employee method')
@@ -124,14 +97,14 @@ def assign_employee(request: HttpRequest, project_uid):
 
 @api_view(['GET', 'PUT', 'PATCH'])
 def do_project(request: HttpRequest, project_uid):
-    logger.debug(f'Enter {__name__} module, do_project method')
+    logger.debug('Enter %s module, do_project method', __name__)
     organization_id = request.query_params.get('organization_id')
 
     if request.method == 'GET':
         try:
             project = project_service.get_project(organization_id,
                                                   project_uid, request.data)
-            logger.debug(f'Exit {__name__} module, do_project method')
+            logger.debug('Exit %s module, do_project method', __name__)
             return Response(project)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_project method')
@@ -144,7 +117,7 @@ def do_project(request: HttpRequest, project_uid):
             project_serializer = project_service.update_project(
                 organization_id, project_uid, request.data
             )
-            logger.debug(f'Exit {__name__} module, do_employee method')
+            logger.debug('Exit %s module, do_employee method', __name__)
             return Response(project_serializer)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_employee method')
@@ -157,7 +130,7 @@ def do_project(request: HttpRequest, project_uid):
             project_serializer = project_service.update_project_status(
                 organization_id, project_uid, request.data
             )
-            logger.debug(f'Exit {__name__} module, do_project method')
+            logger.debug('Exit %s module, do_project method', __name__)
             return Response(project_serializer)
         except CustomApiException as e:
             logger.error(f'Exit {__name__} module, do_project method')
@@ -0,0 +1,106 @@
+"""This module is used to import large files of rows in chunks. The rows are
+validated and written one chunk at a time, each chunk in its own
+transaction, and the rows which can not be imported are reported with their
+line number without stopping the import
+"""
+import contextlib
+import itertools
+import logging
+
+from django.db import IntegrityError
+from django.db import transaction
+
+
+logger = logging.getLogger('credential-manager-logger')
+
+CHUNK_SIZE = 1000
+
+# row errors kept in the report, later errors are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    """number of created and failed rows of an import, with the errors of
+    the failed rows
+    """
+
+    def __init__(self, created=0, failed=0, errors=None):
+        self.created = created
+        self.failed = failed
+        self.errors = list(errors or [])
+
+    def add_error(self, line, errors):
+        self.failed += 1
+
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+
+
+def chunked(iterable, size):
+    """used to split an iterable into lists of the given size without
+    reading it ahead
+    """
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def save_rows(rows, save_chunk, report):
+    """used to save the (line number, instance) pairs of a chunk in one
+    transaction. When the chunk is refused, the rows are saved one at a
+    time so only the refused rows are reported
+    """
+    try:
+        with transaction.atomic():
+            save_chunk([instance for _, instance in rows])
+
+        report.created += len(rows)
+    except IntegrityError:
+        for line, instance in rows:
+            try:
+                with transaction.atomic():
+                    save_chunk([instance])
+
+                report.created += 1
+            except IntegrityError as e:
+                logger.error(f'Row {line} import failure. {e}')
+                report.add_error(line, {'non_field_errors': [
+                    'Row conflicts with an existing record'
+                ]})
+
+
+def import_rows(rows, build_chunk, save_chunk, chunk_size=None,
+                report=None, checkpoint=None):
+    """used to import the (line number, row) pairs. build_chunk validates a
+    chunk of rows, adds the invalid rows to the report and returns the
+    (line number, instance) pairs of the valid rows, which are written by
+    save_chunk. When a checkpoint is given, each chunk is written in one
+    transaction with the call to checkpoint(last line number, report), so
+    the recorded progress always matches the committed rows
+    """
+    report = report or ImportReport()
+
+    for chunk in chunked(rows, chunk_size or CHUNK_SIZE):
+        with transaction.atomic() if checkpoint else contextlib.nullcontext():
+            instances = build_chunk(chunk, report)
+
+            if instances:
+                save_rows(instances, save_chunk, report)
+
+            if checkpoint:
+                checkpoint(chunk[-1][0], report)
+
+    return report
@@ -0,0 +1,190 @@
+"""This module is used to load very large csv files of pre-validated rows
+straight into their tables. On PostgreSQL the rows are streamed with COPY
+from an in-memory buffer, on other databases they are inserted with
+executemany. The csv header holds the column names of the table, and
+columns left out of the file get the default of their model field
+"""
+import csv
+import io
+import itertools
+
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import BooleanField
+from django.utils import timezone
+
+
+BATCH_SIZE = 10000
+
+TRUE_VALUES = ('t', 'true', 'y', 'yes', 'on', '1')
+
+
+class CopyLoadError(Exception):
+    """raised when a csv file does not match its table
+    """
+
+
+def get_columns(model, header):
+    """used to check the header columns against the table of the model.
+    Returns the fields of the header columns and the fields of the columns
+    left out of the file which get their model default
+    """
+    fields = {field.column: field for field in model._meta.concrete_fields}
+
+    unknown = [column for column in header if column not in fields]
+
+    if unknown:
+        raise CopyLoadError(f'Unknown columns of {model._meta.db_table}: '
+                            f'{", ".join(unknown)}')
+
+    default_fields = []
+
+    for column, field in fields.items():
+        if column in header:
+            continue
+
+        if field.has_default() or getattr(field, 'auto_now', False) \
+                or getattr(field, 'auto_now_add', False):
+            default_fields.append(field)
+        elif not (field.primary_key or field.null):
+            raise CopyLoadError(f'Column {column} of '
+                                f'{model._meta.db_table} is missing')
+
+    return [fields[column] for column in header], default_fields
+
+
+def get_default(field):
+    if getattr(field, 'auto_now', False) \
+            or getattr(field, 'auto_now_add', False):
+        return timezone.now()
+
+    if field.has_default():
+        return field.get_default()
+
+    return None
+
+
+def quote_names(columns):
+    return ', '.join(map(connection.ops.quote_name, columns))
+
+
+def copy_batch(table, columns, not_null_columns, rows):
+    """used to stream a batch of rows into the table with COPY. An empty
+    value is NULL, except in the not null columns where it is an empty
+    string
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    options = 'FORMAT csv'
+
+    if not_null_columns:
+        options += f', FORCE_NOT_NULL ({quote_names(not_null_columns)})'
+
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(table)} '
+            f'({quote_names(columns)}) FROM STDIN WITH ({options})',
+            buffer
+        )
+
+
+def insert_batch(table, columns, rows):
+    """used to insert a batch of rows with executemany
+    """
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {connection.ops.quote_name(table)} '
+            f'({quote_names(columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))})',
+            rows
+        )
+
+
+def prepare_copy_row(row, default_fields):
+    """used to append the default values to a row of a COPY batch. The
+    values of the file are passed as they are
+    """
+    return row + [
+        '' if value is None else str(value)
+        for value in (
+            field.get_db_prep_value(get_default(field), connection)
+            for field in default_fields
+        )
+    ]
+
+
+def to_python(field, value):
+    """used to convert a csv value the way COPY reads it. An empty value is
+    NULL in the nullable columns and booleans are spelled as in PostgreSQL
+    """
+    if value == '' and field.null:
+        return None
+
+    if isinstance(field, BooleanField):
+        return value.strip().lower() in TRUE_VALUES
+
+    return field.to_python(value)
+
+
+def prepare_insert_row(row, fields, default_fields):
+    """used to convert a row of an executemany batch into database values
+    """
+    return [
+        field.get_db_prep_value(to_python(field, value), connection)
+        for field, value in zip(fields, row)
+    ] + [
+        field.get_db_prep_value(get_default(field), connection)
+        for field in default_fields
+    ]
+
+
+def load(model, csv_file, batch_size=None):
+    """used to load the rows of a csv file into the table of the model.
+    Returns the number of loaded rows
+    """
+    batch_size = batch_size or BATCH_SIZE
+    table = model._meta.db_table
+    reader = csv.reader(csv_file)
+    header = next(reader, None)
+
+    if not header:
+        return 0
+
+    fields, default_fields = get_columns(model, header)
+    columns = header + [field.column for field in default_fields]
+    not_null_columns = [field.column for field in fields + default_fields
+                        if not field.null and field.empty_strings_allowed]
+    use_copy = connection.vendor == 'postgresql'
+    loaded = 0
+
+    while True:
+        batch = list(itertools.islice(reader, batch_size))
+
+        if not batch:
+            return loaded
+
+        if use_copy:
+            copy_batch(table, columns, not_null_columns, [
+                prepare_copy_row(row, default_fields) for row in batch
+            ])
+        else:
+            insert_batch(table, columns, [
+                prepare_insert_row(row, fields, default_fields)
+                for row in batch
+            ])
+
+        loaded += len(batch)
+
+
+def reset_sequences(models):
+    """used to move the primary key sequences of the tables past the
+    loaded ids, so the next ORM insert does not collide with them
+    """
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
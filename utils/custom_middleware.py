@@ -1,11 +1,91 @@
+import logging
+
+from django.db import connection
 from django.http import HttpRequest
 
+from credential.service import entity_loader
+
+from utils import metrics
+from utils import request_timing
+
+
+logger = logging.getLogger('credential-manager-logger')
+
+requests_total = metrics.counter(
+    'credential_http_requests_total', 'Requests by URL name and status',
+    ['url_name', 'method', 'status']
+)
+
+request_duration = metrics.histogram(
+    'credential_http_request_duration_seconds',
+    'Wall time of the requests by URL name', ['url_name']
+)
+
+request_queries = metrics.histogram(
+    'credential_http_request_queries',
+    'Database queries of the requests by URL name', ['url_name'],
+    buckets=metrics.COUNT_BUCKETS
+)
+
+request_db_duration = metrics.histogram(
+    'credential_http_request_db_duration_seconds',
+    'Database time of the requests by URL name', ['url_name']
+)
+
 
 class CustomMiddleware:
+    """measures the wall time, the database queries and the time spent in
+    the encryptor and the serializers of every request. The timings are
+    sent in the Server-Timing header, logged with the URL name and added
+    to the request metrics. The body of a streamed response is written
+    after the timings are taken, so it is sent without the Server-Timing
+    header
+    """
 
     def __init__(self, get_response):
         self.get_response = get_response
 
-    def __call__(self, request):
-        response = self.get_response(request)
+    def __call__(self, request: HttpRequest):
+        timings = request_timing.RequestTimings()
+        token = request_timing.request_timings.set(timings)
+
+        try:
+            with entity_loader.request_scope(), \
+                    connection.execute_wrapper(timings.execute_wrapper):
+                response = self.get_response(request)
+        finally:
+            request_timing.request_timings.reset(token)
+            timings.finish()
+
+        if not response.streaming:
+            response['Server-Timing'] = timings.server_timing()
+
+        url_name = get_url_name(request)
+
+        requests_total.inc(url_name, request.method,
+                           str(response.status_code))
+        request_duration.observe(timings.duration, url_name)
+        request_queries.observe(timings.db_count, url_name)
+        request_db_duration.observe(timings.db_time, url_name)
+        metrics.maybe_flush()
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info('Request %s %s %s, %.3f ms', url_name,
+                        request.method, response.status_code,
+                        timings.duration * 1000,
+                        extra=dict(timings.as_dict(), url_name=url_name,
+                                   method=request.method,
+                                   status=response.status_code))
+
         return response
+
+
+def get_url_name(request):
+    """used to get the name of the URL pattern the request is resolved to
+    """
+    resolver_match = getattr(request, 'resolver_match', None)
+
+    if resolver_match is None or resolver_match.url_name is None:
+        return 'unresolved'
+
+    return resolver_match.url_name
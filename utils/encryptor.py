@@ -1,16 +1,44 @@
 """This module is used to implement AES-256 encryption and decryption
 """
+import atexit
 import base64
+import functools
 import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from secrets import token_bytes
 
 from Crypto import Random
 from Crypto.Cipher import AES
+from Crypto.Util.Padding import unpad as pkcs7_unpad
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
+from utils import metrics
+from utils import request_timing
 from utils.api_exceptions import CustomApiException
 
 logger = logging.getLogger('credential-manager-logger')
 
+# version byte of the tokens encrypted with a data key in AES-256-CBC mode
+# with PKCS7 padding
+VERSION_CBC = 1
+
+# version byte of the tokens encrypted with a data key in AES-256-GCM mode
+VERSION_GCM = 2
+
+GCM_NONCE_SIZE = 12
+
+# smallest batch which is spread over worker processes, smaller batches
+# are not worth the cost of sending them to another process
+PARALLEL_MIN_BATCH = 5000
+
+crypto_duration = metrics.histogram(
+    'credential_crypto_duration_seconds',
+    'Time spent in the encryptor functions', ['function']
+)
+
 
 def pad(s):
     """add padding to match the block size of 16 bytes
@@ -18,11 +46,15 @@ def pad(s):
     return s + b'\0' * (AES.block_size - len(s) % AES.block_size)
 
 
+@metrics.timed(crypto_duration)
+@request_timing.timed(request_timing.CRYPTO)
 def encrypt(message):
-    """encrypt the given message with the 256 bits key
+    """encrypt the given message with a new 256 bits key in AES-CBC mode.
+    Kept for the values stored before the data keys, new values are
+    encrypted with encrypt_with_key
     """
     try:
-        logger.debug(f'Enter {__name__} module, {encrypt.__name__} method')
+        logger.debug('Enter %s module, %s method', __name__, encrypt.__name__)
         key = token_bytes(32)
         message = pad(message.encode())
         iv = Random.new().read(AES.block_size)
@@ -31,20 +63,22 @@ def encrypt(message):
         encoded_text = base64.urlsafe_b64encode(encoded).decode()
         texted_key = base64.urlsafe_b64encode(key).decode()
         logger.debug('Encode successful')
-        logger.debug(f'Exit {__name__} module, {encrypt.__name__} method')
+        logger.debug('Exit %s module, %s method', __name__, encrypt.__name__)
         return {'encoded_text': encoded_text, 'texted_key': texted_key}
     except Exception as e:
         logger.error(e)
         logger.error('Encode failure')
-        logger.error(f'Exit {__name__} module, {encrypt.__name__} method')
+        logger.error('Exit %s module, %s method', __name__, encrypt.__name__)
         return None
 
 
+@metrics.timed(crypto_duration)
+@request_timing.timed(request_timing.CRYPTO)
 def decrypt(encoded_text, texted_key):
     """decrypt the given message with the 256 bits key
     """
     try:
-        logger.debug(f'Enter {__name__} module, {decrypt.__name__} method')
+        logger.debug('Enter %s module, %s method', __name__, decrypt.__name__)
         encoded = base64.urlsafe_b64decode(encoded_text)
         key = base64.urlsafe_b64decode(texted_key)
         iv = encoded[:AES.block_size]
@@ -52,10 +86,201 @@ def decrypt(encoded_text, texted_key):
         decoded = cipher.decrypt(encoded[AES.block_size:])
         message = decoded.rstrip(b'\0').decode()
         logger.debug('Decode successful')
-        logger.debug(f'Exit {__name__} module, {decrypt.__name__} method')
+        logger.debug('Exit %s module, %s method', __name__, decrypt.__name__)
         return message
     except Exception as e:
         logger.error(e)
         logger.error('Decode failure')
-        logger.error(f'Exit {__name__} module, {decrypt.__name__} method')
+        logger.error('Exit %s module, %s method', __name__, decrypt.__name__)
+        return None
+
+
+def generate_key():
+    """generate a random 256 bits key
+    """
+    return token_bytes(32)
+
+
+@functools.lru_cache(maxsize=256)
+def get_aead(key):
+    """get the AES-GCM context of a data key, which is reused by every
+    call made with the same key
+    """
+    return AESGCM(key)
+
+
+@metrics.timed(crypto_duration)
+@request_timing.timed(request_timing.CRYPTO)
+def encrypt_with_key(message, key):
+    """encrypt the given message with the given 256 bits data key in
+    AES-GCM mode. The token holds the version byte, the nonce and the
+    ciphertext followed by the authentication tag
+    """
+    try:
+        nonce = token_bytes(GCM_NONCE_SIZE)
+        encoded = bytes([VERSION_GCM]) + nonce \
+            + get_aead(key).encrypt(nonce, message.encode(), None)
+        return base64.urlsafe_b64encode(encoded).decode()
+    except Exception as e:
+        logger.error(e)
+        logger.error('Encode failure')
         return None
+
+
+def decrypt_cbc(encoded, key):
+    iv = encoded[1:1 + AES.block_size]
+    cipher = AES.new(key, AES.MODE_CBC, iv)
+    return pkcs7_unpad(cipher.decrypt(encoded[1 + AES.block_size:]),
+                       AES.block_size)
+
+
+def decrypt_gcm(encoded, key):
+    nonce = encoded[1:1 + GCM_NONCE_SIZE]
+    return get_aead(key).decrypt(nonce, encoded[1 + GCM_NONCE_SIZE:], None)
+
+
+@metrics.timed(crypto_duration)
+@request_timing.timed(request_timing.CRYPTO)
+def decrypt_with_key(token, key):
+    """decrypt the given token with the given 256 bits data key, the cipher
+    mode is chosen by the version byte of the token
+    """
+    try:
+        encoded = base64.urlsafe_b64decode(token)
+
+        if encoded[0] == VERSION_GCM:
+            return decrypt_gcm(encoded, key).decode()
+
+        if encoded[0] == VERSION_CBC:
+            return decrypt_cbc(encoded, key).decode()
+
+        raise ValueError(f'Unknown token version {encoded[0]}')
+    except Exception as e:
+        logger.error(e)
+        logger.error('Decode failure')
+        return None
+
+
+def encrypt_chunk(messages, key):
+    """encrypt a list of messages with one cipher context and one random
+    read for all nonces
+    """
+    aead = get_aead(key)
+    nonces = token_bytes(GCM_NONCE_SIZE * len(messages))
+    version = bytes([VERSION_GCM])
+    tokens = []
+
+    for index, message in enumerate(messages):
+        nonce = nonces[index * GCM_NONCE_SIZE:(index + 1) * GCM_NONCE_SIZE]
+        tokens.append(base64.urlsafe_b64encode(
+            version + nonce + aead.encrypt(nonce, message.encode(), None)
+        ).decode())
+
+    return tokens
+
+
+def decrypt_chunk(tokens, key):
+    """decrypt a list of tokens with one cipher context, a token which
+    can not be decrypted gives None
+    """
+    aead = get_aead(key)
+    messages = []
+
+    for token in tokens:
+        try:
+            encoded = base64.urlsafe_b64decode(token)
+
+            if encoded[0] == VERSION_GCM:
+                message = aead.decrypt(encoded[1:1 + GCM_NONCE_SIZE],
+                                       encoded[1 + GCM_NONCE_SIZE:], None)
+            elif encoded[0] == VERSION_CBC:
+                message = decrypt_cbc(encoded, key)
+            else:
+                raise ValueError(f'Unknown token version {encoded[0]}')
+
+            messages.append(message.decode())
+        except Exception as e:
+            logger.error(e)
+            logger.error('Decode failure')
+            messages.append(None)
+
+    return messages
+
+
+executors = {}
+executors_lock = threading.Lock()
+
+
+def get_executor(workers):
+    """get the pool of the given number of worker processes, started by the
+    first batch and reused by every later batch of the process. The worker
+    processes are spawned rather than forked, as a fork of the threaded web
+    process could inherit a lock held by another thread
+    """
+    with executors_lock:
+        executor = executors.get(workers)
+
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            executors[workers] = executor
+            atexit.register(executor.shutdown)
+
+        return executor
+
+
+def discard_executor(workers, executor):
+    """drop a broken pool, the next batch starts new worker processes
+    """
+    with executors_lock:
+        if executors.get(workers) is executor:
+            del executors[workers]
+
+    executor.shutdown(wait=False)
+
+
+def run_batch(function, values, key, workers):
+    """run the chunk function over the values, in worker processes when
+    workers are given and the batch is large enough
+    """
+    values = list(values)
+
+    if not workers or workers < 2 or len(values) < PARALLEL_MIN_BATCH:
+        return function(values, key)
+
+    chunk_size = -(-len(values) // workers)
+    chunks = [values[start:start + chunk_size]
+              for start in range(0, len(values), chunk_size)]
+
+    executor = get_executor(workers)
+
+    try:
+        results = executor.map(function, chunks, [key] * len(chunks))
+
+        return [value for result in results for value in result]
+    except BrokenProcessPool:
+        # a worker process died, the batch is run here
+        logger.error('Encryption processes stopped, restarting')
+        discard_executor(workers, executor)
+
+        return function(values, key)
+
+
+@metrics.timed(crypto_duration)
+@request_timing.timed(request_timing.CRYPTO)
+def encrypt_many(messages, key, workers=None):
+    """encrypt an iterable of messages with the given data key, the tokens
+    are returned in the same order
+    """
+    return run_batch(encrypt_chunk, messages, key, workers)
+
+
+@metrics.timed(crypto_duration)
+@request_timing.timed(request_timing.CRYPTO)
+def decrypt_many(tokens, key, workers=None):
+    """decrypt an iterable of tokens with the given data key, the messages
+    are returned in the same order with None for the failed tokens
+    """
+    return run_batch(decrypt_chunk, tokens, key, workers)
@@ -0,0 +1,226 @@
+"""This module is used to serialize models into plain dictionaries without
+running the field machinery of the DRF serializers for every row. The fields
+of a DRF serializer are inspected once, and their output is reproduced from
+model instances or from .values() rows
+"""
+import functools
+import time
+
+from rest_framework import ISO_8601
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from django.utils import timezone
+
+from utils import metrics
+from utils import request_timing
+
+
+# serializer fields whose representation is the model value itself
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+)
+
+serialize_duration = metrics.histogram(
+    'credential_serializer_duration_seconds',
+    'Time spent in the fast serializers', ['serializer']
+)
+
+serialized_rows = metrics.counter(
+    'credential_serialized_rows_total',
+    'Rows serialized by the fast serializers', ['serializer']
+)
+
+
+def observed(method):
+    """decorator which adds the duration and the number of rows of every
+    call of a serialize method to the serializer metrics
+    """
+    @functools.wraps(method)
+    def wrapper(self, source):
+        started = time.perf_counter()
+        data = method(self, source)
+        name = self.serializer_class.__name__
+
+        serialize_duration.observe(time.perf_counter() - started, name)
+        serialized_rows.inc(name,
+                            amount=len(data) if isinstance(data, list) else 1)
+
+        return data
+
+    return wrapper
+
+
+def represent_datetime(value, field_timezone):
+    """used to represent a datetime the way DRF does in ISO 8601 format
+    """
+    if timezone.is_aware(value):
+        value = value.astimezone(field_timezone)
+    else:
+        value = timezone.make_aware(value, field_timezone)
+
+    value = value.isoformat()
+
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+
+    return value
+
+
+def represent_uuid(value, field_timezone):
+    return str(value)
+
+
+def represent_with(field):
+    """used to fall back to the representation of the DRF field
+    """
+    def represent(value, field_timezone):
+        return field.to_representation(value)
+
+    return represent
+
+
+class FastSerializer:
+    """read only serializer which gives the same output as the
+    given DRF model serializer
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+        serializer = serializer_class()
+        model = serializer.Meta.model
+
+        # (field name, model attribute, values() key, converter, nested)
+        self.fields = []
+
+        for field_name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if isinstance(field, serializers.ListSerializer):
+                nested = get_fast_serializer(type(field.child))
+                self.fields.append(
+                    (field_name, field.source, None, None, nested)
+                )
+                continue
+
+            model_field = model._meta.get_field(field.source)
+
+            self.fields.append((field_name, model_field.attname,
+                                model_field.name, self.converter(field),
+                                None))
+
+    @staticmethod
+    def converter(field):
+        """used to get the function converting a model value of the field,
+        None if the value is represented as it is
+        """
+        if isinstance(field, serializers.PrimaryKeyRelatedField) \
+                and field.pk_field is None:
+            return None
+
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, 'format',
+                                    api_settings.DATETIME_FORMAT)
+
+            if output_format is not None \
+                    and output_format.lower() == ISO_8601 \
+                    and not hasattr(field, 'timezone'):
+                return represent_datetime
+
+            return represent_with(field)
+
+        if isinstance(field, serializers.UUIDField) \
+                and field.uuid_format == 'hex_verbose':
+            return represent_uuid
+
+        if isinstance(field, IDENTITY_FIELDS):
+            return None
+
+        return represent_with(field)
+
+    @property
+    def value_names(self):
+        """used to get the field names to pass to .values()
+        """
+        if any(nested is not None for *_, nested in self.fields):
+            raise ValueError(f'{self.serializer_class.__name__} has nested '
+                             f'serializers and can not serialize rows')
+
+        return [value_name for _, _, value_name, _, _ in self.fields]
+
+    def represent(self, source, field_timezone, is_row=False):
+        data = {}
+
+        for field_name, attname, value_name, converter, nested in self.fields:
+            if nested is not None:
+                data[field_name] = [
+                    nested.represent(instance, field_timezone)
+                    for instance in getattr(source, attname).all()
+                ]
+                continue
+
+            if is_row:
+                value = source[value_name]
+            else:
+                value = getattr(source, attname)
+
+            if value is None or converter is None:
+                data[field_name] = value
+            else:
+                data[field_name] = converter(value, field_timezone)
+
+        return data
+
+    @observed
+    @request_timing.timed(request_timing.SERIALIZE)
+    def serialize(self, instance):
+        """used to serialize a model instance
+        """
+        return self.represent(instance, timezone.get_current_timezone())
+
+    @observed
+    @request_timing.timed(request_timing.SERIALIZE)
+    def serialize_many(self, instances):
+        """used to serialize an iterable of model instances
+        """
+        field_timezone = timezone.get_current_timezone()
+
+        return [self.represent(instance, field_timezone)
+                for instance in instances]
+
+    @observed
+    @request_timing.timed(request_timing.SERIALIZE)
+    def serialize_rows(self, rows):
+        """used to serialize the rows of a .values(*value_names) queryset
+        """
+        field_timezone = timezone.get_current_timezone()
+
+        return [self.represent(row, field_timezone, is_row=True)
+                for row in rows]
+
+    @request_timing.timed(request_timing.SERIALIZE)
+    def serialize_queryset(self, queryset):
+        """used to serialize a queryset through .values() without building
+        model instances
+        """
+        return self.serialize_rows(queryset.values(*self.value_names))
+
+
+fast_serializers = {}
+
+
+def get_fast_serializer(serializer_class):
+    """used to get the fast serializer of a DRF serializer class, the
+    fields are inspected only the first time
+    """
+    fast_serializer = fast_serializers.get(serializer_class)
+
+    if fast_serializer is None:
+        fast_serializer = FastSerializer(serializer_class)
+        fast_serializers[serializer_class] = fast_serializer
+
+    return fast_serializer
@@ -0,0 +1,151 @@
+"""This module is used to write log records off the request thread. Records
+are put on a queue and a listener thread passes them to the file and
+console handlers
+"""
+import atexit
+import logging
+import os
+import queue
+import weakref
+
+from logging.config import ConvertingList
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+
+
+def resolve_handlers(handlers):
+    """used to resolve the cfg:// references of the handlers given in the
+    logging configuration into the configured handlers
+    """
+    if not isinstance(handlers, ConvertingList):
+        return handlers
+
+    return [handlers[index] for index in range(len(handlers))]
+
+
+class TimedQueueListener(QueueListener):
+    """queue listener which waits up to the put timeout for room in the
+    queue to take the stop request
+    """
+
+    def __init__(self, queue, *handlers, respect_handler_level=False,
+                 put_timeout=1):
+        super().__init__(queue, *handlers,
+                         respect_handler_level=respect_handler_level)
+        self.put_timeout = put_timeout
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel, timeout=self.put_timeout)
+
+
+class QueueListenerHandler(QueueHandler):
+    """queue handler which starts its own listener for the given handlers.
+    Use it from the LOGGING setting as
+
+        'queue': {
+            'class': 'utils.log_handlers.QueueListenerHandler',
+            'handlers': ['cfg://handlers.file', 'cfg://handlers.console'],
+        }
+    """
+
+    def __init__(self, handlers, respect_handler_level=True,
+                 queue_size=10000, put_timeout=1):
+        super().__init__(queue.Queue(queue_size))
+
+        self.dropped = 0
+        self.put_timeout = put_timeout
+        self.target_handlers = resolve_handlers(handlers)
+        self.respect_handler_level = respect_handler_level
+        self.listener = None
+
+        self.start()
+
+        atexit.register(self.stop)
+
+        # a forked worker inherits the queue but not the listener thread
+        if hasattr(os, 'register_at_fork'):
+            handler = weakref.ref(self)
+            os.register_at_fork(
+                after_in_child=lambda: restart_in_child(handler)
+            )
+
+    def start(self):
+        """used to start the listener thread on the queue
+        """
+        self.listener = TimedQueueListener(
+            self.queue, *self.target_handlers,
+            respect_handler_level=self.respect_handler_level,
+            put_timeout=self.put_timeout
+        )
+        self.listener.start()
+
+    def restart(self):
+        """used to start a listener on a new queue in a forked process. The
+        records queued by the parent are left to the parent
+        """
+        if self.listener is None:
+            return
+
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.start()
+
+    def prepare(self, record):
+        """used to merge the message arguments before the record is queued.
+        The arguments are interpolated on the calling thread, as they may
+        change or query the database once the call returns. The record is
+        not copied, and the formatting with the handler layout and the
+        writing are left to the listener thread
+        """
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+
+        return record
+
+    def enqueue(self, record):
+        """used to queue the record. When the listener falls behind, debug
+        and info records are dropped while warnings and errors wait up to
+        the put timeout for room in the queue. Once the listener is stopped
+        the records are written on the calling thread
+        """
+        if self.listener is None:
+            self.handle_directly(record)
+            return
+
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.put_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def handle_directly(self, record):
+        for handler in self.target_handlers:
+            if not self.respect_handler_level \
+                    or record.levelno >= handler.level:
+                handler.handle(record)
+
+    def stop(self):
+        """used to write the queued records and stop the listener thread. A
+        listener which does not drain the queue is left behind, it runs in
+        a daemon thread
+        """
+        listener, self.listener = self.listener, None
+
+        if listener is not None:
+            try:
+                listener.stop()
+            except queue.Full:
+                pass
+
+    def close(self):
+        self.stop()
+        super().close()
+
+
+def restart_in_child(handler):
+    queue_handler = handler()
+
+    if queue_handler is not None:
+        queue_handler.restart()
@@ -0,0 +1,321 @@
+"""This module is used to collect counters and histograms of the application
+in process memory and to expose them in the Prometheus text format. When
+METRICS['MULTIPROCESS_DIR'] is set, every worker process writes its metrics
+to its own file in the directory and a scrape adds up the files of all
+workers
+"""
+import atexit
+import bisect
+import functools
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+
+logger = logging.getLogger('credential-manager-logger')
+
+metrics_settings = getattr(settings, 'METRICS', {})
+
+# directory shared by the worker processes, None to expose the metrics of
+# the scraped process only
+MULTIPROCESS_DIR = metrics_settings.get('MULTIPROCESS_DIR')
+
+# seconds between two writes of the metrics file of a worker process
+FLUSH_INTERVAL = metrics_settings.get('FLUSH_INTERVAL', 5)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# buckets of the latency histograms, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# buckets of the histograms of counts, such as queries per request
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Metric:
+    """metric with a value for each combination of label values
+    """
+    kind = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def snapshot(self):
+        with self.lock:
+            values = [[list(label_values), value]
+                      for label_values, value in self.values.items()]
+
+        return {
+            'type': self.kind,
+            'help': self.documentation,
+            'label_names': list(self.label_names),
+            'values': values,
+        }
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+
+
+class Counter(Metric):
+    """monotonically increasing count
+    """
+    kind = 'counter'
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = \
+                self.values.get(label_values, 0) + amount
+
+
+class Histogram(Metric):
+    """count of the observed values in fixed buckets. The value of each
+    label combination is the list of the bucket counts, the count above
+    the last bucket and the sum of the observed values
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(),
+                 buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self.lock:
+            counts = self.values.get(label_values)
+
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1) + [0]
+                self.values[label_values] = counts
+
+            counts[index] += 1
+            counts[-1] += value
+
+    def snapshot(self):
+        snapshot = super().snapshot()
+        snapshot['buckets'] = list(self.buckets)
+        return snapshot
+
+
+class Registry:
+    """metrics of the process by name
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        """used to register the metric, the metric already registered with
+        the same name is returned instead
+        """
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def collect(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def clear(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+
+        for metric in metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+
+def counter(name, documentation, label_names=()):
+    return registry.register(Counter(name, documentation, label_names))
+
+
+def histogram(name, documentation, label_names=(), buckets=LATENCY_BUCKETS):
+    return registry.register(
+        Histogram(name, documentation, label_names, buckets)
+    )
+
+
+def timed(metric):
+    """decorator which observes the duration of every call of the function
+    in the histogram, labelled with the function name
+    """
+    def decorator(function):
+        name = function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metric.observe(time.perf_counter() - started, name)
+
+        return wrapper
+
+    return decorator
+
+
+def merge(snapshots):
+    """used to add up the metric snapshots of several processes
+    """
+    merged = {}
+
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, dict(metric, values={}))
+
+            for label_values, value in metric['values']:
+                key = tuple(label_values)
+                current = target['values'].get(key)
+
+                if current is None:
+                    target['values'][key] = value
+                elif metric['type'] == 'histogram':
+                    target['values'][key] = [a + b for a, b
+                                             in zip(current, value)]
+                else:
+                    target['values'][key] = current + value
+
+    for metric in merged.values():
+        metric['values'] = list(metric['values'].items())
+
+    return merged
+
+
+last_flush = 0.0
+
+
+def get_file_path(pid=None):
+    return os.path.join(MULTIPROCESS_DIR,
+                        f'metrics_{pid or os.getpid()}.json')
+
+
+def flush():
+    """used to write the metrics of this process to its file in the
+    multiprocess directory
+    """
+    global last_flush
+
+    if not MULTIPROCESS_DIR:
+        return
+
+    last_flush = time.monotonic()
+    path = get_file_path()
+
+    try:
+        with open(path + '.tmp', 'w') as metrics_file:
+            json.dump(registry.collect(), metrics_file)
+
+        os.replace(path + '.tmp', path)
+    except OSError as e:
+        logger.error('Metrics could not be written to %s: %s', path, e)
+
+
+def maybe_flush():
+    """used to write the metrics of this process when the flush interval
+    has passed since the last write
+    """
+    if MULTIPROCESS_DIR and time.monotonic() - last_flush >= FLUSH_INTERVAL:
+        flush()
+
+
+def collect():
+    """used to collect the metrics of this process, or of every worker
+    process in multiprocess mode
+    """
+    if not MULTIPROCESS_DIR:
+        return merge([registry.collect()])
+
+    flush()
+
+    snapshots = []
+
+    for path in glob.glob(os.path.join(MULTIPROCESS_DIR, 'metrics_*.json')):
+        try:
+            with open(path) as metrics_file:
+                snapshots.append(json.load(metrics_file))
+        except (OSError, ValueError) as e:
+            logger.error('Metrics could not be read from %s: %s', path, e)
+
+    return merge(snapshots)
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n') \
+        .replace('"', r'\"')
+
+
+def format_labels(label_names, label_values, extra=()):
+    labels = [f'{name}="{escape(value)}"' for name, value
+              in (*zip(label_names, label_values), *extra)]
+
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+
+def format_number(value):
+    if isinstance(value, float):
+        return repr(value)
+
+    return str(value)
+
+
+def render(metrics=None):
+    """used to render the metrics in the Prometheus text format
+    """
+    if metrics is None:
+        metrics = collect()
+
+    lines = []
+
+    for name in sorted(metrics):
+        metric = metrics[name]
+        label_names = metric['label_names']
+
+        lines.append(f'# HELP {name} {escape(metric["help"])}')
+        lines.append(f'# TYPE {name} {metric["type"]}')
+
+        for label_values, value in sorted(metric['values']):
+            if metric['type'] != 'histogram':
+                lines.append(f'{name}'
+                             f'{format_labels(label_names, label_values)} '
+                             f'{format_number(value)}')
+                continue
+
+            cumulative = 0
+
+            for bucket, count in zip([*metric['buckets'], '+Inf'], value):
+                cumulative += count
+                le = bucket if bucket == '+Inf' else format_number(
+                    float(bucket)
+                )
+                lines.append(f'{name}_bucket' + format_labels(
+                    label_names, label_values, [('le', le)]
+                ) + f' {cumulative}')
+
+            labels = format_labels(label_names, label_values)
+            lines.append(f'{name}_sum{labels} {format_number(value[-1])}')
+            lines.append(f'{name}_count{labels} {cumulative}')
+
+    return '\n'.join(lines) + '\n'
+
+
+if MULTIPROCESS_DIR:
+    os.makedirs(MULTIPROCESS_DIR, exist_ok=True)
+    atexit.register(flush)
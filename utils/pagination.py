@@ -0,0 +1,173 @@
+"""This module is used to paginate list endpoints with a keyset on the
+autoincrement primary keys, and to stream long lists to the response
+chunk by chunk instead of building them in memory
+"""
+import itertools
+import json
+
+from django.http import StreamingHttpResponse
+
+from rest_framework.response import Response
+from rest_framework.utils import encoders
+
+from utils.api_exceptions import CustomApiException
+
+
+# maximum number of rows returned in a single page
+MAX_LIMIT = 1000
+
+# number of rows fetched by each query of a streamed list
+STREAM_CHUNK_SIZE = 500
+
+
+class Page:
+    """requested page of a list, rows are returned after the given key
+    """
+    __slots__ = ('after', 'limit', 'stream')
+
+    def __init__(self, after=None, limit=None, stream=False):
+        self.after = after
+        self.limit = limit
+        self.stream = stream
+
+
+class StreamedRows:
+    """rows of a list which are serialized while the response is written
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def fetch_first_chunk(self):
+        """used to fetch and serialize the first chunk of rows before the
+        response is started, so an error of the first query is returned as
+        an error response instead of a truncated list
+        """
+        rows = iter(self.rows)
+        self.rows = itertools.chain(list(itertools.islice(rows, 1)), rows)
+
+    def json_chunks(self):
+        """used to encode the rows as a JSON array, one row at a time
+        """
+        yield '['
+
+        for index, row in enumerate(self.rows):
+            if index:
+                yield ','
+
+            yield json.dumps(row, cls=encoders.JSONEncoder,
+                             ensure_ascii=False, separators=(',', ':'))
+
+        yield ']'
+
+
+def parse_key(value):
+    if value is None or value == '':
+        return None
+
+    try:
+        key = int(value)
+    except (TypeError, ValueError):
+        raise CustomApiException(400, 'Enter valid pagination details')
+
+    if key < 0:
+        raise CustomApiException(400, 'Enter valid pagination details')
+
+    return key
+
+
+def get_page(query_params):
+    """used to get the requested page from the after, limit and stream
+    query parameters
+    """
+    after = parse_key(query_params.get('after'))
+    limit = parse_key(query_params.get('limit'))
+
+    if limit is not None:
+        if limit == 0:
+            raise CustomApiException(400, 'Enter valid pagination details')
+
+        limit = min(limit, MAX_LIMIT)
+
+    stream = query_params.get('stream', '').lower() in ('1', 'true')
+
+    return Page(after, limit, stream)
+
+
+def paginate(queryset, key_name, page, serialize):
+    """used to get the requested page of the queryset ordered by the key.
+    serialize converts a queryset into a list of dictionaries which contain
+    the key. Without a page or a limit the whole list is returned, with a
+    limit the rows and the cursor of the next page are returned
+    """
+    queryset = queryset.order_by(key_name)
+
+    if page is None:
+        return serialize(queryset)
+
+    if page.after is not None:
+        queryset = queryset.filter(**{key_name + '__gt': page.after})
+
+    if page.stream:
+        return StreamedRows(
+            stream_rows(queryset, key_name, page.limit, serialize)
+        )
+
+    if page.limit is None:
+        return serialize(queryset)
+
+    rows = serialize(queryset[:page.limit + 1])
+
+    next_cursor = None
+
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = rows[-1][key_name]
+
+    return {'results': rows, 'next_cursor': next_cursor}
+
+
+def stream_rows(queryset, key_name, limit, serialize):
+    """used to fetch and serialize the rows one keyset chunk at a time
+    """
+    remaining = limit
+    after = None
+
+    while remaining is None or remaining > 0:
+        chunk_size = STREAM_CHUNK_SIZE if remaining is None \
+            else min(STREAM_CHUNK_SIZE, remaining)
+
+        chunk = queryset
+
+        if after is not None:
+            chunk = chunk.filter(**{key_name + '__gt': after})
+
+        rows = serialize(chunk[:chunk_size])
+
+        yield from rows
+
+        if len(rows) < chunk_size:
+            break
+
+        after = rows[-1][key_name]
+
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+def get_response(data):
+    """used to write streamed rows incrementally, other data is returned
+    as a regular response. The first chunk of streamed rows is fetched
+    before the response is started, an error after it truncates the body
+    of a 200 response. Streamed responses have no Server-Timing header
+    """
+    if isinstance(data, StreamedRows):
+        data.fetch_first_chunk()
+
+        return StreamingHttpResponse(data.json_chunks(),
+                                     content_type='application/json')
+
+    return Response(data)
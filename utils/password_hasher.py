@@ -0,0 +1,126 @@
+"""This module is used to hash many passwords at once. Password hashing is
+slow on purpose, so the passwords of a bulk import are spread over a pool
+of worker processes. The hashes are the same as the ones of make_password.
+The worker processes are spawned rather than forked, as a fork of the
+threaded web process could inherit a lock held by another thread
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+
+
+logger = logging.getLogger('credential-manager-logger')
+
+# smallest batch which is spread over the worker processes
+PARALLEL_MIN_BATCH = 8
+
+
+def get_workers():
+    """used to get the number of hashing processes, one per core unless
+    PASSWORD_HASHING_WORKERS is set
+    """
+    return getattr(settings, 'PASSWORD_HASHING_WORKERS', None) \
+        or os.cpu_count() or 1
+
+
+def hash_chunk(hasher, passwords, salts):
+    """hash a list of passwords with their salts, run in a worker process
+    """
+    return [hasher.encode(password, salt)
+            for password, salt in zip(passwords, salts)]
+
+
+class HashingPool:
+    """pool of hashing processes which is reused by every batch hashed
+    inside its block, or until it is shut down. No process is started for
+    one worker
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or get_workers()
+        self.executor = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.shutdown()
+        return False
+
+    def start(self):
+        if self.workers > 1 and self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+        return self
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def hash_passwords(self, passwords):
+        """used to hash a list of passwords with the default hasher, spread
+        over the worker processes when the batch is large enough. The
+        hashes are returned in the same order
+        """
+        passwords = list(passwords)
+        hasher = get_hasher('default')
+        salts = [hasher.salt() for _ in passwords]
+
+        if self.executor is None or len(passwords) < PARALLEL_MIN_BATCH:
+            return hash_chunk(hasher, passwords, salts)
+
+        chunk_size = -(-len(passwords) // self.workers)
+        starts = range(0, len(passwords), chunk_size)
+
+        try:
+            results = self.executor.map(
+                hash_chunk, [hasher] * len(starts),
+                [passwords[start:start + chunk_size] for start in starts],
+                [salts[start:start + chunk_size] for start in starts]
+            )
+
+            return [hashed for result in results for hashed in result]
+        except BrokenProcessPool:
+            # a worker process died, the batch is hashed here and the
+            # next batch starts new processes
+            logger.error('Password hashing processes stopped, restarting')
+            self.shutdown()
+            self.start()
+
+            return hash_chunk(hasher, passwords, salts)
+
+
+shared_pool = None
+shared_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """used to get the hashing pool of the process, which is started by the
+    first import and reused by every later import
+    """
+    global shared_pool
+
+    with shared_pool_lock:
+        if shared_pool is None:
+            shared_pool = HashingPool().start()
+            atexit.register(shared_pool.shutdown)
+
+        return shared_pool
+
+
+def hash_passwords(passwords, workers=None):
+    """used to hash a list of passwords in a pool opened for this batch
+    """
+    with HashingPool(workers) as pool:
+        return pool.hash_passwords(passwords)
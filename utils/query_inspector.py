@@ -0,0 +1,191 @@
+"""This module is used to find the N+1 query patterns and the slow queries
+of a request. Every SQL statement is recorded with its duration and the
+line of the application which ran it, and statements which only differ in
+their parameters are grouped by their normalized SQL
+"""
+import logging
+import os
+import re
+import sys
+import time
+
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+
+logger = logging.getLogger('credential-manager-logger')
+
+WARN = 'warn'
+RAISE = 'raise'
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER = re.compile(r'%s|\?')
+PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+# modules whose frames are skipped when the call site of a query is searched
+SKIPPED_FILES = tuple(
+    os.path.join('utils', name)
+    for name in ('query_inspector.py', 'request_timing.py', 'tracing.py',
+                 'custom_middleware.py', 'fast_serializer.py')
+)
+
+
+class QueryBudgetExceeded(Exception):
+    """raised in RAISE mode when a request breaks the query budget
+    """
+
+
+def normalize_sql(sql):
+    """used to replace the literals and the parameters of the statement by
+    placeholders, so statements which differ only in values are equal
+    """
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    sql = PLACEHOLDER.sub('?', sql)
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def get_call_site():
+    """used to get the innermost frame of the application code in the
+    current stack as file:line in function
+    """
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+
+    while frame is not None:
+        filename = frame.f_code.co_filename
+
+        if filename.startswith(base_dir) \
+                and 'site-packages' not in filename \
+                and not filename.endswith(SKIPPED_FILES):
+            return (f'{os.path.relpath(filename, base_dir)}:{frame.f_lineno} '
+                    f'in {frame.f_code.co_name}')
+
+        frame = frame.f_back
+
+    return 'unknown'
+
+
+class RecordedQuery:
+    """statement run during the inspection
+    """
+    __slots__ = ('sql', 'normalized', 'duration', 'call_site')
+
+    def __init__(self, sql, duration, call_site):
+        self.sql = sql
+        self.normalized = normalize_sql(sql)
+        self.duration = duration
+        self.call_site = call_site
+
+
+class QueryInspector:
+    """database execute wrapper which records every statement
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        call_site = get_call_site()
+        started = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(RecordedQuery(
+                sql, time.perf_counter() - started, call_site
+            ))
+
+    def groups(self):
+        """used to group the recorded queries by their normalized SQL
+        """
+        groups = {}
+
+        for query in self.queries:
+            groups.setdefault(query.normalized, []).append(query)
+
+        return groups
+
+    def repeated(self, max_repeats):
+        """used to get the groups which ran more than max_repeats times
+        """
+        return {normalized: queries
+                for normalized, queries in self.groups().items()
+                if len(queries) > max_repeats}
+
+    def problems(self, max_queries=None, max_repeats=None,
+                 slow_query_ms=None):
+        """used to describe every broken limit, an empty list when the
+        recorded queries are within the limits
+        """
+        problems = []
+
+        if max_queries is not None and len(self.queries) > max_queries:
+            problems.append(f'{len(self.queries)} queries executed, '
+                            f'{max_queries} expected at most')
+
+        if max_repeats is not None:
+            for normalized, queries in self.repeated(max_repeats).items():
+                call_sites = Counter(query.call_site for query in queries)
+                problems.append(
+                    f'{len(queries)} x {normalized}\n' + '\n'.join(
+                        f'    {count} x at {call_site}'
+                        for call_site, count in call_sites.most_common()
+                    )
+                )
+
+        if slow_query_ms is not None:
+            for query in self.queries:
+                if query.duration * 1000 > slow_query_ms:
+                    problems.append(f'slow query {query.duration * 1000:.1f}'
+                                    f' ms at {query.call_site}\n'
+                                    f'    {query.sql}')
+
+        return problems
+
+
+class QueryInspectorMiddleware:
+    """reports the requests which break the query budget, repeat a
+    statement or run slow queries. It is enabled by setting
+    QUERY_INSPECTOR['MODE'] to WARN, which logs a warning, or RAISE, which
+    raises QueryBudgetExceeded
+    """
+
+    def __init__(self, get_response):
+        inspector_settings = getattr(settings, 'QUERY_INSPECTOR', {})
+
+        self.mode = inspector_settings.get('MODE')
+
+        if self.mode not in (WARN, RAISE):
+            raise MiddlewareNotUsed
+
+        self.max_queries = inspector_settings.get('MAX_QUERIES')
+        self.max_repeats = inspector_settings.get('MAX_REPEATS')
+        self.slow_query_ms = inspector_settings.get('SLOW_QUERY_MS')
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inspector = QueryInspector()
+
+        with connection.execute_wrapper(inspector):
+            response = self.get_response(request)
+
+        problems = inspector.problems(self.max_queries, self.max_repeats,
+                                      self.slow_query_ms)
+
+        if problems:
+            message = f'{request.method} {request.path}\n' \
+                      + '\n'.join(problems)
+
+            if self.mode == RAISE:
+                raise QueryBudgetExceeded(message)
+
+            logger.warning('Query inspection failure. %s', message)
+
+        return response
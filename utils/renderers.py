@@ -0,0 +1,15 @@
+"""This module is used to render the API responses
+"""
+from rest_framework.renderers import JSONRenderer
+
+from utils import request_timing
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSON renderer whose rendering time is counted as serialization time
+    of the request
+    """
+
+    @request_timing.timed(request_timing.SERIALIZE)
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(data, accepted_media_type, renderer_context)
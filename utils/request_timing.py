@@ -0,0 +1,113 @@
+"""This module is used to measure where the time of a request is spent. The
+custom middleware opens a timing scope for each request, and the database
+queries, encryption and serialization made inside the scope are added to it
+"""
+import contextvars
+import functools
+import time
+
+
+CRYPTO = 'crypto'
+SERIALIZE = 'serialize'
+
+request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """time spent in the database, the encryptor and the serializers during
+    one request
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = None
+        self.db_count = 0
+        self.db_time = 0.0
+        self.times = {CRYPTO: 0.0, SERIALIZE: 0.0}
+        self.depths = {CRYPTO: 0, SERIALIZE: 0}
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """database execute wrapper which counts and times the queries
+        """
+        started = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_count += 1
+            self.db_time += time.perf_counter() - started
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+    def server_timing(self):
+        """used to get the value of the Server-Timing response header
+        """
+        return (f'app;dur={self.duration * 1000:.3f}, '
+                f'db;dur={self.db_time * 1000:.3f};'
+                f'desc="{self.db_count} queries", '
+                f'{CRYPTO};dur={self.times[CRYPTO] * 1000:.3f}, '
+                f'{SERIALIZE};dur={self.times[SERIALIZE] * 1000:.3f}')
+
+    def as_dict(self):
+        return {
+            'duration_ms': round(self.duration * 1000, 3),
+            'db_count': self.db_count,
+            'db_ms': round(self.db_time * 1000, 3),
+            'crypto_ms': round(self.times[CRYPTO] * 1000, 3),
+            'serialize_ms': round(self.times[SERIALIZE] * 1000, 3),
+        }
+
+
+class timer:
+    """context manager which adds the time of the enclosed block to the
+    given category of the current request. Nested blocks of the same
+    category are counted once and database time spent inside the block
+    is left to the database
+    """
+    __slots__ = ('category', 'timings', 'started', 'db_time')
+
+    def __init__(self, category):
+        self.category = category
+
+    def __enter__(self):
+        self.timings = request_timings.get()
+
+        if self.timings is not None:
+            self.timings.depths[self.category] += 1
+            self.db_time = self.timings.db_time
+            self.started = time.perf_counter()
+
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        timings = self.timings
+
+        if timings is not None:
+            timings.depths[self.category] -= 1
+
+            if not timings.depths[self.category]:
+                timings.times[self.category] += (
+                    time.perf_counter() - self.started
+                    - (timings.db_time - self.db_time)
+                )
+
+        return False
+
+
+def timed(category):
+    """decorator which adds the time of every call of the function to the
+    given category of the current request
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if request_timings.get() is None:
+                return function(*args, **kwargs)
+
+            with timer(category):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,132 @@
+"""This module is used to trace the calls of the service functions. A traced
+call is recorded as a span with the function name, the duration and the
+type of the exception it raised, if any. Spans are sampled, and sampled
+spans are logged and passed to the span listeners
+"""
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+
+
+logger = logging.getLogger('credential-manager-logger')
+
+tracing_settings = getattr(settings, 'TRACING', {})
+
+# fraction of the calls recorded as spans, between 0 and 1
+SAMPLE_RATE = tracing_settings.get('SAMPLE_RATE', 1.0)
+
+# level of the span log records
+SPAN_LOG_LEVEL = logging.getLevelName(
+    tracing_settings.get('SPAN_LOG_LEVEL', 'DEBUG')
+)
+
+span_listeners = []
+
+
+class Span:
+    """finished call of a traced function
+    """
+    __slots__ = ('name', 'duration', 'exception')
+
+    def __init__(self, name, duration, exception=None):
+        self.name = name
+        self.duration = duration
+        self.exception = exception
+
+    def as_dict(self):
+        return {
+            'span': self.name,
+            'duration_ms': round(self.duration * 1000, 3),
+            'exception': self.exception,
+        }
+
+
+def add_span_listener(listener):
+    """used to register a callable which receives every recorded span
+    """
+    span_listeners.append(listener)
+
+
+def remove_span_listener(listener):
+    span_listeners.remove(listener)
+
+
+def is_sampled():
+    return SAMPLE_RATE >= 1 or (SAMPLE_RATE > 0
+                                and random.random() < SAMPLE_RATE)
+
+
+def record(span):
+    """used to log the span and pass it to the span listeners
+    """
+    if logger.isEnabledFor(SPAN_LOG_LEVEL):
+        if span.exception is None:
+            logger.log(SPAN_LOG_LEVEL, 'Exit %s, %.3f ms', span.name,
+                       span.duration * 1000, extra=span.as_dict())
+        else:
+            logger.log(SPAN_LOG_LEVEL, 'Exit %s with %s, %.3f ms',
+                       span.name, span.exception, span.duration * 1000,
+                       extra=span.as_dict())
+
+    for listener in span_listeners:
+        listener(span)
+
+
+class trace_span:
+    """context manager which records the enclosed block as a span
+    """
+    __slots__ = ('name', 'sampled', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.sampled = is_sampled()
+
+        if self.sampled:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Enter %s', self.name)
+
+            self.started = time.perf_counter()
+
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        if self.sampled:
+            record(Span(self.name, time.perf_counter() - self.started,
+                        exception_type.__name__ if exception_type else None))
+
+        return False
+
+
+def traced(function):
+    """decorator which records every sampled call of the function as
+    a span
+    """
+    name = f'{function.__module__}.{function.__name__}'
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not is_sampled():
+            return function(*args, **kwargs)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Enter %s', name)
+
+        started = time.perf_counter()
+
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            record(Span(name, time.perf_counter() - started,
+                        type(e).__name__))
+            raise
+
+        record(Span(name, time.perf_counter() - started))
+
+        return result
+
+    return wrapper